@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# indice_database.py
+# Historial de procedimientos para Node-RED: actualiza el indice de /home/itoroc/Database
+# (zonificacion/indice.py, solo los CSV nuevos o modificados) y lo imprime como JSON.
+# Uso (Node-RED exec): python3 /home/itoroc/zonas/indice_database.py [carpeta]
+
+import sys
+
+from zonificacion.indice import main
+
+if __name__ == "__main__":
+    sys.exit(main())
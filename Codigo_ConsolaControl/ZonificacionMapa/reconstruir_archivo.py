@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# reconstruir_archivo.py
+# Regenera los mapas de todos los procedimientos de /home/itoroc/Database en
+# /home/itoroc/zonas/archivo/<procedimiento>/mapa_<tecnica>.html, en un pool de procesos;
+# los CSV que no cambiaron desde su ultima reconstruccion se saltan (zonificacion/lote.py).
+# Uso: python3 /home/itoroc/zonas/reconstruir_archivo.py [--database DIR] [--salida DIR] [--procesos N] [--forzar]
+
+import sys
+
+from zonificacion.lote import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# tec_todas.py
+# Mapas de zonificacion de las cuatro tecnicas con una sola carga del CSV (o del almacen
+# .db del procedimiento en curso, ver almacen.py del receptor):
+# /home/itoroc/zonas/mapa_<tecnica>.html (zonificacion/lote.py); si el CSV no cambio
+# desde la ultima vez, no se recalcula nada. Pide los mapas al servicio residente o,
+# si no esta corriendo, los genera aqui.
+# Uso (Node-RED exec): python3 /home/itoroc/zonas/tec_todas.py [--csv RUTA | --procedimiento NOMBRE] [--carpeta DIR] [--local]
+
+import sys
+
+from zonificacion.cli import main_todas
+
+if __name__ == "__main__":
+    sys.exit(main_todas())
@@ -0,0 +1,29 @@
+# zonificacion
+# Paquete con las cuatro tecnicas de zonificacion (tec01..tec04) y su servicio residente
+# - comun: colores por nivel; niveles: CPM -> nivel y RGBA; geodesia: proyeccion a metros
+# - indice: manifiesto incremental de los CSV de /home/itoroc/Database
+# - datos: CSV mas reciente (segun el indice) o almacen .db del receptor, y cache en memoria
+# - cache_columnar: CSV ya parseados en disco (.npy por columna, LRU)
+# - interpolacion: malla en metros, IDW, RBF y raster RGBA por nivel
+# - refinamiento: evaluacion adaptativa (quadtree) de la malla
+# - paralelo: trozos de celdas en hilos; ligero: modo de baja memoria (float32, ejes 1D)
+# - tecnicas: un constructor de mapa folium por tecnica + generar()
+# - piramide: teselas XYZ perezosas del overlay idw/rbf y su servidor HTTP
+# - isobandas: niveles de la malla idw/rbf como poligonos GeoJSON con area (marching squares)
+# - lote: las cuatro tecnicas con una sola carga; reconstruccion del archivo de mapas
+# - servicio: demonio en socket Unix con imports y datos calientes
+# - cli: lo que ejecutan los scripts tec0X_*.py y tec_todas.py (Node-RED exec)
+#
+# Este modulo no importa pandas/numpy/folium: el cliente del servicio debe
+# arrancar rapido; las dependencias pesadas se cargan solo en tecnicas.
+
+RUTA_DATABASE = "/home/itoroc/Database"
+RUTA_ALMACEN = "/home/itoroc/Database/almacen"   # almacen.py del receptor: <procedimiento>.db
+RUTA_ZONAS = "/home/itoroc/zonas"           # el iframe de Node-RED pide /mapa_*.html de aca
+RUTA_HTML = "/home/itoroc/zonas/mapa_zonas.html"
+RUTA_ARCHIVO = "/home/itoroc/zonas/archivo"  # lote.reconstruir: una carpeta por CSV
+RUTA_SOCKET = "/home/itoroc/zonas/zonificacion.sock"
+RUTA_CACHE = "/home/itoroc/zonas/cache"
+RUTA_TESELAS = "/home/itoroc/zonas/teselas"   # piramide: una carpeta por version de los datos
+
+NOMBRES_TECNICAS = ("concentrico", "idw", "rbf", "trayecto")
@@ -0,0 +1,131 @@
+# cache_columnar.py
+# Cache en disco de los CSV ya parseados: una carpeta por version de archivo con un
+# .npy por columna (dtype explicito) y meta.json
+# - clave: ruta real + tamano + mtime_ns; una version nueva del mismo CSV reemplaza a la
+#   anterior (buscar() devuelve la ultima aunque el archivo haya cambiado, para que
+#   datos.cargar lea solo las filas agregadas)
+# - columnas(): np.load(mmap_mode="r"): vistas de solo lectura sobre el page cache,
+#   sin parsear ni copiar; varias tecnicas/procesos comparten las mismas paginas
+# - LRU con presupuesto de disco: cada lectura toca meta.json; guardar() borra las
+#   entradas usadas hace mas tiempo hasta quedar bajo PRESUPUESTO_MB
+# - sin pyarrow (no esta en la Raspberry Pi): .npy de numpy, sin pickle
+# - si la carpeta no se puede escribir, no hay cache en disco (datos.cargar sigue
+#   con la cache en memoria)
+# - RUTA_CACHE y PRESUPUESTO_MB se leen en cada llamada (los bancos de prueba los cambian)
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from . import RUTA_CACHE
+
+PRESUPUESTO_MB = 256
+ARCHIVO_META = "meta.json"
+
+
+def _hash(texto: str) -> str:
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def _prefijo(ruta: str) -> str:
+    return _hash(os.path.realpath(ruta)) + "-"
+
+
+def _nombre(ruta: str, tamano: int, mtime_ns: int) -> str:
+    return _prefijo(ruta) + _hash(f"{tamano}:{mtime_ns}")
+
+
+def _entradas(carpeta: str) -> list:
+    """[(mtime de meta.json, bytes, ruta de la entrada)] de las entradas completas."""
+    salida = []
+    try:
+        with os.scandir(carpeta) as it:
+            for de in it:
+                if not de.is_dir() or de.name.startswith("."):
+                    continue
+                try:
+                    usado = os.stat(os.path.join(de.path, ARCHIVO_META)).st_mtime_ns
+                    total = sum(a.stat().st_size for a in os.scandir(de.path))
+                except OSError:
+                    continue
+                salida.append((usado, total, de.path))
+    except OSError:
+        pass
+    return salida
+
+
+def columnas(entrada: str) -> tuple:
+    """(meta, {columna: array de solo lectura mapeado en memoria}) de una entrada."""
+    with open(os.path.join(entrada, ARCHIVO_META), encoding="utf-8") as f:
+        meta = json.load(f)
+    # np.asarray: ndarray comun (no np.memmap) que sigue apuntando al mapeo
+    cols = {c: np.asarray(np.load(os.path.join(entrada, f"{i}.npy"), mmap_mode="r", allow_pickle=False))
+            for i, c in enumerate(meta["columnas"])}
+    return meta, cols
+
+
+def buscar(ruta: str, carpeta: str | None = None) -> tuple | None:
+    """(meta, columnas) de la ultima version cacheada de `ruta`, o None. meta trae
+    "tamano" y "mtime_ns" de esa version: el llamador decide si sigue valiendo."""
+    carpeta = carpeta or RUTA_CACHE
+    prefijo = _prefijo(ruta)
+    candidatas = [e for e in _entradas(carpeta) if os.path.basename(e[2]).startswith(prefijo)]
+    if not candidatas:
+        return None
+    entrada = max(candidatas)[2]
+    try:
+        meta, cols = columnas(entrada)
+        os.utime(os.path.join(entrada, ARCHIVO_META))      # LRU
+    except (OSError, ValueError, KeyError):
+        return None
+    if meta.get("ruta") != os.path.realpath(ruta):
+        return None
+    return meta, cols
+
+
+def _podar(carpeta: str, presupuesto_mb: float, conservar: str):
+    entradas = sorted(_entradas(carpeta))
+    total = sum(e[1] for e in entradas)
+    for _, tam, entrada in entradas:
+        if total <= presupuesto_mb * 2 ** 20:
+            break
+        if entrada == conservar:
+            continue
+        shutil.rmtree(entrada, ignore_errors=True)
+        total -= tam
+
+
+def guardar(ruta: str, meta: dict, cols: dict, carpeta: str | None = None,
+            presupuesto_mb: float | None = None) -> dict:
+    """Escribe `cols` como la version meta["tamano"], meta["mtime_ns"] de `ruta` y devuelve
+    las columnas mapeadas desde disco (o `cols` tal cual si no se pudo escribir)."""
+    carpeta = carpeta or RUTA_CACHE
+    presupuesto_mb = PRESUPUESTO_MB if presupuesto_mb is None else presupuesto_mb
+    nombre = _nombre(ruta, meta["tamano"], meta["mtime_ns"])
+    entrada = os.path.join(carpeta, nombre)
+    tmp = os.path.join(carpeta, f".{nombre}.{os.getpid()}")
+    meta = dict(meta, ruta=os.path.realpath(ruta), columnas=list(cols))
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        for i, a in enumerate(cols.values()):
+            np.save(os.path.join(tmp, f"{i}.npy"), np.ascontiguousarray(a), allow_pickle=False)
+        with open(os.path.join(tmp, ARCHIVO_META), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        shutil.rmtree(entrada, ignore_errors=True)
+        os.replace(tmp, entrada)
+    except (OSError, ValueError):
+        shutil.rmtree(tmp, ignore_errors=True)
+        return cols
+    # versiones anteriores del mismo CSV ya no sirven
+    prefijo = _prefijo(ruta)
+    for _, _, vieja in _entradas(carpeta):
+        if os.path.basename(vieja).startswith(prefijo) and vieja != entrada:
+            shutil.rmtree(vieja, ignore_errors=True)
+    _podar(carpeta, presupuesto_mb, entrada)
+    try:
+        return columnas(entrada)[1]
+    except (OSError, ValueError, KeyError):
+        return cols
@@ -0,0 +1,72 @@
+# cli.py
+# Entrada comun de los scripts tec0X_*.py y tec_todas.py que ejecuta Node-RED
+# - Si el servicio residente esta corriendo, le delega el pedido (milisegundos)
+# - Si no, genera el mapa en este proceso (arranque en frio, como antes)
+# - tec_todas.py --procedimiento YYYYMMDD_<operacion>: lee el almacen .db del receptor
+#   (RUTA_ALMACEN) en vez de un CSV; si ese procedimiento aun no tiene almacen, el CSV
+#   mas reciente
+
+import argparse
+import os
+import sys
+
+from . import RUTA_ALMACEN, RUTA_HTML, RUTA_SOCKET, RUTA_ZONAS
+from .servicio import solicitar
+
+
+def main(tecnica: str, argv: list | None = None) -> int:
+    ap = argparse.ArgumentParser(description=f"Mapa de zonificacion ({tecnica})")
+    ap.add_argument("--csv", default=None, help="CSV de mediciones (por defecto el mas reciente)")
+    ap.add_argument("--html", default=RUTA_HTML)
+    ap.add_argument("--socket", default=RUTA_SOCKET)
+    ap.add_argument("--local", action="store_true", help="no usar el servicio residente")
+    args = ap.parse_args(argv)
+
+    if not args.local:
+        try:
+            resp = solicitar(tecnica, args.csv, args.html, args.socket)
+        except OSError:
+            resp = None     # servicio no disponible
+        if resp is not None:
+            if not resp.get("ok"):
+                print(f"[ERROR] {resp.get('error')}", file=sys.stderr)
+                return 1
+            print(f"OK Mapa generado: {resp['html']}")
+            return 0
+
+    from .tecnicas import generar
+    ruta_html = generar(tecnica, args.csv, args.html)
+    print(f"OK Mapa generado: {ruta_html}")
+    return 0
+
+
+def main_todas(argv: list | None = None) -> int:
+    """Las cuatro tecnicas con una sola carga del CSV (lote.generar_todas)."""
+    ap = argparse.ArgumentParser(description="Mapas de zonificacion de las cuatro tecnicas")
+    ap.add_argument("--csv", default=None, help="CSV de mediciones o almacen .db (por defecto el CSV mas reciente)")
+    ap.add_argument("--procedimiento", default=None, help="YYYYMMDD_<operacion>: su almacen .db")
+    ap.add_argument("--carpeta", default=RUTA_ZONAS, help="destino de mapa_<tecnica>.html")
+    ap.add_argument("--socket", default=RUTA_SOCKET)
+    ap.add_argument("--local", action="store_true", help="no usar el servicio residente")
+    args = ap.parse_args(argv)
+    if args.procedimiento and not args.csv:
+        ruta = os.path.join(RUTA_ALMACEN, f"{args.procedimiento}.db")
+        args.csv = ruta if os.path.exists(ruta) else None
+
+    if not args.local:
+        try:
+            resp = solicitar("todas", args.csv, args.carpeta, args.socket)
+        except OSError:
+            resp = None     # servicio no disponible
+        if resp is not None:
+            if not resp.get("ok"):
+                print(f"[ERROR] {resp.get('error')}", file=sys.stderr)
+                return 1
+            for ruta_html in resp["html"].values():
+                print(f"OK Mapa generado: {ruta_html}")
+            return 0
+
+    from .lote import generar_todas
+    for ruta_html in generar_todas(args.csv, args.carpeta).values():
+        print(f"OK Mapa generado: {ruta_html}")
+    return 0
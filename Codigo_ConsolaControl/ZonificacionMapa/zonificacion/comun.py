@@ -0,0 +1,19 @@
+# comun.py
+# Colores por nivel, compartidos por las cuatro tecnicas
+# (la clasificacion CPM -> nivel esta en niveles.py, las distancias en geodesia.py)
+
+colormap_int = {
+    0: "#B0B0B0",  # Gris
+    1: "#ADFF2F",  # Verde
+    2: "#FFFF00",  # Amarillo
+    3: "#FFA500",  # Naranja
+    4: "#FF4500",  # Rojo
+    5: "#800080",  # Morado
+}
+nivel_alpha = {0: 0.15, 1: 0.20, 2: 0.30, 3: 0.45, 4: 0.60, 5: 0.75}
+grosor_por_nivel = {1: 0.8, 2: 1.0, 3: 1.5, 4: 2.5, 5: 3.5}
+
+
+def hex_to_rgb255(h):
+    h = h.lstrip("#")
+    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
@@ -0,0 +1,176 @@
+# datos.py
+# Localizacion y carga de mediciones (CSV exportados por Node-RED)
+# - csv_reciente(): el CSV mas nuevo segun indice.py (sin listar la carpeta ni copiarlo)
+# - cargar(): DataFrame con "Nivel" y "Dosis_uSv_h" y dtypes fijos (TIPOS); cada CSV se
+#   parsea una sola vez: las columnas quedan en cache_columnar (disco, entre procesos) y,
+#   en el servicio residente, en memoria mientras el archivo no cambie (ruta + tamano +
+#   mtime); si solo crecio (Node-RED reescribe tabla_datos con filas nuevas al final) se
+#   leen solo las filas agregadas
+# - las columnas numericas del DataFrame son vistas de solo lectura sobre la cache (sin
+#   copia): las tecnicas agregan columnas y reordenan, no escriben en las existentes
+# - tambien carga el almacen SQLite del receptor (<procedimiento>.db en RUTA_ALMACEN,
+#   ver almacen.py): mismas columnas que el CSV; como la tabla es solo-agregar, se recuerda
+#   la ultima fila leida y cada carga pide solo las filas nuevas (WHERE fila > cursor)
+
+import io
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from . import RUTA_DATABASE
+from . import cache_columnar, indice
+from .niveles import niveles
+
+_cache = {}     # ruta -> (meta, columnas, DataFrame)
+
+# Latitud/Longitud quedan en float64: en float32 el paso a -70 grados es ~0.8 m
+TIPOS = {
+    "Registro": np.int32, "Ano": np.int16, "Mes": np.int8, "Dia": np.int8,
+    "Hora": np.int8, "Minuto": np.int8, "Segundo": np.int8,
+    "Latitud": np.float64, "Longitud": np.float64, "Intensidad": np.int16,
+    "CPM": np.int32, "Dosis_uSv_h": np.float32, "Nivel": np.int8,
+}
+
+
+# filas del almacen con las columnas del CSV de Node-RED (fecha/hora ausentes -> 0, como almacen.fila_csv)
+_SQL_ALMACEN = (
+    "SELECT fila, COALESCE(CAST(substr(fecha, 1, 4) AS INTEGER), 0),"
+    " COALESCE(CAST(substr(fecha, 6, 2) AS INTEGER), 0), COALESCE(CAST(substr(fecha, 9, 2) AS INTEGER), 0),"
+    " COALESCE(CAST(substr(hora, 1, 2) AS INTEGER), 0), COALESCE(CAST(substr(hora, 4, 2) AS INTEGER), 0),"
+    " COALESCE(CAST(substr(hora, 7, 2) AS INTEGER), 0), lat, lon, intensidad, cpm, dosis_usv_h"
+    " FROM mediciones WHERE fila > ? ORDER BY fila"
+)
+_COLUMNAS_ALMACEN = ["Registro", "Ano", "Mes", "Dia", "Hora", "Minuto", "Segundo",
+                     "Latitud", "Longitud", "Intensidad", "CPM", "D_uSv_h"]
+
+
+def csv_reciente(carpeta_base: str = RUTA_DATABASE) -> str:
+    return indice.ultimo(carpeta_base)
+
+
+def es_almacen(ruta: str) -> bool:
+    return ruta.endswith(".db")
+
+
+def _tipo(serie: pd.Series, tipo):
+    """`tipo` si los valores caben sin perder nada; si no, float32/int64/texto."""
+    if not pd.api.types.is_numeric_dtype(serie):
+        return str
+    if tipo is None:
+        return np.float64 if pd.api.types.is_float_dtype(serie) else np.int64
+    if np.issubdtype(tipo, np.integer):
+        if not pd.api.types.is_integer_dtype(serie):
+            return np.float32 if tipo != np.int64 else np.float64
+        info = np.iinfo(tipo)
+        if len(serie) and (serie.min() < info.min or serie.max() > info.max):
+            return np.int64
+    return tipo
+
+
+def _tipar(df: pd.DataFrame) -> dict:
+    """{columna: array numpy} con los dtypes de TIPOS (texto como unicode de ancho fijo,
+    .npy sin pickle)."""
+    if "D_uSv_h" in df.columns:
+        df = df.rename(columns={"D_uSv_h": "Dosis_uSv_h"})
+    cols = {}
+    for c in df.columns:
+        t = _tipo(df[c], TIPOS.get(c))
+        cols[c] = df[c].astype(str).to_numpy(dtype=str) if t is str else df[c].to_numpy(dtype=t)
+    cols["Nivel"] = niveles(df["CPM"]).astype(np.int8)
+    return cols
+
+
+def _marco(cols: dict) -> pd.DataFrame:
+    df = pd.DataFrame(cols, copy=False)
+    df["Tipo"] = "Sensor"
+    return df
+
+
+def _preparar(df: pd.DataFrame) -> pd.DataFrame:
+    """DataFrame leido con read_csv -> el que devuelve cargar()."""
+    return _marco(_tipar(df))
+
+
+def _leer(ruta: str, tamano: int) -> tuple:
+    """(meta, columnas) de los primeros `tamano` bytes de `ruta`."""
+    with open(ruta, "rb") as f:
+        crudo = f.read(tamano)
+        huella = indice.huella(f, len(crudo))
+    cabecera = crudo[:crudo.find(b"\n") + 1] if b"\n" in crudo else crudo
+    meta = {"huella": huella, "cabecera": cabecera.decode("utf-8")}
+    return meta, _tipar(pd.read_csv(io.BytesIO(crudo)))
+
+
+def _leer_agregado(ruta: str, tamano: int, meta: dict, cols: dict) -> tuple:
+    """Filas entre los bytes meta["tamano"] y `tamano`, parseadas con la cabecera guardada
+    y agregadas a `cols`."""
+    desde = meta["tamano"]
+    with open(ruta, "rb") as f:
+        f.seek(desde)
+        nuevo = f.read(tamano - desde)
+        huella = indice.huella(f, desde + len(nuevo))
+    meta = {"huella": huella, "cabecera": meta["cabecera"]}
+    if not nuevo.strip():
+        return meta, cols
+    extra = _tipar(pd.read_csv(io.BytesIO(meta["cabecera"].encode("utf-8") + nuevo.lstrip(b"\r\n"))))
+    if extra.keys() != cols.keys() or any(extra[c].dtype.kind != cols[c].dtype.kind for c in cols):
+        return None
+    return meta, {c: np.concatenate([cols[c], extra[c]]) for c in cols}
+
+
+def _columnas(ruta: str, st, previa: tuple | None) -> tuple:
+    """(meta, columnas) al dia de `ruta`, partiendo de la version en memoria o en disco."""
+    if previa is None:
+        previa = cache_columnar.buscar(ruta)
+    nuevo = None
+    if previa is not None:
+        meta, cols = previa
+        if (meta["tamano"], meta["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return previa
+        if st.st_size > meta["tamano"] and indice.anexado(ruta, meta["tamano"], meta["huella"]):
+            nuevo = _leer_agregado(ruta, st.st_size, meta, cols)
+    if nuevo is None:
+        nuevo = _leer(ruta, st.st_size)
+    meta, cols = nuevo
+    meta.update(tamano=st.st_size, mtime_ns=st.st_mtime_ns)
+    return meta, cache_columnar.guardar(ruta, meta, cols)
+
+
+def _cargar_almacen(ruta: str) -> pd.DataFrame:
+    st = os.stat(ruta)
+    hit = _cache.get(ruta)
+    if hit is not None and hit[0]["ino"] != st.st_ino:
+        hit = None          # procedimiento borrado y vuelto a crear
+    desde = hit[0]["fila"] if hit is not None else 0
+    db = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+    try:
+        filas = db.execute(_SQL_ALMACEN, (desde,)).fetchall()
+    finally:
+        db.close()
+    if hit is None and not filas:
+        raise ValueError(f"{ruta}: el almacen aun no tiene mediciones")
+    if filas:
+        extra = _tipar(pd.DataFrame(filas, columns=_COLUMNAS_ALMACEN))
+        cols = extra if hit is None else {c: np.concatenate([hit[1][c], extra[c]]) for c in hit[1]}
+        meta = {"fila": filas[-1][0] if filas else desde, "ino": st.st_ino}
+        hit = (meta, cols, _marco(cols))
+        _cache.clear()
+        _cache[ruta] = hit
+    return hit[2].copy(deep=False)
+
+
+def cargar(ruta: str) -> pd.DataFrame:
+    """DataFrame de `ruta` (CSV o almacen .db); copia superficial: agregar columnas o
+    reordenar no toca la cache."""
+    if es_almacen(ruta):
+        return _cargar_almacen(ruta)
+    st = os.stat(ruta)
+    hit = _cache.get(ruta)
+    if hit is None or (hit[0]["tamano"], hit[0]["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+        meta, cols = _columnas(ruta, st, hit[:2] if hit is not None else None)
+        hit = (meta, cols, _marco(cols))
+        _cache.clear()      # un procedimiento a la vez: no acumular archivos viejos
+        _cache[ruta] = hit
+    return hit[2].copy(deep=False)
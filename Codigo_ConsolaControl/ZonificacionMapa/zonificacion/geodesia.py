@@ -0,0 +1,67 @@
+# geodesia.py
+# Proyeccion local a metros (ENU: este, norte) sobre el elipsoide WGS84, vectorizada
+# - ProyeccionLocal(lat0, lon0): plano tangente en el origen (normalmente el foco);
+#   lat/lon -> ECEF -> ENU con numpy, sin llamadas por punto
+# - la distancia horizontal en ese plano difiere de la geodesica en < 0.01 mm a 1 km y
+#   ~1 mm a 5 km (un procedimiento cubre cientos de metros); 111000 m/grado sin cos(lat)
+#   estira E-O un 20 % en Santiago
+# - latlon(): inversa (ENU -> ECEF -> geodesicas, Bowring), para mallas en metros
+# La usan los radios y la distancia al foco de tecnicas, los pesos IDW/RBF, el IDW
+# en vivo y los datos sinteticos.
+
+import math
+
+import numpy as np
+
+A_WGS84 = 6378137.0
+F_WGS84 = 1.0 / 298.257223563
+E2 = F_WGS84 * (2.0 - F_WGS84)              # excentricidad^2
+B_WGS84 = A_WGS84 * (1.0 - F_WGS84)
+EP2 = E2 / (1.0 - E2)                       # segunda excentricidad^2
+
+
+def _ecef(lat, lon):
+    """lat/lon en grados (h = 0) -> X, Y, Z en metros."""
+    fi, la = np.radians(lat), np.radians(lon)
+    s, c = np.sin(fi), np.cos(fi)
+    n = A_WGS84 / np.sqrt(1.0 - E2 * s * s)
+    return n * c * np.cos(la), n * c * np.sin(la), n * (1.0 - E2) * s
+
+
+class ProyeccionLocal:
+    def __init__(self, lat0: float, lon0: float):
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        fi, la = math.radians(self.lat0), math.radians(self.lon0)
+        self._sf, self._cf = math.sin(fi), math.cos(fi)
+        self._sl, self._cl = math.sin(la), math.cos(la)
+        self._o = _ecef(self.lat0, self.lon0)
+
+    @classmethod
+    def centrada(cls, lats, lons) -> "ProyeccionLocal":
+        """Origen en el centro del rectangulo envolvente de las muestras."""
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        return cls((lats.min() + lats.max()) / 2.0, (lons.min() + lons.max()) / 2.0)
+
+    def enu(self, lats, lons) -> tuple:
+        """(este, norte) en metros; acepta escalares o arrays de cualquier forma."""
+        x, y, z = _ecef(np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))
+        dx, dy, dz = x - self._o[0], y - self._o[1], z - self._o[2]
+        e = -self._sl * dx + self._cl * dy
+        n = -self._sf * self._cl * dx - self._sf * self._sl * dy + self._cf * dz
+        return e, n
+
+    def distancia(self, lats, lons):
+        """Distancia horizontal en metros desde el origen."""
+        return np.hypot(*self.enu(lats, lons))
+
+    def latlon(self, e, n) -> tuple:
+        """Inversa de enu() (punto del plano tangente, u = 0) -> (lat, lon) en grados."""
+        e, n = np.asarray(e, dtype=float), np.asarray(n, dtype=float)
+        x = self._o[0] - self._sl * e - self._sf * self._cl * n
+        y = self._o[1] + self._cl * e - self._sf * self._sl * n
+        z = self._o[2] + self._cf * n
+        p = np.hypot(x, y)
+        t = np.arctan2(z * A_WGS84, p * B_WGS84)
+        fi = np.arctan2(z + EP2 * B_WGS84 * np.sin(t) ** 3, p - E2 * A_WGS84 * np.cos(t) ** 3)
+        return np.degrees(fi), np.degrees(np.arctan2(y, x))
@@ -0,0 +1,196 @@
+# idw.py
+# IDW limitado a vecinos: los k mas cercanos y/o los que estan dentro de un radio, potencia p
+# - IndiceMalla: cubetas uniformes (numpy puro); funciona sin scipy, como el IDW original
+# - Con scipy se puede usar cKDTree para k vecinos (mismo resultado, menos Python con N grande),
+#   en trozos de celdas repartidos en hilos (paralelo.por_trozos)
+# - k=None y radio=None: todas las muestras, identico a interpolacion.idw (denso)
+# - Celdas sin ninguna muestra dentro del radio quedan en `sin_datos` (NaN: transparente)
+# Distancias en las unidades de las coordenadas (los mapas pasan metros de geodesia.ProyeccionLocal).
+
+import math
+
+import numpy as np
+
+from .paralelo import por_trozos
+
+try:
+    from scipy.spatial import cKDTree
+    KDTREE_OK = True
+except Exception:
+    KDTREE_OK = False
+
+EPS = 1e-12
+K_DEFECTO = 64          # vecinos por celda en los mapas; con N <= K es el IDW denso
+OCUPACION = 8           # muestras por cubeta objetivo del indice
+
+
+class IndiceMalla:
+    """Muestras agrupadas por cubeta cuadrada de lado `celda` (formato CSR: orden + inicio)."""
+
+    def __init__(self, xs, ys, celda: float):
+        self.xs = xs
+        self.ys = ys
+        self.celda = celda
+        self.x0 = float(xs.min())
+        self.y0 = float(ys.min())
+        ix = ((xs - self.x0) / celda).astype(np.int64)
+        iy = ((ys - self.y0) / celda).astype(np.int64)
+        self.nx = int(ix.max()) + 1
+        self.ny = int(iy.max()) + 1
+        clave = iy * self.nx + ix
+        self.orden = np.argsort(clave, kind="stable")
+        self.inicio = np.searchsorted(clave[self.orden], np.arange(self.nx * self.ny + 1))
+
+    @classmethod
+    def para(cls, xs, ys, k: int | None, radio: float | None) -> "IndiceMalla":
+        """Tamano de cubeta: ~max(k/2, OCUPACION) muestras por cubeta, o el radio si solo hay radio."""
+        if k is None and radio is None:
+            raise ValueError("indice 'malla' requiere k o radio (sin ambos es el IDW denso)")
+        n = len(xs)
+        area = max(float(np.ptp(xs)), 1e-9) * max(float(np.ptp(ys)), 1e-9)
+        minima = math.sqrt(area / (4.0 * n))             # no mas de ~4N cubetas
+        if k is not None:
+            celda = math.sqrt(area * max(k / 2.0, OCUPACION) / n)
+        else:
+            celda = radio
+        return cls(xs, ys, max(celda, minima))
+
+    def celda_de(self, x, y) -> tuple:
+        cx = np.clip(((x - self.x0) / self.celda).astype(np.int64), 0, self.nx - 1)
+        cy = np.clip(((y - self.y0) / self.celda).astype(np.int64), 0, self.ny - 1)
+        return cx, cy
+
+    def bloque(self, cx: int, cy: int, r: int) -> tuple:
+        """Indices de las muestras en las cubetas [cx-r, cx+r] x [cy-r, cy+r] y limites del bloque."""
+        ax, bx = max(cx - r, 0), min(cx + r, self.nx - 1)
+        ay, by = max(cy - r, 0), min(cy + r, self.ny - 1)
+        partes = [self.orden[self.inicio[fy * self.nx + ax]:self.inicio[fy * self.nx + bx + 1]]
+                  for fy in range(ay, by + 1)]
+        return np.concatenate(partes), (ax, bx, ay, by)
+
+    def cota(self, qx, qy, lim: tuple):
+        """Distancia minima de cada consulta a una muestra fuera del bloque (inf si el bloque cubre todo)."""
+        ax, bx, ay, by = lim
+        c = np.full(qx.shape, np.inf)
+        if ax > 0:
+            c = np.minimum(c, qx - (self.x0 + ax * self.celda))
+        if bx < self.nx - 1:
+            c = np.minimum(c, self.x0 + (bx + 1) * self.celda - qx)
+        if ay > 0:
+            c = np.minimum(c, qy - (self.y0 + ay * self.celda))
+        if by < self.ny - 1:
+            c = np.minimum(c, self.y0 + (by + 1) * self.celda - qy)
+        return c
+
+
+def _ponderar(d, v, p: float, sin_datos: float):
+    """d: distancias (nq, m) con inf para los que no cuentan; v: valores (nq, m) o (m,)."""
+    w = 1.0 / np.power(d + EPS, p)
+    num = (w * v).sum(axis=1)
+    den = w.sum(axis=1)
+    z = num / (den + EPS)
+    z[den == 0] = sin_datos
+    return z
+
+
+def _idw_malla(xs, ys, vals, qx, qy, p, k, radio, sin_datos):
+    ind = IndiceMalla.para(xs, ys, k, radio)
+    n = len(xs)
+    z = np.empty(qx.shape[0])
+    cx, cy = ind.celda_de(qx, qy)
+    clave = cy * ind.nx + cx
+    orden = np.argsort(clave, kind="stable")
+    cortes = np.flatnonzero(np.diff(clave[orden])) + 1
+    r_radio = math.ceil(radio / ind.celda) if radio is not None else None
+
+    for grupo in np.split(orden, cortes):
+        gx, gy = qx[grupo], qy[grupo]
+        c0x, c0y = int(cx[grupo[0]]), int(cy[grupo[0]])
+        r = 1 if k is not None or r_radio is None else r_radio
+        while True:
+            cand, lim = ind.bloque(c0x, c0y, r)
+            cubre_todo = lim == (0, ind.nx - 1, 0, ind.ny - 1)
+            dx = gx[:, None] - xs[cand][None, :]
+            dy = gy[:, None] - ys[cand][None, :]
+            d = np.sqrt(dx*dx + dy*dy)
+            if radio is not None:
+                d[d > radio] = np.inf
+            if cubre_todo:
+                break
+            cota = ind.cota(gx, gy, lim)
+            if k is None:
+                # solo radio: basta que nada fuera del bloque este a menos de `radio`
+                if np.all(cota >= radio):
+                    break
+            elif len(cand) >= min(k, n):
+                dk = np.partition(d, min(k, len(cand)) - 1, axis=1)[:, min(k, len(cand)) - 1]
+                if radio is not None:
+                    dk = np.minimum(dk, radio)
+                if np.all(dk <= cota):
+                    break
+            elif r_radio is not None and r >= r_radio and np.all(cota >= radio):
+                break
+            r *= 2
+
+        v = vals[cand]
+        if k is not None and k < len(cand):
+            sel = np.argpartition(d, k - 1, axis=1)[:, :k]
+            d = np.take_along_axis(d, sel, axis=1)
+            v = v[sel]
+        z[grupo] = _ponderar(d, v, p, sin_datos)
+    return z
+
+
+def _idw_kdtree(xs, ys, vals, qx, qy, p, k, radio, sin_datos, presupuesto_mb=None, hilos=None):
+    arbol = cKDTree(np.column_stack([xs, ys]))
+    k = min(k, len(xs))
+    vext = np.append(vals, 0.0)                 # i == N: no hay vecino (d == inf)
+    cota = np.inf if radio is None else radio
+
+    def trozo(tx, ty):
+        d, i = arbol.query(np.column_stack([tx, ty]), k=k, distance_upper_bound=cota)
+        if k == 1:
+            d, i = d[:, None], i[:, None]
+        return _ponderar(d, vext[i], p, sin_datos)
+
+    # d, i, v, w y productos: ~6 arrays de k elementos por consulta
+    return por_trozos(trozo, qx, qy, 48 * k, presupuesto_mb, hilos)
+
+
+def idw_vecinos(lats, lons, vals, Lat, Lon, p: float = 2.0, k: int | None = K_DEFECTO,
+                radio: float | None = None, indice: str = "auto", sin_datos: float = np.nan,
+                presupuesto_mb: float | None = None, hilos: int | None = None):
+    """IDW de las muestras sobre las consultas (Lat, Lon, cualquier forma); devuelve Z con esa forma.
+    indice: "auto" (denso si se usan todas las muestras; kdtree si hay scipy y k; si no malla),
+    "denso", "malla" o "kdtree". presupuesto_mb/hilos: ver paralelo.por_trozos (denso y kdtree;
+    la malla es un bucle Python por cubeta y corre en un hilo)."""
+    from .interpolacion import idw as idw_denso
+
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    vals = np.asarray(vals, dtype=float)
+    todas = (k is None or k >= len(vals)) and radio is None
+    if indice == "auto":
+        if todas:
+            indice = "denso"
+        elif k is not None and KDTREE_OK:
+            indice = "kdtree"
+        else:
+            indice = "malla"
+
+    if indice == "denso":
+        if not todas:
+            raise ValueError("indice 'denso' usa todas las muestras (k=None, radio=None)")
+        return idw_denso(lats, lons, vals, Lat, Lon, p=p, presupuesto_mb=presupuesto_mb, hilos=hilos)
+
+    qx = np.asarray(Lat, dtype=float).ravel()
+    qy = np.asarray(Lon, dtype=float).ravel()
+    if indice == "kdtree":
+        if k is None:
+            raise ValueError("indice 'kdtree' requiere k")
+        z = _idw_kdtree(lats, lons, vals, qx, qy, p, k, radio, sin_datos, presupuesto_mb, hilos)
+    elif indice == "malla":
+        z = _idw_malla(lats, lons, vals, qx, qy, p, k, radio, sin_datos)
+    else:
+        raise ValueError(f"indice desconocido: {indice!r}")
+    return z.reshape(np.shape(Lat))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# idw_vivo.py
+# Mapa de calor IDW en vivo, actualizado trama a trama (sin recalcular la malla)
+# - AcumuladorIDW guarda dos mallas: numerador sum(w*cpm) y denominador sum(w);
+#   cada lectura suma su aporte solo dentro de su radio de influencia
+#   (costo por trama ~ (2*radio/celda)^2, independiente de cuantas lecturas haya)
+# - Malla metrica (ENU de geodesia, origen en el primer punto): crecer = copiar con
+#   desplazamiento entero; si supera MAX_CELDAS por lado se re-ancla alrededor de lo nuevo (se pierde lo lejano)
+# - Z = num/den es exactamente idw.idw_vecinos(k=None, radio=radio_m) en los centros de celda
+# - main(): servicio MQTT que escucha dispositivos/+/json (receptor.py) y publica el
+#   overlay PNG en TOPIC_OVERLAY a lo sumo cada PERIODO_S
+#
+# Uso: python3 -m zonificacion.idw_vivo [--broker localhost] [--celda 1.0] [--radio 25]
+
+import argparse
+import base64
+import json
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .geodesia import ProyeccionLocal
+from .idw import EPS
+
+CELDA_M = 1.0           # lado de celda
+RADIO_M = 25.0          # radio de influencia de cada lectura
+MARGEN_CELDAS = 64      # al crecer se agrega este margen para no realocar en cada trama
+MAX_CELDAS = 1024       # por lado (~8 MB por malla float64)
+
+TOPIC_ENTRADA = "dispositivos/+/json"
+TOPIC_OVERLAY = "consola/zonas/idw_vivo"
+TOPIC_PROCEDIMIENTO = "consola/procedimiento"   # retenido, igual que en DetectorRemoto.py
+PERIODO_S = 2.0
+
+
+class AcumuladorIDW:
+    def __init__(self, celda_m: float = CELDA_M, radio_m: float = RADIO_M, p: float = 2.0,
+                 max_celdas: int = MAX_CELDAS, margen_celdas: int = MARGEN_CELDAS):
+        self.celda = celda_m
+        self.radio = radio_m
+        self.p = p
+        self.max_celdas = max_celdas
+        self.margen = margen_celdas
+        self.r = int(math.ceil(radio_m / celda_m))
+        self.proy = None            # ProyeccionLocal en el primer punto: la celda (0, 0) tiene su esquina ahi
+        self.num = None
+        self.den = None
+        self.ix0 = self.iy0 = 0     # celda (respecto del origen) de num[0, 0]
+        self.n = 0
+        self.reanclajes = 0
+        self.version = 0            # cambia con cada lectura (para publicar solo si hay novedades)
+        self.valores = deque(maxlen=4096)   # CPM recientes: recorte por percentiles del raster
+
+    # ---- coordenadas ----
+    def xy(self, lat, lon) -> tuple:
+        return self.proy.enu(lat, lon)
+
+    def latlon(self, x, y) -> tuple:
+        return self.proy.latlon(x, y)
+
+    @property
+    def forma(self) -> tuple:
+        return (0, 0) if self.num is None else self.num.shape
+
+    # ---- crecimiento / re-anclaje ----
+    def _eje(self, a: int, b: int, i0: int, n: int) -> tuple:
+        """Rango [lo, hi] de celdas en un eje que cubre [a, b], creciendo con margen."""
+        m = self.margen
+        if self.num is None:
+            return a - m, b + m
+        lo = a - m if a < i0 else i0
+        hi = b + m if b >= i0 + n else i0 + n - 1
+        if hi - lo + 1 > self.max_celdas:
+            # re-anclaje: ventana de max_celdas con margen por delante; se conserva lo
+            # mas posible de lo anterior y el proximo re-anclaje llega tras `m` celdas
+            self.reanclajes += 1
+            if b >= i0 + n:
+                hi = b + m
+                lo = hi - self.max_celdas + 1
+            else:
+                lo = a - m
+                hi = lo + self.max_celdas - 1
+        return lo, hi
+
+    def _asegurar(self, ax: int, ay: int, bx: int, by: int):
+        """Garantiza que las celdas [ax, bx] x [ay, by] (inclusive) esten en la malla."""
+        ny, nx = self.forma
+        if self.num is not None and ax >= self.ix0 and ay >= self.iy0 and bx < self.ix0 + nx and by < self.iy0 + ny:
+            return
+        nx0, nx1 = self._eje(ax, bx, self.ix0, nx)
+        ny0, ny1 = self._eje(ay, by, self.iy0, ny)
+
+        num = np.zeros((ny1 - ny0 + 1, nx1 - nx0 + 1))
+        den = np.zeros_like(num)
+        if self.num is not None:
+            # interseccion vieja/nueva, en celdas absolutas
+            cx0, cx1 = max(nx0, self.ix0), min(nx1, self.ix0 + nx - 1)
+            cy0, cy1 = max(ny0, self.iy0), min(ny1, self.iy0 + ny - 1)
+            if cx0 <= cx1 and cy0 <= cy1:
+                dst = (slice(cy0 - ny0, cy1 - ny0 + 1), slice(cx0 - nx0, cx1 - nx0 + 1))
+                src = (slice(cy0 - self.iy0, cy1 - self.iy0 + 1), slice(cx0 - self.ix0, cx1 - self.ix0 + 1))
+                num[dst] = self.num[src]
+                den[dst] = self.den[src]
+        self.num, self.den = num, den
+        self.ix0, self.iy0 = nx0, ny0
+
+    # ---- camino por trama ----
+    def agregar(self, lat: float, lon: float, cpm: float):
+        if self.proy is None:
+            self.proy = ProyeccionLocal(lat, lon)
+        x, y = self.xy(lat, lon)
+        cx, cy = math.floor(x / self.celda), math.floor(y / self.celda)
+        r = self.r
+        self._asegurar(cx - r, cy - r, cx + r, cy + r)
+
+        xs = (np.arange(cx - r, cx + r + 1) + 0.5) * self.celda - x
+        ys = (np.arange(cy - r, cy + r + 1) + 0.5) * self.celda - y
+        d = np.sqrt(ys[:, None] ** 2 + xs[None, :] ** 2)
+        w = np.where(d <= self.radio, 1.0 / np.power(d + EPS, self.p), 0.0)
+
+        sy = slice(cy - r - self.iy0, cy + r + 1 - self.iy0)
+        sx = slice(cx - r - self.ix0, cx + r + 1 - self.ix0)
+        self.num[sy, sx] += w * cpm
+        self.den[sy, sx] += w
+        self.n += 1
+        self.version += 1
+        self.valores.append(cpm)
+
+    # ---- salida ----
+    def raster(self) -> np.ndarray:
+        """Z[fila, col] con la fila 0 al sur (y creciente); NaN donde no llega ninguna lectura."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = self.num / (self.den + EPS)
+        z[self.den == 0] = np.nan
+        return z
+
+    def limites(self) -> tuple:
+        """(lat_min, lat_max, lon_min, lon_max) de los bordes de la malla."""
+        ny, nx = self.forma
+        lat_min, lon_min = self.latlon(self.ix0 * self.celda, self.iy0 * self.celda)
+        lat_max, lon_max = self.latlon((self.ix0 + nx) * self.celda, (self.iy0 + ny) * self.celda)
+        return lat_min, lat_max, lon_min, lon_max
+
+    def imagen(self) -> np.ndarray:
+        """RGBA por nivel, fila 0 al norte (como ImageOverlay de folium / worldmap)."""
+        from .interpolacion import raster_niveles
+        return raster_niveles(np.flipud(self.raster()), np.asarray(self.valores, dtype=float))
+
+    def overlay(self) -> dict:
+        from branca.utilities import write_png
+        lat_min, lat_max, lon_min, lon_max = self.limites()
+        png = write_png(self.imagen())
+        return {
+            "n": self.n,
+            "bounds": [[lat_min, lon_min], [lat_max, lon_max]],
+            "png": "data:image/png;base64," + base64.b64encode(png).decode("ascii"),
+        }
+
+
+def main():
+    import paho.mqtt.client as mqtt
+
+    ap = argparse.ArgumentParser(description="IDW en vivo: dispositivos/+/json -> overlay PNG por MQTT")
+    ap.add_argument("--broker", default="localhost")
+    ap.add_argument("--celda", type=float, default=CELDA_M, help="lado de celda en metros")
+    ap.add_argument("--radio", type=float, default=RADIO_M, help="radio de influencia en metros")
+    ap.add_argument("--periodo", type=float, default=PERIODO_S, help="segundos minimos entre publicaciones")
+    args = ap.parse_args()
+
+    acum = AcumuladorIDW(args.celda, args.radio)
+    lock = threading.Lock()
+    procedimiento = None
+    publicada = -1
+
+    def on_connect(client, userdata, flags, rc, *a):
+        if rc == 0:
+            client.subscribe(TOPIC_ENTRADA)
+            client.subscribe(TOPIC_PROCEDIMIENTO)
+
+    def on_message(client, userdata, msg):
+        nonlocal acum, procedimiento, publicada
+        if msg.topic == TOPIC_PROCEDIMIENTO:
+            # el broker repite el retenido en cada reconexion: solo un nombre distinto vacia el mapa
+            nombre = msg.payload.decode("utf-8", "replace").strip()
+            with lock:
+                if procedimiento is not None and nombre != procedimiento:
+                    acum = AcumuladorIDW(args.celda, args.radio)
+                    publicada = -1
+                procedimiento = nombre
+            return
+        try:
+            r = json.loads(msg.payload)
+            lat, lon, cpm = float(r["lat"]), float(r["lon"]), float(r["cpm"])
+        except (ValueError, KeyError, TypeError):
+            return
+        with lock:
+            acum.agregar(lat, lon, cpm)
+
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
+    client.connect_async(args.broker, 1883, 60)
+    client.loop_start()
+    print(f"[ZONAS] IDW en vivo: {TOPIC_ENTRADA} -> {TOPIC_OVERLAY} (celda {args.celda} m, radio {args.radio} m)")
+
+    try:
+        while True:
+            time.sleep(args.periodo)
+            with lock:
+                if acum.version == publicada or acum.n == 0:
+                    continue
+                publicada = acum.version
+                t0 = time.perf_counter()
+                carga = acum.overlay()
+            carga["ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            client.publish(TOPIC_OVERLAY, json.dumps(carga), qos=0, retain=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.loop_stop()
+
+
+if __name__ == "__main__":
+    main()
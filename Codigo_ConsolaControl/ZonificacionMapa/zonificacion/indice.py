@@ -0,0 +1,184 @@
+# indice.py
+# Indice (manifiesto) de los CSV de procedimientos en /home/itoroc/Database
+# - .indice.json en la misma carpeta: por archivo, mtime/tamano, filas, bbox, inicio/fin
+#   (hora GPS del CSV), CPM maximo y hasta donde se leyo (offset + huella)
+# - actualizar(): incremental; un archivo sin cambios no se abre, uno que solo crecio
+#   (Node-RED reescribe tabla_datos completa, que solo agrega filas) se lee desde el
+#   offset anterior, el resto se relee entero; los borrados salen del indice
+# - anexado(): el archivo conserva los primeros `tamano` bytes? (huella de cabeza y cola,
+#   sin releer el medio); datos.cargar lo usa para leer solo las filas nuevas
+# - ultimo(): CSV mas nuevo segun el indice, sin copiarlo a YYYYMMDD_Actual.csv
+# - solo biblioteca estandar: lo ejecuta Node-RED ("Historial de Procedimientos")
+#
+# Uso: python3 -m zonificacion.indice [carpeta]   -> lista JSON para la tabla de Node-RED
+
+import csv
+import io
+import json
+import os
+import sys
+import zlib
+
+from . import RUTA_DATABASE
+
+ARCHIVO_INDICE = ".indice.json"
+VERSION = 1
+CABEZA_BYTES = 4096
+COLA_BYTES = 256
+_CAMPOS_TIEMPO = ("Ano", "Mes", "Dia", "Hora", "Minuto", "Segundo")
+
+
+def huella(f, tamano: int) -> list:
+    """[crc32 de los primeros CABEZA_BYTES, crc32 de los COLA_BYTES previos a `tamano`]."""
+    f.seek(0)
+    cabeza = zlib.crc32(f.read(min(CABEZA_BYTES, tamano)))
+    f.seek(max(0, tamano - COLA_BYTES))
+    cola = zlib.crc32(f.read(min(COLA_BYTES, tamano)))
+    return [cabeza, cola]
+
+
+def anexado(ruta: str, tamano: int, huella_previa: list) -> bool:
+    """True si `ruta` empieza con los mismos `tamano` bytes que cuando se tomo `huella_previa`
+    (salvo cambios en el medio que no toquen cabeza ni cola: Node-RED no edita filas)."""
+    try:
+        with open(ruta, "rb") as f:
+            if os.fstat(f.fileno()).st_size < tamano:
+                return False
+            return huella(f, tamano) == huella_previa
+    except OSError:
+        return False
+
+
+def _nueva(cabecera: list) -> dict:
+    return {"columnas": cabecera, "filas": 0, "lat_min": None, "lat_max": None, "lon_min": None,
+            "lon_max": None, "inicio": None, "fin": None, "cpm_max": None}
+
+
+def _acumular(e: dict, texto: str):
+    """Suma a la entrada `e` las filas de `texto` (lineas CSV completas, sin cabecera)."""
+    col = {c: i for i, c in enumerate(e["columnas"])}
+    i_lat, i_lon, i_cpm = col.get("Latitud"), col.get("Longitud"), col.get("CPM")
+    i_t = [col[c] for c in _CAMPOS_TIEMPO] if all(c in col for c in _CAMPOS_TIEMPO) else None
+    for fila in csv.reader(io.StringIO(texto)):
+        if not fila:
+            continue
+        e["filas"] += 1
+        try:
+            lat, lon = float(fila[i_lat]), float(fila[i_lon])
+            e["lat_min"] = lat if e["lat_min"] is None else min(e["lat_min"], lat)
+            e["lat_max"] = lat if e["lat_max"] is None else max(e["lat_max"], lat)
+            e["lon_min"] = lon if e["lon_min"] is None else min(e["lon_min"], lon)
+            e["lon_max"] = lon if e["lon_max"] is None else max(e["lon_max"], lon)
+        except (TypeError, ValueError, IndexError):
+            pass
+        try:
+            cpm = float(fila[i_cpm])
+            e["cpm_max"] = cpm if e["cpm_max"] is None else max(e["cpm_max"], cpm)
+        except (TypeError, ValueError, IndexError):
+            pass
+        if i_t is not None:
+            try:
+                a, me, d, h, mi, s = (int(float(fila[i])) for i in i_t)
+            except (ValueError, IndexError):
+                continue
+            t = f"{a:04d}-{me:02d}-{d:02d} {h:02d}:{mi:02d}:{s:02d}"
+            e["inicio"] = t if e["inicio"] is None else min(e["inicio"], t)
+            e["fin"] = t if e["fin"] is None else max(e["fin"], t)
+
+
+def _leer_entrada(ruta: str, st, previa: dict | None) -> dict:
+    with open(ruta, "rb") as f:
+        if previa is not None and st.st_size > previa["offset"] and \
+                huella(f, previa["offset"]) == previa["huella"]:
+            e = dict(previa)
+            f.seek(previa["offset"])
+        else:
+            f.seek(0)
+            cabecera = f.readline().decode("utf-8", "replace").strip().lstrip("\ufeff")
+            e = _nueva(next(csv.reader([cabecera]), []))
+        inicio = f.tell()
+        resto = f.read(st.st_size - inicio)
+    # la ultima linea cuenta aunque no tenga \n (Node-RED no la pone); al crecer el archivo
+    # lo siguiente empieza con "\n"
+    _acumular(e, resto.decode("utf-8", "replace"))
+    e["offset"] = inicio + len(resto)
+    with open(ruta, "rb") as f:
+        e["huella"] = huella(f, e["offset"])
+    e["tamano"] = st.st_size
+    e["mtime_ns"] = st.st_mtime_ns
+    return e
+
+
+def cargar_indice(carpeta: str = RUTA_DATABASE) -> dict:
+    try:
+        with open(os.path.join(carpeta, ARCHIVO_INDICE), encoding="utf-8") as f:
+            indice = json.load(f)
+        if indice.get("version") == VERSION:
+            return indice["archivos"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def _guardar(carpeta: str, archivos: dict):
+    ruta = os.path.join(carpeta, ARCHIVO_INDICE)
+    tmp = ruta + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION, "archivos": archivos}, f, separators=(",", ":"))
+        os.replace(tmp, ruta)
+    except OSError:
+        pass        # carpeta de solo lectura: el indice queda en memoria para este proceso
+
+
+def actualizar(carpeta: str = RUTA_DATABASE) -> dict:
+    """Indice al dia {nombre: entrada}; solo abre los CSV nuevos o modificados."""
+    previo = cargar_indice(carpeta)
+    archivos = {}
+    cambio = False
+    with os.scandir(carpeta) as it:
+        for de in it:
+            if not de.name.endswith(".csv") or not de.is_file():
+                continue
+            st = de.stat()
+            p = previo.get(de.name)
+            if p is not None and p["mtime_ns"] == st.st_mtime_ns and p["tamano"] == st.st_size:
+                archivos[de.name] = p
+                continue
+            try:
+                archivos[de.name] = _leer_entrada(de.path, st, p)
+            except OSError:
+                continue
+            cambio = True
+    if cambio or archivos.keys() != previo.keys():
+        _guardar(carpeta, archivos)
+    return archivos
+
+
+def ultimo(carpeta: str = RUTA_DATABASE) -> str:
+    """Ruta del CSV modificado mas recientemente."""
+    archivos = actualizar(carpeta)
+    if not archivos:
+        raise FileNotFoundError("No se encontraron archivos CSV en la carpeta.")
+    nombre = max(archivos, key=lambda n: (archivos[n]["mtime_ns"], n))
+    return os.path.join(carpeta, nombre)
+
+
+def main(argv: list | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    carpeta = argv[0] if argv else RUTA_DATABASE
+    archivos = actualizar(carpeta)
+    salida = []
+    for nombre in sorted(archivos):
+        e = archivos[nombre]
+        salida.append({
+            "archivo": nombre, "ruta": os.path.join(carpeta, nombre), "filas": e["filas"],
+            "inicio": e["inicio"], "fin": e["fin"], "cpm_max": e["cpm_max"],
+            "bbox": [e["lat_min"], e["lon_min"], e["lat_max"], e["lon_max"]],
+        })
+    print(json.dumps(salida, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
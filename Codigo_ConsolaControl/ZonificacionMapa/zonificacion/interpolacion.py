@@ -0,0 +1,117 @@
+# interpolacion.py
+# Malla regular sobre el area medida, interpoladores (IDW numpy, RBF scipy)
+# y conversion del campo interpolado a imagen RGBA por nivel
+# - idw() es la version densa O(H*W*N), en varios hilos; los mapas usan idw.idw_vecinos
+#   (k vecinos / radio)
+# - rbf() es el Rbf global en grados de tec03 original (referencia); los mapas usan rbf_local
+# - forma_metrica(): filas x columnas para celdas de PASO_M metros (cuadradas en el terreno),
+#   con tope MAX_CELDAS; H x W es la malla fija original (referencia de los bancos)
+# - evaluador(): el interpolador de los mapas idw/rbf sobre muestras en metros; lo usan
+#   la malla de tecnicas y las teselas XYZ de piramide
+# - recortar(): Z a p1-p99 de las muestras; lo comparten el raster y las isobandas
+
+import numpy as np
+
+from .idw import K_DEFECTO, idw_vecinos
+from .niveles import rgba
+from .paralelo import por_trozos
+
+# intento de importar scipy.rbf
+try:
+    from scipy.interpolate import Rbf
+    SCIPY_OK = True
+except Exception:
+    SCIPY_OK = False
+
+H, W = 320, 320
+PASO_M = 0.5            # lado de celda pedido; un techo de 30 m -> ~66x66 celdas
+MAX_CELDAS = H * W      # un camino de 2 km no pasa de esto: la celda crece
+
+
+def limites(lats, lons) -> tuple:
+    """(lat_min, lat_max, lon_min, lon_max) con 5 % de margen (minimo 1e-5 grados)."""
+    lat_min, lat_max = float(lats.min()), float(lats.max())
+    lon_min, lon_max = float(lons.min()), float(lons.max())
+    pad_lat = max((lat_max - lat_min) * 0.05, 1e-5)
+    pad_lon = max((lon_max - lon_min) * 0.05, 1e-5)
+    return lat_min - pad_lat, lat_max + pad_lat, lon_min - pad_lon, lon_max + pad_lon
+
+
+def forma_metrica(lim: tuple, proy, paso_m: float = PASO_M, max_celdas: int = MAX_CELDAS) -> tuple:
+    """(h, w, paso) para cubrir `lim` con celdas de ~paso_m metros por lado (ProyeccionLocal
+    `proy`); si pasan de max_celdas el paso crece hasta que entren."""
+    lat_min, lat_max, lon_min, lon_max = lim
+    e, n = proy.enu(np.array([lat_min, lat_min, lat_max, lat_max]), np.array([lon_min, lon_max, lon_min, lon_max]))
+    ancho, alto = float(np.ptp(e)), float(np.ptp(n))
+    paso = paso_m
+    while True:
+        h = max(2, int(round(alto / paso)) + 1)
+        w = max(2, int(round(ancho / paso)) + 1)
+        if h * w <= max_celdas:
+            return h, w, paso
+        paso *= max(1.01, np.sqrt(h * w / max_celdas))
+
+
+def malla(lim: tuple, h: int = H, w: int = W) -> tuple:
+    lat_min, lat_max, lon_min, lon_max = lim
+    grid_lat = np.linspace(lat_max, lat_min, h)  # descendente para alinear con folium
+    grid_lon = np.linspace(lon_min, lon_max, w)
+    Lon, Lat = np.meshgrid(grid_lon, grid_lat)
+    return Lon, Lat
+
+
+def _idw_trozo(lats, lons, vals, qa, qo, p: float):
+    eps = 1e-12
+    dlat = qa[:, None] - lats[None, :]
+    dlon = qo[:, None] - lons[None, :]
+    dist = np.sqrt(dlat*dlat + dlon*dlon) + eps
+    w = 1.0 / np.power(dist, p)
+    num = (w * vals[None, :]).sum(axis=1)
+    den = w.sum(axis=1) + eps
+    return num / den
+
+
+def idw(lats, lons, vals, Lat, Lon, p: float = 2.0, presupuesto_mb: float | None = None,
+        hilos: int | None = None):
+    """IDW denso; trozos de celdas en paralelo (paralelo.por_trozos), ~4 matrices
+    trozo x N de float64 vivas por hilo."""
+    z = por_trozos(lambda qa, qo: _idw_trozo(lats, lons, vals, qa, qo, p),
+                   np.asarray(Lat, dtype=float).ravel(), np.asarray(Lon, dtype=float).ravel(),
+                   32 * len(vals), presupuesto_mb, hilos)
+    return z.reshape(np.shape(Lat))
+
+
+def rbf(lats, lons, vals, Lat, Lon):
+    rbf_ = Rbf(lons, lats, vals, function="inverse_multiquadric", smooth=50.0)  # diferenciable vs IDW
+    return rbf_(Lon, Lat)
+
+
+def evaluador(xs, ys, vals, usar_rbf: bool, caja: tuple, k: int | None = K_DEFECTO,
+              radio: float | None = None, baja_memoria: bool = False) -> tuple:
+    """(evaluar(qx, qy), nombre de la capa) para muestras (xs, ys) en metros. `caja`
+    (x0, x1, y0, y1): area que cubren las consultas (teselas del RBF)."""
+    if usar_rbf and SCIPY_OK:
+        from .rbf_local import RBFTeselas
+        evaluar = RBFTeselas(xs, ys, vals, (min(xs.min(), caja[0]), max(xs.max(), caja[1]),
+                                            min(ys.min(), caja[2]), max(ys.max(), caja[3])))
+        if baja_memoria:
+            from .ligero import RBFLigero
+            evaluar = RBFLigero(evaluar)
+        return evaluar, "RBF"
+    if baja_memoria:
+        from .ligero import IDWLigero
+        evaluar = IDWLigero(xs, ys, vals, k=k, radio=radio)
+    else:
+        evaluar = lambda qx, qy: idw_vecinos(ys, xs, vals, qy, qx, k=k, radio=radio)
+    return evaluar, "RBF (fallback IDW)" if usar_rbf else "IDW"
+
+
+def recortar(Z, vals):
+    """Z recortado a los percentiles 1-99 de las muestras (clip conserva NaN)."""
+    return np.clip(Z, np.percentile(vals, 1), np.percentile(vals, 99))
+
+
+def raster_niveles(Z, vals):
+    """Recorta Z a los percentiles 1-99 de las muestras y pinta cada celda con el color de su nivel.
+    Celdas NaN (sin muestras en el radio de busqueda) quedan transparentes."""
+    return rgba(recortar(Z, vals))
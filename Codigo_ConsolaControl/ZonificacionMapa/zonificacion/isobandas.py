@@ -0,0 +1,274 @@
+# isobandas.py
+# Zonas por nivel como poligonos: marching squares sobre la malla interpolada Z
+# - anillos(): contornos cerrados de {Z > umbral} (la malla se rodea de un borde "sin
+#   dato", asi todo contorno cierra); puntos de cruce interpolados linealmente sobre las
+#   aristas y compartidos por las celdas vecinas; sillas resueltas por el promedio de la
+#   celda. Sentido: exteriores antihorarios, huecos horarios (RFC 7946)
+# - umbrales: los de niveles.py (CPM_MIN y CORTES_CPM); la banda del nivel k es
+#   {umbral[k-1] < Z <= umbral[k]} = sus anillos + los del umbral siguiente invertidos,
+#   asi bandas vecinas comparten exactamente el mismo borde simplificado
+# - Z se recorta a p1-p99 de las muestras (interpolacion.recortar, como el raster): las
+#   bandas coinciden con los colores del raster
+# - simplificacion Douglas-Peucker en metros (TOLERANCIA_M) y areas en m2 en el plano
+#   local (geodesia.ProyeccionLocal); anillos de menos de AREA_MIN_M2 se descartan
+# - isobandas(): FeatureCollection GeoJSON, un MultiPolygon por nivel con su area;
+#   perimetro(): exteriores de {Z > CPM_MIN}, el borde real del nivel 1
+# - solo numpy (sin shapely/matplotlib/skimage, que no estan en la Raspberry Pi)
+#
+# Uso: python3 -m zonificacion.isobandas [--csv RUTA] [--tecnica idw|rbf] [--salida RUTA.geojson]
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from .comun import colormap_int
+from .interpolacion import recortar
+from .niveles import CORTES_CPM, CPM_MIN
+
+UMBRALES = (float(CPM_MIN),) + tuple(float(c) for c in CORTES_CPM)
+TOLERANCIA_M = 0.25     # media celda de interpolacion.PASO_M
+AREA_MIN_M2 = 0.5
+_FONDO = -1e300         # borde y NaN: el cruce queda sobre el nodo con dato
+
+# segmentos por caso (a=8 arriba-izq, b=4 arriba-der, c=2 abajo-der, d=1 abajo-izq;
+# aristas 0=arriba 1=derecha 2=abajo 3=izquierda), recorridos con {Z > umbral} a la
+# izquierda mirando el mapa con el norte arriba
+_T, _R, _B, _L = range(4)
+_SEGMENTOS = {
+    1: [(_B, _L)], 2: [(_R, _B)], 3: [(_R, _L)], 4: [(_T, _R)], 6: [(_T, _B)], 7: [(_T, _L)],
+    8: [(_L, _T)], 9: [(_B, _T)], 11: [(_R, _T)], 12: [(_L, _R)], 13: [(_B, _R)], 14: [(_L, _B)],
+}
+# sillas: (centro > umbral, centro <= umbral)
+_SILLAS = {
+    5: ([(_T, _L), (_B, _R)], [(_T, _R), (_B, _L)]),
+    10: ([(_R, _T), (_L, _B)], [(_L, _T), (_R, _B)]),
+}
+
+
+def anillos(Z, umbral: float) -> list:
+    """Contornos cerrados de {Z > umbral}: lista de arrays (k, 2) de (fila, columna)
+    fraccionarias de Z, sin repetir el primer punto."""
+    Zp = np.pad(np.asarray(Z, dtype=float), 1, constant_values=_FONDO)
+    Zp[np.isnan(Zp)] = _FONDO
+    h, w = Zp.shape
+    B = Zp > umbral
+    caso = (B[:-1, :-1] * 8 + B[:-1, 1:] * 4 + B[1:, 1:] * 2 + B[1:, :-1]).astype(np.int8)
+    i, j = np.nonzero((caso != 0) & (caso != 15))
+    if len(i) == 0:
+        return []
+    caso = caso[i, j]
+    # aristas de cada celda: horizontales i * w + j, verticales h * w + i * w + j
+    aristas = np.stack([i * w + j, h * w + i * w + j + 1, (i + 1) * w + j, h * w + i * w + j])
+    centro = (Zp[i, j] + Zp[i, j + 1] + Zp[i + 1, j] + Zp[i + 1, j + 1]) / 4.0 > umbral
+
+    desde, hasta = [], []
+    for k, segs in _SEGMENTOS.items():
+        sel = caso == k
+        for a, b in segs:
+            desde.append(aristas[a][sel])
+            hasta.append(aristas[b][sel])
+    for k, (unido, separado) in _SILLAS.items():
+        for sel, segs in ((caso == k) & centro, unido), ((caso == k) & ~centro, separado):
+            for a, b in segs:
+                desde.append(aristas[a][sel])
+                hasta.append(aristas[b][sel])
+    desde, hasta = np.concatenate(desde), np.concatenate(hasta)
+
+    # cada arista cortada es origen de un segmento y destino de otro: ciclos
+    usadas, desde_c = np.unique(desde, return_inverse=True)
+    siguiente = np.empty(len(usadas), dtype=np.int64)
+    siguiente[desde_c] = np.searchsorted(usadas, hasta)
+
+    horizontal = usadas < h * w
+    e = np.where(horizontal, usadas, usadas - h * w)
+    fi, co = e // w, e % w
+    z0 = Zp[fi, co]
+    z1 = np.where(horizontal, Zp[fi, np.minimum(co + 1, w - 1)], Zp[np.minimum(fi + 1, h - 1), co])
+    t = (umbral - z0) / (z1 - z0)
+    filas = np.where(horizontal, fi, fi + t) - 1.0      # sin el borde agregado
+    cols = np.where(horizontal, co + t, co) - 1.0
+
+    sig = siguiente.tolist()
+    visto = bytearray(len(sig))
+    salida = []
+    for s in range(len(sig)):
+        if visto[s]:
+            continue
+        ciclo = []
+        k = s
+        while not visto[k]:
+            visto[k] = 1
+            ciclo.append(k)
+            k = sig[k]
+        salida.append(np.column_stack([filas[ciclo], cols[ciclo]]))
+    return salida
+
+
+def area(x, y) -> float:
+    """Area con signo (shoelace) de un anillo sin cerrar; positiva si es antihorario."""
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _dp_abierta(x, y, tol: float) -> np.ndarray:
+    """Indices que conserva Douglas-Peucker en la polilinea abierta (x, y)."""
+    conservar = np.zeros(len(x), dtype=bool)
+    conservar[[0, -1]] = True
+    pila = [(0, len(x) - 1)]
+    while pila:
+        a, b = pila.pop()
+        if b - a < 2:
+            continue
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        px, py = x[a + 1:b] - x[a], y[a + 1:b] - y[a]
+        largo = np.hypot(dx, dy)
+        d = np.abs(dx * py - dy * px) / largo if largo > 0 else np.hypot(px, py)
+        k = int(np.argmax(d))
+        if d[k] > tol:
+            m = a + 1 + k
+            conservar[m] = True
+            pila += [(a, m), (m, b)]
+    return np.flatnonzero(conservar)
+
+
+def simplificar(x, y, tol: float) -> tuple:
+    """Douglas-Peucker sobre un anillo cerrado (sin repetir el primer punto): se parte en
+    el punto 0 y el mas lejano a el, y se simplifica cada mitad."""
+    n = len(x)
+    if n <= 4 or tol <= 0:
+        return x, y
+    lejos = int(np.argmax(np.hypot(x - x[0], y - y[0])))
+    i1 = _dp_abierta(x[:lejos + 1], y[:lejos + 1], tol)
+    i2 = _dp_abierta(np.r_[x[lejos:], x[0]], np.r_[y[lejos:], y[0]], tol) + lejos
+    idx = np.r_[i1, i2[1:-1]]
+    return x[idx], y[idx]
+
+
+def ejes_latlon(lim: tuple, h: int, w: int, proy):
+    """(fila, col) de la malla de interpolacion.malla (lat/lon regulares) -> metros."""
+    lat_min, lat_max, lon_min, lon_max = lim
+
+    def a_metros(filas, cols):
+        lat = lat_max - filas * (lat_max - lat_min) / max(h - 1, 1)
+        lon = lon_min + cols * (lon_max - lon_min) / max(w - 1, 1)
+        return proy.enu(lat, lon)
+    return a_metros
+
+
+def ejes_metricos(ex, ny):
+    """(fila, col) de una malla sobre los ejes 1D de ligero.ejes -> metros."""
+    dx = (ex[-1] - ex[0]) / max(len(ex) - 1, 1)
+    dy = (ny[-1] - ny[0]) / max(len(ny) - 1, 1)
+    return lambda filas, cols: (ex[0] + cols * dx, ny[0] + filas * dy)
+
+
+def _anillos_m(Z, umbral: float, a_metros, tol: float) -> list:
+    """[(x, y, area)] de los anillos de {Z > umbral} en metros, simplificados."""
+    salida = []
+    for r in anillos(Z, umbral):
+        x, y = a_metros(r[:, 0], r[:, 1])
+        x, y = simplificar(np.asarray(x), np.asarray(y), tol)
+        if len(x) < 3:
+            continue
+        a = area(x, y)
+        if abs(a) >= AREA_MIN_M2:
+            salida.append((x, y, a))
+    return salida
+
+
+def _dentro(px: float, py: float, x, y) -> bool:
+    """Punto en poligono (par-impar) contra el anillo (x, y)."""
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    cruza = (y > py) != (y2 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xc = x + (py - y) * (x2 - x) / (y2 - y)
+    return bool(np.count_nonzero(cruza & (px < xc)) % 2)
+
+
+def _punto_interior(x, y) -> tuple:
+    """Punto apenas dentro de un hueco (horario), junto al medio de su lado mas largo. Sus
+    vertices pueden caer sobre el exterior (bandas que tocan el borde de la malla)."""
+    dx, dy = np.roll(x, -1) - x, np.roll(y, -1) - y
+    i = int(np.argmax(dx * dx + dy * dy))
+    return x[i] + 0.5 * dx[i] + 0.01 * dy[i], y[i] + 0.5 * dy[i] - 0.01 * dx[i]     # a la derecha
+
+
+def _poligonos(lista: list) -> list:
+    """[(exterior, [huecos])] a partir de anillos con signo: cada hueco va al exterior mas
+    chico que lo contiene."""
+    exteriores = sorted((r for r in lista if r[2] > 0), key=lambda r: r[2])
+    poligonos = [(e, []) for e in exteriores]
+    for hx, hy, ha in (r for r in lista if r[2] < 0):
+        px, py = _punto_interior(hx, hy)
+        for (ex, ey, _), huecos in poligonos:
+            if ex.min() <= px <= ex.max() and ey.min() <= py <= ey.max() and _dentro(px, py, ex, ey):
+                huecos.append((hx, hy, ha))
+                break
+    return poligonos
+
+
+def _coordenadas(x, y, proy) -> list:
+    lat, lon = proy.latlon(np.r_[x, x[0]], np.r_[y, y[0]])      # anillo cerrado
+    return [[round(float(lo), 7), round(float(la), 7)] for la, lo in zip(lat, lon)]
+
+
+def isobandas(Z, vals, a_metros, proy, tolerancia_m: float | None = None) -> dict:
+    """FeatureCollection con un MultiPolygon por nivel 1..5 presente en Z; propiedades
+    nivel, cpm_min, cpm_max (la banda es cpm_min < CPM <= cpm_max), area_m2 y color.
+    `a_metros(filas, cols) -> (este, norte)`: ejes_latlon() o ejes_metricos()."""
+    tol = TOLERANCIA_M if tolerancia_m is None else tolerancia_m
+    Z = recortar(Z, vals)
+    por_umbral = [_anillos_m(Z, u, a_metros, tol) for u in UMBRALES]
+    features = []
+    for nivel in range(1, len(UMBRALES)):
+        lista = por_umbral[nivel - 1] + [(x[::-1], y[::-1], -a) for x, y, a in por_umbral[nivel]]
+        poligonos = _poligonos(lista)
+        if not poligonos:
+            continue
+        total = sum(e[2] + sum(h[2] for h in huecos) for e, huecos in poligonos)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "MultiPolygon", "coordinates": [
+                [_coordenadas(e[0], e[1], proy)] + [_coordenadas(h[0], h[1], proy) for h in huecos]
+                for e, huecos in poligonos]},
+            "properties": {"nivel": nivel, "cpm_min": UMBRALES[nivel - 1], "cpm_max": UMBRALES[nivel],
+                           "area_m2": round(total, 1), "color": colormap_int[nivel]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def perimetro(Z, vals, a_metros, proy, tolerancia_m: float | None = None) -> list:
+    """Anillos exteriores [[lat, lon], ...] de {Z > CPM_MIN} (nivel >= 1), cerrados."""
+    tol = TOLERANCIA_M if tolerancia_m is None else tolerancia_m
+    salida = []
+    for x, y, a in _anillos_m(recortar(Z, vals), UMBRALES[0], a_metros, tol):
+        if a > 0:
+            salida.append([[la, lo] for lo, la in _coordenadas(x, y, proy)])
+    return salida
+
+
+def main(argv: list | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Isobandas de nivel (GeoJSON) del mapa idw/rbf")
+    ap.add_argument("--csv", default=None, help="CSV de mediciones (por defecto el mas reciente)")
+    ap.add_argument("--tecnica", choices=("idw", "rbf"), default="idw")
+    ap.add_argument("--salida", default=None, help="archivo .geojson (por defecto, la salida estandar)")
+    args = ap.parse_args(argv)
+
+    from . import datos
+    from .tecnicas import zonas
+    fc = zonas(datos.cargar(args.csv or datos.csv_reciente()), usar_rbf=args.tecnica == "rbf")
+    texto = json.dumps(fc, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+        for feat in fc["features"]:
+            p = feat["properties"]
+            print(f"Nivel {p['nivel']}: {p['area_m2']:.1f} m2, {len(feat['geometry']['coordinates'])} poligono(s)")
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
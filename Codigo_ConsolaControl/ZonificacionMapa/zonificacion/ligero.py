@@ -0,0 +1,176 @@
+# ligero.py
+# Modo de baja memoria de la interpolacion (tecnicas.BAJA_MEMORIA)
+# - la malla son sus dos ejes 1D en metros (este, norte; ejes()): cada trozo arma las
+#   coordenadas de sus celdas desde los ejes (paralelo.por_trozos_ejes), nunca una
+#   malla completa de h x w (meshgrid + proyeccion)
+# - float32 en distancias, pesos y acumuladores (la mitad que float64); Z sale en float32
+# - buffers de trabajo por hilo, reservados una vez y reusados con out= en cada trozo
+#   (_buffer): un trozo no reserva sus (trozo x N) temporales cada vez
+# - memoria temporal acotada por paralelo.PRESUPUESTO_MB, repartida entre los hilos
+# Los evaluadores se llaman con consultas 1D (como refinamiento.adaptativa) o con
+# .malla(ex, ny).
+
+import threading
+
+import numpy as np
+
+from .idw import EPS, K_DEFECTO, KDTREE_OK, idw_vecinos
+from .paralelo import por_trozos, por_trozos_ejes
+
+if KDTREE_OK:
+    from scipy.spatial import cKDTree
+    from .rbf_local import _peso
+
+EPS32 = np.float32(EPS)
+_local = threading.local()
+
+
+def _buffer(nombre: str, forma: tuple, dtype=np.float32):
+    """Buffer `nombre` del hilo actual con la forma pedida; crece si no alcanza, nunca se
+    achica (el trozo siguiente del mismo hilo lo reusa)."""
+    n = int(np.prod(forma))
+    buf = getattr(_local, nombre, None)
+    if buf is None or buf.size < n or buf.dtype != dtype:
+        buf = np.empty(n, dtype=dtype)
+        setattr(_local, nombre, buf)
+    return buf[:n].reshape(forma)
+
+
+def ejes(lim: tuple, proy, h: int, w: int) -> tuple:
+    """(ex, ny): este de cada columna (oeste -> este) y norte de cada fila (norte -> sur,
+    como la imagen de folium) en metros de `proy`. A las escalas de un procedimiento la
+    malla lat/lon y la de ejes ENU difieren en centimetros (convergencia de meridianos)."""
+    lat_min, lat_max, lon_min, lon_max = lim
+    lat_c, lon_c = (lat_min + lat_max) / 2.0, (lon_min + lon_max) / 2.0
+    e, _ = proy.enu(np.array([lat_c, lat_c]), np.array([lon_min, lon_max]))
+    _, n = proy.enu(np.array([lat_max, lat_min]), np.array([lon_c, lon_c]))
+    return np.linspace(e[0], e[1], w), np.linspace(n[0], n[1], h)
+
+
+class _Evaluador:
+    bytes_por_consulta = 0
+    COORDENADAS = 64        # por consulta del trozo: fila/col, qx/qy, (qx, qy) para el arbol
+
+    def __init__(self, presupuesto_mb: float | None, hilos: int | None):
+        self.presupuesto_mb = presupuesto_mb
+        self.hilos = hilos
+
+    def _trozo(self, qx, qy):
+        raise NotImplementedError
+
+    def __call__(self, qx, qy):
+        qx = np.asarray(qx, dtype=float).ravel()
+        qy = np.asarray(qy, dtype=float).ravel()
+        return por_trozos(self._trozo, qx, qy, self.bytes_por_consulta + self.COORDENADAS,
+                          self.presupuesto_mb, self.hilos, dtype=np.float32)
+
+    def malla(self, ex, ny):
+        """Z (len(ny), len(ex)) en float32, sin meshgrid."""
+        return por_trozos_ejes(self._trozo, ex, ny, self.bytes_por_consulta + self.COORDENADAS,
+                               self.presupuesto_mb, self.hilos)
+
+
+class IDWLigero(_Evaluador):
+    """IDW de idw.idw_vecinos (mismos k, radio, p) en float32. Sin scipy y con k/radio
+    usa el indice de cubetas de idw.py trozo a trozo (float64)."""
+
+    def __init__(self, xs, ys, vals, p: float = 2.0, k: int | None = K_DEFECTO, radio: float | None = None,
+                 sin_datos: float = np.nan, presupuesto_mb: float | None = None, hilos: int | None = None):
+        super().__init__(presupuesto_mb, hilos)
+        self.xs = np.asarray(xs, dtype=np.float32)
+        self.ys = np.asarray(ys, dtype=np.float32)
+        self.vals = np.asarray(vals, dtype=np.float32)
+        n = len(self.vals)
+        self.p, self.sin_datos = p, sin_datos
+        self.todas = (k is None or k >= n) and radio is None
+        if self.todas:
+            self.bytes_por_consulta = 2 * 4 * n             # dos buffers trozo x N float32
+        elif k is not None and KDTREE_OK:
+            self.k = min(k, n)
+            self.cota = np.inf if radio is None else radio
+            self.arbol = cKDTree(np.column_stack([np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)]))
+            self.vext = np.append(self.vals, np.float32(0.0))
+            self.bytes_por_consulta = (8 + 8 + 4 + 4) * self.k    # d, i (cKDTree) + w, v
+        else:
+            xs64, ys64, v64 = (np.asarray(a, dtype=float) for a in (xs, ys, vals))
+            self._trozo = lambda qx, qy: idw_vecinos(xs64, ys64, v64, qx, qy, p=p, k=k, radio=radio,
+                                                     indice="malla", sin_datos=sin_datos, hilos=1)
+            self.bytes_por_consulta = 8 * 4 * (k or 64)
+
+    def _trozo(self, qx, qy):
+        if self.todas:
+            return self._denso(qx, qy)
+        return self._vecinos(qx, qy)
+
+    def _denso(self, qx, qy):
+        m, n = len(qx), len(self.xs)
+        d = _buffer("d", (m, n))
+        t = _buffer("t", (m, n))
+        np.subtract(qx.astype(np.float32)[:, None], self.xs[None, :], out=d)
+        np.multiply(d, d, out=d)
+        np.subtract(qy.astype(np.float32)[:, None], self.ys[None, :], out=t)
+        np.multiply(t, t, out=t)
+        np.add(d, t, out=d)
+        np.sqrt(d, out=d)
+        np.add(d, EPS32, out=d)
+        np.power(d, np.float32(-self.p), out=d)             # pesos
+        den = d.sum(axis=1)
+        np.multiply(d, self.vals[None, :], out=t)
+        return t.sum(axis=1) / (den + EPS32)
+
+    def _vecinos(self, qx, qy):
+        d, i = self.arbol.query(np.column_stack([qx, qy]), k=self.k, distance_upper_bound=self.cota)
+        if self.k == 1:
+            d, i = d[:, None], i[:, None]
+        w = _buffer("w", d.shape)
+        v = _buffer("v", d.shape)
+        np.add(d, EPS, out=w, casting="same_kind")
+        np.power(w, np.float32(-self.p), out=w)            # d = inf (sin vecino): peso 0
+        np.take(self.vext, i, out=v, mode="clip")       # "raise" copia `out` entero
+        den = w.sum(axis=1)
+        np.multiply(w, v, out=v)
+        z = v.sum(axis=1) / (den + EPS32)
+        z[den == 0] = self.sin_datos
+        return z
+
+
+class RBFLigero(_Evaluador):
+    """Evaluacion de un rbf_local.RBFTeselas ya ajustado (el ajuste sigue en float64): phi,
+    coeficientes y acumuladores en float32 con buffers por hilo. Con el suavizado de
+    rbf_local el sistema esta bien condicionado: difiere de la evaluacion float64 en
+    milesimas de CPM."""
+
+    def __init__(self, rbf, presupuesto_mb: float | None = None, hilos: int | None = None):
+        super().__init__(presupuesto_mb, hilos)
+        self.rbf = rbf
+        self.eps2 = np.float32(rbf.eps * rbf.eps)
+        self.hojas = [(caja, hx.astype(np.float32), hy.astype(np.float32), coef.astype(np.float32))
+                      for caja, hx, hy, coef in rbf.hojas]
+        self.bytes_por_consulta = 2 * 4 * rbf.m_max
+
+    def _trozo(self, qx, qy):
+        qx32, qy32 = qx.astype(np.float32), qy.astype(np.float32)
+        num = np.zeros(len(qx), dtype=np.float32)
+        den = np.zeros(len(qx), dtype=np.float32)
+        solape = self.rbf.solape
+        for (x0, x1, y0, y1), hx, hy, coef in self.hojas:
+            sx, sy = (x1 - x0) * solape, (y1 - y0) * solape
+            q = np.flatnonzero((qx >= x0 - sx) & (qx <= x1 + sx) & (qy >= y0 - sy) & (qy <= y1 + sy))
+            if len(q) == 0:
+                continue
+            a = _buffer("a", (len(q), len(hx)))
+            b = _buffer("b", (len(q), len(hx)))
+            np.subtract(qx32[q, None], hx[None, :], out=a)
+            np.multiply(a, a, out=a)
+            np.subtract(qy32[q, None], hy[None, :], out=b)
+            np.multiply(b, b, out=b)
+            np.add(a, b, out=a)
+            np.divide(a, self.eps2, out=a)
+            np.add(a, np.float32(1.0), out=a)
+            np.sqrt(a, out=a)
+            np.reciprocal(a, out=a)                         # phi
+            w = (_peso(qx[q], x0, x1, sx) * _peso(qy[q], y0, y1, sy)).astype(np.float32)
+            num[q] += w * np.einsum("ij,j->i", a, coef)
+            den[q] += w
+        return num / np.where(den > 0, den, np.float32(1.0))
+
@@ -0,0 +1,155 @@
+# lote.py
+# Las cuatro tecnicas en una pasada y reconstruccion del archivo de mapas
+# - generar_todas(): carga el CSV una vez (datos.cargar) y guarda un HTML por tecnica,
+#   carpeta/mapa_<tecnica>.html; antes los cuatro botones reexportaban la tabla, lanzaban
+#   un proceso cada uno y se pisaban en mapa_zonas.html
+# - sello .mapas.json en la carpeta: CSV, tamano y huella (indice.huella) con que se
+#   generaron los mapas; si el CSV no cambio y los HTML existen no se recalcula nada.
+#   Node-RED reescribe el CSV entero en cada clic (mtime nuevo, mismo contenido): por
+#   eso el sello no usa mtime. Con el almacen .db del receptor (datos.es_almacen) el
+#   sello es la ultima fila: la tabla es solo-agregar
+# - cada HTML se escribe en un temporal y se renombra: el iframe nunca lee uno a medias
+# - reconstruir(): un mapa por tecnica para cada CSV de /home/itoroc/Database en
+#   RUTA_ARCHIVO/<nombre del CSV>/, en un pool de procesos (cada proceso interpola con
+#   un hilo: paralelo.HILOS = 1); los CSV con sello vigente ni se despachan
+#
+# Uso: python3 -m zonificacion.lote [--database DIR] [--salida DIR] [--procesos N] [--forzar]
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from . import NOMBRES_TECNICAS, RUTA_ARCHIVO, RUTA_DATABASE, RUTA_ZONAS
+from . import indice
+
+ARCHIVO_SELLO = ".mapas.json"
+VERSION = 1     # subirla si cambia lo que dibujan las tecnicas: invalida todos los sellos
+
+
+def ruta_mapa(carpeta: str, tecnica: str) -> str:
+    return os.path.join(carpeta, f"mapa_{tecnica}.html")
+
+
+def _ultima_fila(ruta_db: str) -> int:
+    db = sqlite3.connect(f"file:{ruta_db}?mode=ro", uri=True)
+    try:
+        return db.execute("SELECT COALESCE(MAX(fila), 0) FROM mediciones").fetchone()[0]
+    finally:
+        db.close()
+
+
+def _sello(ruta_csv: str, tecnicas) -> dict:
+    if ruta_csv.endswith(".db"):
+        tamano, h = _ultima_fila(ruta_csv), None
+    else:
+        with open(ruta_csv, "rb") as f:
+            tamano = os.fstat(f.fileno()).st_size
+            h = indice.huella(f, tamano)
+    return {"version": VERSION, "csv": os.path.realpath(ruta_csv), "tamano": tamano, "huella": h,
+            "tecnicas": sorted(tecnicas)}
+
+
+def vigente(ruta_csv: str, carpeta: str, tecnicas=NOMBRES_TECNICAS) -> bool:
+    """Los mapas de `carpeta` ya son los de este contenido de `ruta_csv`?"""
+    try:
+        with open(os.path.join(carpeta, ARCHIVO_SELLO), encoding="utf-8") as f:
+            previo = json.load(f)
+        actual = _sello(ruta_csv, tecnicas)
+    except (OSError, ValueError, sqlite3.Error):
+        return False
+    if any(previo.get(c) != actual[c] for c in ("version", "csv", "tamano", "huella")):
+        return False
+    return (set(tecnicas) <= set(previo.get("tecnicas", ()))
+            and all(os.path.exists(ruta_mapa(carpeta, t)) for t in tecnicas))
+
+
+def generar_todas(ruta_csv: str | None = None, carpeta: str = RUTA_ZONAS, tecnicas=NOMBRES_TECNICAS,
+                  forzar: bool = False) -> dict:
+    """{tecnica: ruta del HTML} con los mapas de `ruta_csv` (por defecto el CSV mas reciente)
+    en `carpeta`. Sin cambios en el CSV (y sin `forzar`) devuelve los que ya estaban."""
+    for t in tecnicas:
+        if t not in NOMBRES_TECNICAS:
+            raise ValueError(f"tecnica desconocida: {t!r} (opciones: {', '.join(NOMBRES_TECNICAS)})")
+    ruta_csv = ruta_csv or indice.ultimo()
+    rutas = {t: ruta_mapa(carpeta, t) for t in tecnicas}
+    if not forzar and vigente(ruta_csv, carpeta, tecnicas):
+        return rutas        # sin importar pandas/folium: un clic sin datos nuevos es solo esto
+
+    from . import datos
+    from .tecnicas import TECNICAS
+
+    sello = _sello(ruta_csv, tecnicas)      # antes de leer: si el CSV cambia entretanto, se rehace
+    df = datos.cargar(ruta_csv)
+    os.makedirs(carpeta, exist_ok=True)
+    for t in tecnicas:
+        # copia superficial por tecnica: trayecto agrega "ts" y reordena su DataFrame
+        m = TECNICAS[t](df.copy(deep=False))
+        tmp = os.path.join(carpeta, f".mapa_{t}.{os.getpid()}.html")
+        m.save(tmp)
+        os.replace(tmp, rutas[t])
+    tmp = os.path.join(carpeta, f"{ARCHIVO_SELLO}.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sello, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(carpeta, ARCHIVO_SELLO))
+    return rutas
+
+
+def _inicializar_proceso():
+    from . import paralelo
+    paralelo.HILOS = 1      # el paralelismo lo da el pool de procesos
+
+
+def _reconstruir_uno(ruta_csv: str, carpeta: str, forzar: bool) -> str:
+    try:
+        generar_todas(ruta_csv, carpeta, forzar=forzar)
+    except Exception as e:
+        return f"error: {type(e).__name__}: {e}"
+    return "generado"
+
+
+def reconstruir(carpeta_csv: str = RUTA_DATABASE, salida: str = RUTA_ARCHIVO, procesos: int | None = None,
+                forzar: bool = False) -> dict:
+    """{nombre del CSV: "generado" | "sin cambios" | "error: ..."} para cada CSV de la carpeta."""
+    from . import paralelo
+
+    estado, pendientes = {}, []
+    for nombre in sorted(indice.actualizar(carpeta_csv)):
+        ruta = os.path.join(carpeta_csv, nombre)
+        destino = os.path.join(salida, os.path.splitext(nombre)[0])
+        if not forzar and vigente(ruta, destino):
+            estado[nombre] = "sin cambios"
+        else:
+            pendientes.append((nombre, ruta, destino))
+
+    procesos = max(1, paralelo.HILOS if procesos is None else procesos)
+    if procesos == 1 or len(pendientes) <= 1:
+        for nombre, ruta, destino in pendientes:
+            estado[nombre] = _reconstruir_uno(ruta, destino, forzar)
+    else:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(pendientes)),
+                                 initializer=_inicializar_proceso) as pool:
+            futuros = {nombre: pool.submit(_reconstruir_uno, ruta, destino, forzar)
+                       for nombre, ruta, destino in pendientes}
+            for nombre, fut in futuros.items():
+                estado[nombre] = fut.result()
+    return dict(sorted(estado.items()))
+
+
+def main(argv: list | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Reconstruye los mapas de todos los procedimientos")
+    ap.add_argument("--database", default=RUTA_DATABASE)
+    ap.add_argument("--salida", default=RUTA_ARCHIVO)
+    ap.add_argument("--procesos", type=int, default=None, help="por defecto uno por nucleo (hasta 4)")
+    ap.add_argument("--forzar", action="store_true", help="regenerar aunque el CSV no haya cambiado")
+    args = ap.parse_args(argv)
+
+    estado = reconstruir(args.database, args.salida, args.procesos, args.forzar)
+    print(json.dumps(estado, ensure_ascii=False, indent=1))
+    return 1 if any(e.startswith("error") for e in estado.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# niveles.py
+# Clasificacion CPM -> nivel y coloreado RGBA, una sola definicion para las cuatro tecnicas
+# - Escala de "Intensidad" en Node-RED (r.intensidad = almacen.nivel_cpm del receptor, con
+#   copia de estos mismos cortes):
+#   5..150 -> 1, ..500 -> 2, ..1500 -> 3, ..6000 -> 4, ..15000 -> 5;
+#   < 5 (bajo deteccion) y > 15000 (fuera de escala) -> 0
+#   (el calcular_nivel anterior, igual que Node-RED, daba 2 bajo 5 CPM por el orden de
+#   los if; el raster ya daba 0)
+# - niveles(): searchsorted sobre los cortes, vectorizado (escalares, Series o mallas)
+# - rgba(): tabla RGBA por nivel precalculada; colorear una malla es un solo indexado.
+#   NaN (sin muestras) usa la fila SIN_DATO, transparente
+
+import numpy as np
+
+from .comun import colormap_int, nivel_alpha, hex_to_rgb255
+
+CPM_MIN = 5
+CORTES_CPM = (150, 500, 1500, 6000, 15000)     # limite superior (inclusive) de los niveles 1..5
+
+# clase = searchsorted(_CORTES, cpm): 0 bajo CPM_MIN, 1..5 niveles, 6 fuera de escala
+_CORTES = np.array((np.nextafter(float(CPM_MIN), -np.inf),) + CORTES_CPM, dtype=float)
+_NIVEL_DE_CLASE = np.array([0, 1, 2, 3, 4, 5, 0], dtype=np.int8)
+
+SIN_DATO = 6    # fila de LUT_RGBA para celdas NaN
+LUT_RGBA = np.zeros((7, 4), dtype=np.uint8)
+for _n in range(6):
+    LUT_RGBA[_n, :3] = hex_to_rgb255(colormap_int[_n])
+    LUT_RGBA[_n, 3] = int(nivel_alpha[_n] * 255)
+
+
+def niveles(cpm) -> np.ndarray:
+    """Nivel (int8) de cada valor de `cpm`, con la forma de la entrada."""
+    return _NIVEL_DE_CLASE[np.searchsorted(_CORTES, np.asarray(cpm, dtype=float), side="left")]
+
+
+def nivel(cpm) -> int:
+    return int(niveles(cpm))
+
+
+def rgba(Z) -> np.ndarray:
+    """Imagen uint8 (..., 4) con el color de nivel de cada celda; NaN transparente."""
+    Z = np.asarray(Z, dtype=float)
+    idx = niveles(Z)
+    idx[np.isnan(Z)] = SIN_DATO
+    return LUT_RGBA[idx]
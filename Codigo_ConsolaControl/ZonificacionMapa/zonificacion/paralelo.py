@@ -0,0 +1,86 @@
+# paralelo.py
+# Ejecutor de la interpolacion en varios nucleos (la Raspberry Pi de la consola tiene 4)
+# - por_trozos(): reparte las consultas (celdas) en trozos contiguos sobre un pool de
+#   hilos; los nucleos de numpy/scipy (restas, sqrt, power, sumas por fila, matmul,
+#   cKDTree.query) sueltan el GIL, asi que los hilos corren en paralelo sin copiar
+#   muestras ni resultados entre procesos
+# - tamano de trozo por presupuesto de memoria: cada hilo tiene un trozo vivo, asi que
+#   trozo = PRESUPUESTO_MB / (hilos * bytes temporales por consulta), no un chunk fijo
+# - determinista: cada consulta se calcula con las mismas operaciones sin importar en
+#   que trozo o hilo cae, y cada trozo escribe solo su tramo del resultado (sin sumas
+#   compartidas entre hilos): igual bit a bit con 1 o con 4 hilos
+# - por_trozos_ejes(): lo mismo sobre una malla dada por sus dos ejes 1D (ligero.py)
+# - HILOS y PRESUPUESTO_MB se leen en cada llamada (los bancos de prueba los cambian)
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+HILOS = min(4, len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1)
+PRESUPUESTO_MB = 64
+TROZO_MIN = 256         # consultas; no se parte en trozos mas chicos solo para repartir
+
+_pool = None            # uno por proceso: el servicio residente lo reutiliza entre pedidos
+_pool_hilos = 0
+
+
+def _ejecutor(hilos: int) -> ThreadPoolExecutor:
+    global _pool, _pool_hilos
+    if _pool is None or _pool_hilos != hilos:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="interpolacion")
+        _pool_hilos = hilos
+    return _pool
+
+
+def tamano_trozo(bytes_por_consulta: float, hilos: int, presupuesto_mb: float) -> int:
+    return max(1, int(presupuesto_mb * 1024 * 1024 / (hilos * max(bytes_por_consulta, 1.0))))
+
+
+def _repartir(calcular, m: int, bytes_por_consulta: float, presupuesto_mb: float | None,
+              hilos: int | None, dtype):
+    """z[a:b] = calcular(a, b) para trozos [a, b) de range(m), repartidos en hilos."""
+    hilos = max(1, HILOS if hilos is None else hilos)
+    presupuesto_mb = PRESUPUESTO_MB if presupuesto_mb is None else presupuesto_mb
+    trozo = tamano_trozo(bytes_por_consulta, hilos, presupuesto_mb)
+    # al menos un trozo por hilo cuando alcanza, para no dejar nucleos quietos (pero nunca
+    # mas grande que lo que permite el presupuesto)
+    trozo = min(trozo, max(TROZO_MIN, -(-m // hilos)))
+    z = np.empty(m, dtype=dtype)
+
+    def tarea(a: int):
+        b = min(a + trozo, m)
+        z[a:b] = calcular(a, b)
+
+    inicios = range(0, m, trozo)
+    if hilos == 1 or len(inicios) == 1:
+        for a in inicios:
+            tarea(a)
+    else:
+        # list(): propaga la primera excepcion de cualquier trozo
+        list(_ejecutor(hilos).map(tarea, inicios))
+    return z
+
+
+def por_trozos(fn, qx, qy, bytes_por_consulta: float, presupuesto_mb: float | None = None,
+               hilos: int | None = None, dtype=float):
+    """z[i] = fn(qx[a:b], qy[a:b])[i - a] para consultas 1D, en trozos repartidos en hilos.
+    `bytes_por_consulta`: memoria temporal de fn por consulta (p.ej. 32 * N en el IDW denso)."""
+    return _repartir(lambda a, b: fn(qx[a:b], qy[a:b]), qx.shape[0], bytes_por_consulta,
+                     presupuesto_mb, hilos, dtype)
+
+
+def por_trozos_ejes(fn, ex, ny, bytes_por_consulta: float, presupuesto_mb: float | None = None,
+                    hilos: int | None = None, dtype=np.float32):
+    """Como por_trozos sobre la malla ny x ex (filas x columnas) sin armarla: cada trozo
+    toma sus coordenadas de los ejes 1D. Devuelve Z de (len(ny), len(ex))."""
+    w = len(ex)
+
+    def calcular(a: int, b: int):
+        fila, col = np.divmod(np.arange(a, b), w)
+        return fn(ex[col], ny[fila])
+
+    return _repartir(calcular, len(ny) * w, bytes_por_consulta, presupuesto_mb, hilos,
+                     dtype).reshape(len(ny), w)
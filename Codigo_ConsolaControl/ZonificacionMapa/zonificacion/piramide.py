@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# piramide.py
+# Piramide de teselas XYZ (z/x/y.png, Web Mercator, 256 px) para el overlay idw/rbf
+# - publicar(): en vez de un raster embebido en base64 en el HTML, guarda las muestras
+#   (muestras.npz) y meta.json en RUTA_TESELAS/<version>/ y devuelve la URL
+#   /teselas/<version>/{z}/{x}/{y}.png para un TileLayer de Leaflet: el HTML no lleva imagen
+# - version: sha1 de las muestras (lat, lon, CPM) + tecnica y parametros; otro dato u otra
+#   tecnica es otra carpeta, asi que una tesela ya calculada no cambia nunca
+# - perezosa: ServidorTeselas (HTTP en 127.0.0.1) calcula una tesela solo cuando Leaflet
+#   la pide (lo que esta a la vista), con refinamiento.adaptativa, y la deja en
+#   <version>/<z>/<x>/<y>.png; la proxima vez sale del disco sin ajustar el interpolador
+# - con pixeles de menos de interpolacion.PASO_M el interpolador se evalua en nodos cada
+#   PASO_M y se pasa a pixeles bilineal (Piramide.campo): mas zoom no es mas evaluaciones
+# - los pixeles fuera de interpolacion.limites quedan transparentes (misma huella que el
+#   ImageOverlay); de Z_MIN a Z_MAX, mas alla del zoom 20 del mapa base
+# - Node-RED reenvia GET /teselas/* a este servidor: el iframe y las teselas comparten
+#   origen (y como /home/itoroc/zonas es la carpeta estatica, las ya calculadas Node-RED
+#   puede servirlas directo)
+# - se conservan las VERSIONES publicadas mas recientemente
+#
+# Uso (p.ej. unidad systemd, como el servicio): python3 -m zonificacion.piramide [--puerto 8765]
+
+import argparse
+import hashlib
+import http.server
+import json
+import math
+import os
+import re
+import shutil
+from collections import OrderedDict
+
+import numpy as np
+from folium.utilities import write_png
+
+from . import RUTA_TESELAS
+from . import interpolacion, refinamiento
+from .geodesia import A_WGS84, ProyeccionLocal
+from .idw import K_DEFECTO
+
+VERSION = 1             # subirla si cambia como se pinta una tesela
+TAM = 256               # pixeles por lado
+Z_MIN, Z_MAX = 15, 22   # z 15: ~4.8 m/px en el ecuador; z 22: ~4 cm/px
+PUERTO = 8765
+VERSIONES = 16
+EN_MEMORIA = 4          # piramides con el interpolador ya ajustado en el servidor
+ARCHIVO_META = "meta.json"
+ARCHIVO_MUESTRAS = "muestras.npz"
+PREFIJO_URL = "/teselas"
+
+_URL = re.compile(r"^/teselas/([0-9a-f]{16})/(\d+)/(\d+)/(\d+)\.png$")
+
+
+def lon_de_x(x, z: int):
+    """Longitud del borde oeste de la columna de pixeles x (en pixeles globales del zoom z)."""
+    return np.asarray(x, dtype=float) / (TAM * 2 ** z) * 360.0 - 180.0
+
+
+def lat_de_y(y, z: int):
+    """Latitud del borde norte de la fila de pixeles y."""
+    n = math.pi * (1.0 - 2.0 * np.asarray(y, dtype=float) / (TAM * 2 ** z))
+    return np.degrees(np.arctan(np.sinh(n)))
+
+
+def rango(lim: tuple, z: int) -> tuple:
+    """(x0, x1, y0, y1) inclusivos: teselas del zoom z que tocan `lim`."""
+    lat_min, lat_max, lon_min, lon_max = lim
+    n = 2 ** z
+
+    def tx(lon):
+        return min(n - 1, int((lon + 180.0) / 360.0 * n))
+
+    def ty(lat):
+        fi = math.radians(lat)
+        return min(n - 1, int((1.0 - math.asinh(math.tan(fi)) / math.pi) / 2.0 * n))
+
+    return tx(lon_min), tx(lon_max), ty(lat_max), ty(lat_min)
+
+
+def version(lats, lons, vals, usar_rbf: bool, k: int | None, radio: float | None) -> str:
+    h = hashlib.sha1()
+    for a in (lats, lons, vals):
+        h.update(np.ascontiguousarray(a, dtype=float).tobytes())
+    h.update(json.dumps([VERSION, bool(usar_rbf), k, radio]).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _podar(carpeta: str, conservar: int):
+    versiones = []
+    with os.scandir(carpeta) as it:
+        for de in it:
+            try:
+                versiones.append((os.stat(os.path.join(de.path, ARCHIVO_META)).st_mtime_ns, de.path))
+            except OSError:
+                continue
+    for _, ruta in sorted(versiones, reverse=True)[conservar:]:
+        shutil.rmtree(ruta, ignore_errors=True)
+
+
+def publicar(lats, lons, vals, foco: tuple, usar_rbf: bool, k: int | None = K_DEFECTO,
+             radio: float | None = None, carpeta: str | None = None) -> str:
+    """Deja la version de estas muestras lista para ServidorTeselas y devuelve la URL
+    {z}/{x}/{y} del TileLayer. OSError si no se puede escribir la carpeta."""
+    carpeta = carpeta or RUTA_TESELAS
+    lats, lons, vals = (np.asarray(a, dtype=float) for a in (lats, lons, vals))
+    v = version(lats, lons, vals, usar_rbf, k, radio)
+    destino = os.path.join(carpeta, v)
+    meta = os.path.join(destino, ARCHIVO_META)
+    if os.path.exists(meta):
+        os.utime(meta)          # usada recien: no se poda
+    else:
+        tmp = os.path.join(carpeta, f".{v}.{os.getpid()}")
+        os.makedirs(tmp, exist_ok=True)
+        np.savez(os.path.join(tmp, ARCHIVO_MUESTRAS), lat=lats, lon=lons, cpm=vals)
+        with open(os.path.join(tmp, ARCHIVO_META), "w", encoding="utf-8") as f:
+            json.dump({"version": v, "foco": list(foco), "lim": list(interpolacion.limites(lats, lons)),
+                       "rbf": bool(usar_rbf), "k": k, "radio": radio}, f)
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(tmp, destino)
+    _podar(carpeta, VERSIONES)
+    return f"{PREFIJO_URL}/{v}/{{z}}/{{x}}/{{y}}.png"
+
+
+class Piramide:
+    """Interpolador ajustado de una version publicada; tesela(z, x, y) -> PNG."""
+
+    def __init__(self, carpeta_version: str):
+        self.carpeta = carpeta_version
+        with open(os.path.join(carpeta_version, ARCHIVO_META), encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(os.path.join(carpeta_version, ARCHIVO_MUESTRAS)) as m:
+            lats, lons, self.vals = m["lat"], m["lon"], m["cpm"]
+        self.lim = tuple(meta["lim"])
+        self.proy = ProyeccionLocal(*meta["foco"])
+        lat_min, lat_max, lon_min, lon_max = self.lim
+        e, n = self.proy.enu(np.array([lat_min, lat_min, lat_max, lat_max]),
+                             np.array([lon_min, lon_max, lon_min, lon_max]))
+        xs, ys = self.proy.enu(lats, lons)
+        self.evaluar, self.nombre = interpolacion.evaluador(xs, ys, self.vals, meta["rbf"],
+                                                            (e.min(), e.max(), n.min(), n.max()),
+                                                            meta["k"], meta["radio"])
+
+    def contiene(self, z: int, x: int, y: int) -> bool:
+        x0, x1, y0, y1 = rango(self.lim, z)
+        return x0 <= x <= x1 and y0 <= y <= y1
+
+    def paso_px(self, z: int) -> int:
+        """Pixeles entre nodos evaluados: la potencia de 2 mas grande con nodos separados a lo
+        sumo interpolacion.PASO_M (1 hasta ~z 18, 4 en z 20, 16 en z 22)."""
+        m_px = 2.0 * math.pi * A_WGS84 * math.cos(math.radians(self.proy.lat0)) / (TAM * 2 ** z)
+        s = 1
+        while s < TAM and 2 * s * m_px <= interpolacion.PASO_M:
+            s *= 2
+        return s
+
+    def campo(self, z: int, x: int, y: int):
+        """Z (TAM x TAM) de la tesela; solo se cubren los pixeles dentro de `lim`, el resto
+        queda NaN (transparente). El interpolador se evalua (refinamiento.adaptativa) en
+        nodos cada paso_px pixeles, alineados en todo el zoom: teselas vecinas comparten
+        nodos y no hay costuras; entre nodos, bilineal. Un borde de nivel queda nitido a
+        nivel de pixel sin evaluar cada pixel."""
+        p = np.arange(TAM) + 0.5                        # centros de pixel
+        lon = lon_de_x(x * TAM + p, z)
+        lat = lat_de_y(y * TAM + p, z)
+        lat_min, lat_max, lon_min, lon_max = self.lim
+        filas = np.flatnonzero((lat >= lat_min) & (lat <= lat_max))
+        cols = np.flatnonzero((lon >= lon_min) & (lon <= lon_max))
+        Z = np.full((TAM, TAM), np.nan)
+        if not (len(filas) and len(cols)):
+            return Z
+        s = self.paso_px(z)
+        f0, f1 = filas[0] // s, filas[-1] // s + 1      # nodo k: pixel k * s
+        c0, c1 = cols[0] // s, cols[-1] // s + 1
+        Lon, Lat = np.meshgrid(lon_de_x(x * TAM + np.arange(c0, c1 + 1) * s + 0.5, z),
+                               lat_de_y(y * TAM + np.arange(f0, f1 + 1) * s + 0.5, z))
+        QX, QY = self.proy.enu(Lat, Lon)
+        Zn = refinamiento.adaptativa(self.evaluar, QX, QY, self.vals)
+        r = np.arange(filas[0], filas[-1] + 1)
+        c = np.arange(cols[0], cols[-1] + 1)
+        if s == 1:
+            Z[r[0]:r[-1] + 1, c[0]:c[-1] + 1] = Zn[r - f0][:, c - c0]
+            return Z
+        a, t = r // s - f0, ((r % s) / s)[:, None]
+        Zr = Zn[a] * (1.0 - t) + Zn[a + 1] * t
+        b, u = c // s - c0, (c % s) / s
+        Z[r[0]:r[-1] + 1, c[0]:c[-1] + 1] = Zr[:, b] * (1.0 - u) + Zr[:, b + 1] * u
+        return Z
+
+    def calcular(self, z: int, x: int, y: int) -> bytes:
+        return write_png(interpolacion.raster_niveles(self.campo(z, x, y), self.vals))
+
+    def tesela(self, z: int, x: int, y: int) -> bytes:
+        ruta = os.path.join(self.carpeta, str(z), str(x), f"{y}.png")
+        try:
+            with open(ruta, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        png = self.calcular(z, x, y)
+        tmp = f"{ruta}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, ruta)
+        except OSError:
+            pass        # sin disco: se sirve igual, se recalcula la proxima vez
+        return png
+
+
+class _Manejador(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        m = _URL.match(self.path.split("?")[0])
+        try:
+            png = self.server.tesela(m[1], int(m[2]), int(m[3]), int(m[4])) if m else None
+        except Exception as e:
+            print(f"[TESELAS] {self.path}: {type(e).__name__}: {e}", flush=True)
+            self.send_error(500)
+            return
+        if png is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(png)))
+        # la URL lleva la version de los datos: una tesela servida no cambia nunca
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.end_headers()
+        self.wfile.write(png)
+
+    def log_message(self, *args):
+        pass            # una linea por tesela no sirve en el journal; los errores si se imprimen
+
+
+class ServidorTeselas(http.server.HTTPServer):
+    """Un pedido a la vez, como servicio.py: las teselas de una vista se encolan en vez de
+    competir por la CPU (cada una ya reparte sus celdas en hilos, paralelo.py)."""
+
+    def __init__(self, puerto: int = PUERTO, carpeta: str | None = None):
+        self.carpeta = carpeta or RUTA_TESELAS
+        self._piramides = OrderedDict()
+        self._vacia = write_png(np.zeros((TAM, TAM, 4), dtype=np.uint8))
+        super().__init__(("127.0.0.1", puerto), _Manejador)
+
+    def piramide(self, v: str) -> Piramide | None:
+        if v in self._piramides:
+            self._piramides.move_to_end(v)
+            return self._piramides[v]
+        carpeta = os.path.join(self.carpeta, v)
+        if not os.path.exists(os.path.join(carpeta, ARCHIVO_META)):
+            return None
+        p = self._piramides[v] = Piramide(carpeta)
+        while len(self._piramides) > EN_MEMORIA:
+            self._piramides.popitem(last=False)
+        return p
+
+    def tesela(self, v: str, z: int, x: int, y: int) -> bytes | None:
+        """PNG de la tesela, o None si la version no existe o z esta fuera de rango."""
+        if not Z_MIN <= z <= Z_MAX:
+            return None
+        try:
+            with open(os.path.join(self.carpeta, v, str(z), str(x), f"{y}.png"), "rb") as f:
+                return f.read()     # ya calculada: sin cargar ni ajustar nada
+        except FileNotFoundError:
+            pass
+        p = self.piramide(v)
+        if p is None:
+            return None
+        return p.tesela(z, x, y) if p.contiene(z, x, y) else self._vacia
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servidor de teselas XYZ de zonificacion")
+    ap.add_argument("--puerto", type=int, default=PUERTO)
+    ap.add_argument("--carpeta", default=RUTA_TESELAS)
+    args = ap.parse_args()
+
+    srv = ServidorTeselas(args.puerto, args.carpeta)
+    print(f"[TESELAS] Servidor listo en http://127.0.0.1:{args.puerto}{PREFIJO_URL}/ ({args.carpeta})", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# rbf_local.py
+# RBF por teselas con solape, en metros, con presupuesto de memoria
+# - Mismo nucleo que el Rbf legacy de tec03: inverse_multiquadric
+#   phi(r) = 1/sqrt((r/eps)^2 + 1), eps por defecto = "distancia media entre nodos" del
+#   rectangulo envolvente (misma formula que Rbf)
+# - Suavizado: (Phi + smooth*I) c = v, como scipy.interpolate.RBFInterpolator.
+#   El Rbf legacy RESTA smooth de la diagonal: con smooth=50 y muchos puntos el sistema
+#   queda indefinido y casi singular (CPM negativos, oscilaciones); aqui es definido
+#   positivo y se resuelve por Cholesky
+# - Ajuste en metros (coordenadas de geodesia.ProyeccionLocal): Rbf sobre grados estira
+#   las distancias E-O
+# - Teselas: quadtree sobre las muestras hasta que cada tesela + solape tenga <= m_max
+#   muestras; cada una se resuelve por separado y se mezclan con pesos que valen 1 en
+#   el nucleo de la tesela y bajan a 0 en el borde del solape (particion de la unidad)
+# - m_max y el trozo de evaluacion salen de presupuesto_mb (sistema m x m + trozo q x m);
+#   los trozos de consultas se reparten en hilos (paralelo.por_trozos)
+# - N <= m_max: una sola tesela, igual a la solucion global en metros
+# - RBFTeselas: ajusta una vez y evalua en cualquier conjunto de consultas (malla adaptativa)
+
+import math
+
+import numpy as np
+from scipy.linalg import solve
+from scipy.spatial import cKDTree
+
+from .paralelo import por_trozos
+
+PRESUPUESTO_MB = 64
+SOLAPE = 0.25           # fraccion del lado de la tesela que se agrega por cada lado
+M_MIN = 16              # teselas con menos muestras usan las M_MIN mas cercanas
+SUAVIZADO = 1.0         # en unidades de phi (phi(0) = 1); ~ ruido de conteo sin aplanar el pico
+
+
+def epsilon_defecto(x, y) -> float:
+    """Igual que Rbf: (producto de lados no nulos / N) ^ (1 / dimensiones)."""
+    lados = np.array([np.ptp(x), np.ptp(y)])
+    lados = lados[np.nonzero(lados)]
+    if lados.size == 0:
+        return 1.0
+    return float(np.power(np.prod(lados) / len(x), 1.0 / lados.size))
+
+
+def m_max_de(presupuesto_mb: float) -> int:
+    # matriz del sistema + copia de la factorizacion + bloque de evaluacion de igual tamano
+    return max(M_MIN, int(math.sqrt(presupuesto_mb * 1024 * 1024 / (8 * 3))))
+
+
+def _phi(dx, dy, eps: float):
+    return 1.0 / np.sqrt((dx*dx + dy*dy) / (eps*eps) + 1.0)
+
+
+def _ajustar(x, y, v, eps: float, smooth: float):
+    A = _phi(x[:, None] - x[None, :], y[:, None] - y[None, :], eps)
+    A[np.diag_indices_from(A)] += smooth
+    return solve(A, v, assume_a="pos", overwrite_a=True, check_finite=False)
+
+
+def _evaluar(x, y, coef, qx, qy, eps: float, bloque: int):
+    z = np.empty(qx.shape[0])
+    for a in range(0, qx.shape[0], bloque):
+        phi = _phi(qx[a:a + bloque, None] - x[None, :], qy[a:a + bloque, None] - y[None, :], eps)
+        # einsum y no "@": gemv de BLAS cambia el redondeo segun cuantas filas tenga el
+        # bloque, y los trozos de paralelo dependen del numero de hilos
+        z[a:a + bloque] = np.einsum("ij,j->i", phi, coef)
+    return z
+
+
+def rbf_global(x, y, v, qx, qy, epsilon: float | None = None, smooth: float = SUAVIZADO,
+               presupuesto_mb: float = PRESUPUESTO_MB):
+    """Solucion global (referencia): un solo sistema N x N."""
+    eps = epsilon if epsilon is not None else epsilon_defecto(x, y)
+    bloque = max(1, int(presupuesto_mb * 1024 * 1024 / (8 * 3 * len(x))))
+    return _evaluar(x, y, _ajustar(x, y, v, eps, smooth), qx, qy, eps, bloque)
+
+
+def teselas(x, y, caja: tuple, m_max: int, solape: float = SOLAPE) -> list:
+    """Quadtree sobre `caja` (x0, x1, y0, y1): hojas (caja, indices de muestras en caja + solape)."""
+    hojas = []
+    pendientes = [caja]
+    while pendientes:
+        x0, x1, y0, y1 = pendientes.pop()
+        sx, sy = (x1 - x0) * solape, (y1 - y0) * solape
+        dentro = np.flatnonzero((x >= x0 - sx) & (x <= x1 + sx) & (y >= y0 - sy) & (y <= y1 + sy))
+        if len(dentro) <= m_max or (x1 - x0) < 1e-3:
+            hojas.append(((x0, x1, y0, y1), dentro))
+            continue
+        xm, ym = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+        pendientes += [(x0, xm, y0, ym), (xm, x1, y0, ym), (x0, xm, ym, y1), (xm, x1, ym, y1)]
+    return hojas
+
+
+def _peso(q, a: float, b: float, s: float):
+    """1 dentro de [a, b], rampa lineal a 0 en [a - s, a] y [b, b + s]."""
+    if s <= 0:
+        return ((q >= a) & (q <= b)).astype(float)
+    return np.clip(np.minimum(q - (a - s), (b + s) - q) / s, 0.0, 1.0)
+
+
+class RBFTeselas:
+    """Ajuste por teselas de las muestras (xs, ys en metros), una sola vez; la instancia se
+    llama con cualquier conjunto de consultas (malla completa o solo las celdas que pide
+    refinamiento.adaptativa). `caja` (x0, x1, y0, y1): area a cubrir, por defecto la de las
+    muestras."""
+
+    def __init__(self, xs, ys, vals, caja: tuple | None = None, smooth: float = SUAVIZADO,
+                 epsilon: float | None = None, presupuesto_mb: float = PRESUPUESTO_MB,
+                 solape: float = SOLAPE):
+        x = np.asarray(xs, dtype=float)
+        y = np.asarray(ys, dtype=float)
+        v = np.asarray(vals, dtype=float)
+        self.eps = epsilon if epsilon is not None else epsilon_defecto(x, y)
+        self.solape = solape
+        self.m_max = m_max_de(presupuesto_mb)
+        self.presupuesto_mb = presupuesto_mb
+        if caja is None:
+            caja = (x.min(), x.max(), y.min(), y.max())
+        hojas = teselas(x, y, caja, self.m_max, solape)
+        arbol = None
+        self.hojas = []
+        for (x0, x1, y0, y1), idx in hojas:
+            if len(idx) < min(M_MIN, len(x)):
+                if arbol is None:
+                    arbol = cKDTree(np.column_stack([x, y]))
+                idx = arbol.query([(x0 + x1) / 2.0, (y0 + y1) / 2.0], k=min(M_MIN, len(x)))[1]
+                idx = np.atleast_1d(idx)
+            coef = _ajustar(x[idx], y[idx], v[idx], self.eps, smooth)
+            self.hojas.append(((x0, x1, y0, y1), x[idx], y[idx], coef))
+
+    @property
+    def info(self) -> dict:
+        return {"teselas": len(self.hojas), "m_max": self.m_max, "epsilon_m": self.eps}
+
+    def _trozo(self, qx, qy):
+        num = np.zeros(qx.shape[0])
+        den = np.zeros(qx.shape[0])
+        for (x0, x1, y0, y1), hx, hy, coef in self.hojas:
+            sx, sy = (x1 - x0) * self.solape, (y1 - y0) * self.solape
+            q = np.flatnonzero((qx >= x0 - sx) & (qx <= x1 + sx) & (qy >= y0 - sy) & (qy <= y1 + sy))
+            if len(q) == 0:
+                continue
+            w = _peso(qx[q], x0, x1, sx) * _peso(qy[q], y0, y1, sy)
+            num[q] += w * _evaluar(hx, hy, coef, qx[q], qy[q], self.eps, len(q))
+            den[q] += w
+        return num / np.where(den > 0, den, 1.0)
+
+    def __call__(self, QX, QY, hilos: int | None = None, presupuesto_mb: float | None = None):
+        """Trozos de consultas en paralelo; cada trozo suma todas las teselas en el mismo
+        orden (determinista). Por consulta: dx, dy, phi de una tesela (<= m_max muestras)."""
+        qx = np.asarray(QX, dtype=float).ravel()
+        qy = np.asarray(QY, dtype=float).ravel()
+        z = por_trozos(self._trozo, qx, qy, 8 * 3 * self.m_max, presupuesto_mb or self.presupuesto_mb, hilos)
+        return z.reshape(np.shape(QX))
+
+
+def rbf_teselas(xs, ys, vals, QX, QY, smooth: float = SUAVIZADO, epsilon: float | None = None,
+                presupuesto_mb: float = PRESUPUESTO_MB, solape: float = SOLAPE, devolver_info: bool = False):
+    """RBF local de las muestras (xs, ys en metros) sobre las consultas (QX, QY, cualquier
+    forma); devuelve Z con esa forma."""
+    x = np.asarray(xs, dtype=float)
+    y = np.asarray(ys, dtype=float)
+    qx = np.asarray(QX, dtype=float)
+    qy = np.asarray(QY, dtype=float)
+    caja = (min(x.min(), qx.min()), max(x.max(), qx.max()), min(y.min(), qy.min()), max(y.max(), qy.max()))
+    rbf = RBFTeselas(x, y, vals, caja, smooth, epsilon, presupuesto_mb, solape)
+    z = rbf(qx, qy)
+    if devolver_info:
+        return z, rbf.info
+    return z
@@ -0,0 +1,103 @@
+# refinamiento.py
+# Evaluacion adaptativa de una malla (quadtree): el interpolador solo se llama donde
+# el mapa tiene detalle
+# - se parte de bloques de BLOQUE x BLOQUE celdas; de cada bloque se evaluan las 4
+#   esquinas y el centro
+# - bloque liso (mismo nivel en los 5 puntos y variacion <= TOLERANCIA del rango de
+#   colores p1-p99): el interior se rellena bilineal desde las esquinas
+# - si no (borde de nivel, gradiente fuerte, NaN) se parte en 4 y se repite hasta
+#   celdas individuales: ahi el valor es el del interpolador
+# - los bordes compartidos quedan con el valor evaluado si el vecino se refino (sin grietas)
+# Con la tolerancia por defecto el color de cada celda coincide con el de la malla
+# completa salvo en una fraccion minima de celdas (benchmarks/bench_malla_metrica.py).
+
+import numpy as np
+
+from .niveles import niveles
+
+BLOQUE = 8              # lado inicial en celdas (4 m con celdas de 0.5 m)
+TOLERANCIA = 0.05       # fraccion de (p99 - p1) de las muestras
+
+
+def _cortes(a, b, partir):
+    """Mitades [a, m] y [m, b] de los intervalos que se parten; el resto queda [a, b]."""
+    m = (a + b) // 2
+    return (a, np.where(partir, m, b)), (m[partir], b[partir])
+
+
+def _rellenar(Z, hecho, r0, r1, c0, c1):
+    """Bilineal desde las esquinas en los bloques dados, sin tocar celdas ya evaluadas."""
+    dr, dc = r1 - r0, c1 - c0
+    for a, b in np.unique(np.column_stack([dr, dc]), axis=0):
+        sel = (dr == a) & (dc == b)
+        i, j = r0[sel], c0[sel]
+        t = (np.arange(a + 1) / a)[None, :, None]
+        u = (np.arange(b + 1) / b)[None, None, :]
+        z00, z01 = Z[i, j][:, None, None], Z[i, j + b][:, None, None]
+        z10, z11 = Z[i + a, j][:, None, None], Z[i + a, j + b][:, None, None]
+        zb = (1 - t) * ((1 - u) * z00 + u * z01) + t * ((1 - u) * z10 + u * z11)
+        rr = i[:, None, None] + np.arange(a + 1)[None, :, None]
+        cc = j[:, None, None] + np.arange(b + 1)[None, None, :]
+        Z[rr, cc] = np.where(hecho[rr, cc], Z[rr, cc], zb)
+
+
+def adaptativa(evaluar, QX, QY, vals, bloque: int = BLOQUE, tolerancia: float = TOLERANCIA,
+               devolver_info: bool = False):
+    """Z con la forma de QX/QY (malla 2D); evaluar(qx, qy) recibe arrays 1D de consultas y
+    devuelve sus valores (IDW, RBFTeselas...). `vals`: muestras, para la escala de colores.
+    QX/QY 1D: ejes (ex, ny) de ligero.ejes, Z de (len(ny), len(ex)) en float32 sin armar
+    la malla completa."""
+    if np.ndim(QX) == 1:
+        h, w = len(QY), len(QX)
+        coordenadas = lambda k: (QX[k % w], QY[k // w])
+        Z = np.full((h, w), np.nan, dtype=np.float32)
+    else:
+        h, w = QX.shape
+        qx, qy = QX.ravel(), QY.ravel()
+        coordenadas = lambda k: (qx[k], qy[k])
+        Z = np.full((h, w), np.nan)
+    hecho = np.zeros((h, w), dtype=bool)
+    zmin, zmax = np.percentile(vals, 1), np.percentile(vals, 99)
+    umbral = tolerancia * max(zmax - zmin, 1e-12)
+    llamadas = 0
+
+    def asegurar(r, c):
+        nonlocal llamadas
+        k = np.unique(r * w + c)
+        k = k[~hecho.flat[k]]
+        if len(k):
+            Z.flat[k] = evaluar(*coordenadas(k))
+            hecho.flat[k] = True
+            llamadas += 1
+
+    filas = np.unique(np.r_[np.arange(0, h, bloque), h - 1])
+    cols = np.unique(np.r_[np.arange(0, w, bloque), w - 1])
+    R, C = np.meshgrid(np.arange(len(filas) - 1), np.arange(len(cols) - 1), indexing="ij")
+    r0, r1 = filas[R.ravel()], filas[R.ravel() + 1]
+    c0, c1 = cols[C.ravel()], cols[C.ravel() + 1]
+
+    while r0.size:
+        rm, cm = (r0 + r1) // 2, (c0 + c1) // 2
+        asegurar(np.r_[r0, r0, r1, r1, rm], np.r_[c0, c1, c0, c1, cm])
+        puntos = np.stack([Z[r0, c0], Z[r0, c1], Z[r1, c0], Z[r1, c1], Z[rm, cm]])
+        niv = niveles(np.clip(puntos, zmin, zmax))
+        liso = (np.all(niv == niv[0], axis=0) & ~np.isnan(puntos).any(axis=0)
+                & (np.ptp(puntos, axis=0) <= umbral))
+        grande = (r1 - r0 > 1) | (c1 - c0 > 1)
+        _rellenar(Z, hecho, r0[liso], r1[liso], c0[liso], c1[liso])
+
+        p = ~liso & grande
+        r0, r1, c0, c1 = r0[p], r1[p], c0[p], c1[p]
+        pr, pc = r1 - r0 > 1, c1 - c0 > 1
+        (ra, rb), (rc, rd) = _cortes(r0, r1, pr)
+        (ca, cb), (cc, cd) = _cortes(c0, c1, pc)
+        # hijos: arriba-izq siempre; arriba-der si se parte en columnas; abajo-* si en filas
+        ambos = pr & pc
+        r0 = np.r_[ra, ra[pc], rc, rc[pc[pr]]]
+        r1 = np.r_[rb, rb[pc], rd, rd[pc[pr]]]
+        c0 = np.r_[ca, cc, ca[pr], cc[ambos[pc]]]
+        c1 = np.r_[cb, cd, cb[pr], cd[ambos[pc]]]
+
+    if devolver_info:
+        return Z, {"evaluadas": int(hecho.sum()), "celdas": h * w, "llamadas": llamadas}
+    return Z
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# servicio.py
+# Servicio residente de zonificacion en un socket Unix local
+# - Carga pandas/numpy/folium/scipy una sola vez al arrancar y mantiene el
+#   ultimo CSV leido en memoria (datos.cargar); cada pedido solo calcula y guarda
+# - Atiende un pedido a la vez (socketserver sin hilos): dos clics seguidos se
+#   encolan en el socket en vez de competir por la CPU de la Raspberry Pi
+# - Protocolo: una linea JSON por conexion
+#     -> {"tecnica": "idw", "csv": null, "html": null}
+#     <- {"ok": true, "html": "/home/itoroc/zonas/mapa_zonas.html", "ms": 412.3}
+#   "todas" (lote.generar_todas): "html" es la carpeta y la respuesta trae un HTML por tecnica
+#     -> {"tecnica": "todas", "csv": null, "html": null}
+#     <- {"ok": true, "html": {"concentrico": "/home/itoroc/zonas/mapa_concentrico.html", ...}, "ms": 980.1}
+#
+# Uso (desde /home/itoroc/zonas, p.ej. como unidad systemd con Restart=always):
+#   python3 -m zonificacion.servicio [--socket /home/itoroc/zonas/zonificacion.sock]
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import time
+
+from . import RUTA_SOCKET, RUTA_HTML, RUTA_ZONAS
+
+TIMEOUT_S = 120.0       # el RBF con muchas muestras puede tardar
+
+
+def solicitar(tecnica: str, ruta_csv: str | None = None, ruta_html: str | None = None,
+              ruta_socket: str = RUTA_SOCKET, timeout: float = TIMEOUT_S) -> dict:
+    """Pide un mapa al servicio. Lanza OSError si el servicio no esta corriendo."""
+    pedido = json.dumps({"tecnica": tecnica, "csv": ruta_csv, "html": ruta_html}) + "\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(ruta_socket)
+        s.sendall(pedido.encode("utf-8"))
+        s.shutdown(socket.SHUT_WR)
+        respuesta = b""
+        while True:
+            parte = s.recv(4096)
+            if not parte:
+                break
+            respuesta += parte
+    return json.loads(respuesta)
+
+
+class _Manejador(socketserver.StreamRequestHandler):
+    def handle(self):
+        t0 = time.perf_counter()
+        try:
+            pedido = json.loads(self.rfile.readline())
+            if pedido["tecnica"] == "todas":
+                html = self.server.generar_todas(pedido.get("csv"), pedido.get("html") or RUTA_ZONAS)
+            else:
+                html = self.server.generar(pedido["tecnica"], pedido.get("csv"), pedido.get("html") or RUTA_HTML)
+            resp = {"ok": True, "html": html}
+        except Exception as e:
+            resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        resp["ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        self.wfile.write((json.dumps(resp) + "\n").encode("utf-8"))
+        print(f"[ZONAS] {resp}", flush=True)
+
+
+class ServicioZonificacion(socketserver.UnixStreamServer):
+    def __init__(self, ruta_socket: str = RUTA_SOCKET):
+        from .tecnicas import generar     # imports pesados: una vez, al arrancar
+        from .lote import generar_todas
+        self.generar = generar
+        self.generar_todas = generar_todas
+        self.ruta_socket = ruta_socket
+        d = os.path.dirname(ruta_socket)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        if os.path.exists(ruta_socket):
+            os.unlink(ruta_socket)      # socket huerfano de una ejecucion anterior
+        super().__init__(ruta_socket, _Manejador)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.ruta_socket)
+        except FileNotFoundError:
+            pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servicio residente de zonificacion")
+    ap.add_argument("--socket", default=RUTA_SOCKET)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    srv = ServicioZonificacion(args.socket)
+    print(f"[ZONAS] Servicio listo en {args.socket} (imports {time.perf_counter() - t0:.2f} s)", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# sintetico.py
+# Mediciones sinteticas para bancos de prueba (sin detector ni Node-RED)
+# - recorrido aleatorio alrededor de una fuente puntual, CPM ~ fondo + 1/r^2
+# - campo(): CPM sin ruido en cualquier punto (verdad para medir error de interpolacion)
+# - escribir_csv(): mismas columnas que "Exporta tabla_datos" en Node-RED
+
+import math
+import random
+
+import numpy as np
+
+from .geodesia import ProyeccionLocal
+
+COLUMNAS_CSV = ["Registro", "Ano", "Mes", "Dia", "Hora", "Minuto", "Segundo",
+                "Latitud", "Longitud", "Intensidad", "CPM", "D_uSv_h"]
+LAT0, LON0 = -33.4489, -70.6693
+_PROY = ProyeccionLocal(LAT0, LON0)
+
+
+def _cpm(x, y, radio_m: float):
+    fx, fy = 0.0, 0.3 * radio_m             # fuente, en metros desde (LAT0, LON0)
+    return 60.0 + 12000.0 / (1.0 + ((x - fx) ** 2 + (y - fy) ** 2) / 25.0)
+
+
+def campo(lats, lons, radio_m: float = 60.0):
+    """CPM esperado (sin ruido) en (lats, lons); escalares o arrays numpy."""
+    return _cpm(*_PROY.enu(lats, lons), radio_m)
+
+
+def mediciones(n: int, semilla: int = 1, radio_m: float = 60.0) -> tuple:
+    """(lats, lons, cpms) como listas; n puntos dentro de ~radio_m de la fuente."""
+    rnd = random.Random(semilla)
+    paso = radio_m / max(1.0, math.sqrt(n) / 4.0)
+    x, y = 0.0, -radio_m
+    xs, ys, cpms = [], [], []
+    for _ in range(n):
+        x += rnd.uniform(-paso, paso)
+        y += rnd.uniform(-paso, paso)
+        # rebote en el borde del area
+        if x > radio_m: x = 2 * radio_m - x
+        if x < -radio_m: x = -2 * radio_m - x
+        if y > radio_m: y = 2 * radio_m - y
+        if y < -radio_m: y = -2 * radio_m - y
+        cpm = int(max(0.0, _cpm(x, y, radio_m) + rnd.gauss(0, 12)))
+        xs.append(x); ys.append(y); cpms.append(cpm)
+    lats, lons = _PROY.latlon(np.array(xs), np.array(ys))
+    return lats.tolist(), lons.tolist(), cpms
+
+
+def escribir_csv(ruta: str, n: int, semilla: int = 1):
+    lats, lons, cpms = mediciones(n, semilla)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(",".join(COLUMNAS_CSV) + "\n")
+        for i, (la, lo, c) in enumerate(zip(lats, lons, cpms)):
+            hh, mm, ss = 12 + i // 3600, i // 60 % 60, i % 60
+            f.write(f"{i + 1:04d},2025,9,15,{hh},{mm},{ss},{la:.7f},{lo:.7f},0,{c},{round(c / 151, 2)}\n")
@@ -0,0 +1,323 @@
+# tecnicas.py
+# Las cuatro tecnicas de zonificacion; cada una recibe el DataFrame de datos.cargar()
+# y devuelve el mapa folium
+# - concentrico (tec01): circulos de exclusion alrededor del foco (max CPM)
+# - idw (tec02): overlay IDW + perimetro exterior
+# - rbf (tec03): overlay RBF por teselas en metros (rbf_local; si no hay scipy, cae a IDW)
+#   + perimetro exterior
+# - trayecto (tec04): circulos de exclusion + camino recorrido en orden GPS
+# - en las cuatro, las mediciones van como una capa GeoJSON dibujada en canvas (_puntos)
+# - idw/rbf: malla de celdas de interpolacion.PASO_M metros (tope MAX_CELDAS); con
+#   MALLA_ADAPTATIVA el interpolador solo se evalua donde hay bordes de nivel (refinamiento);
+#   con BAJA_MEMORIA se evalua en float32 sin armar la malla completa (ligero)
+# - idw/rbf con TESELAS: en vez del raster de la malla, un TileLayer de teselas XYZ que
+#   calcula piramide.ServidorTeselas a medida que se piden (HTML sin imagen, nitido hasta
+#   piramide.Z_MAX); si no se puede publicar, vuelve al raster
+# - idw/rbf con ISOBANDAS (raster): bordes de cada nivel como poligonos GeoJSON con su
+#   area (isobandas.py) y el perimetro exterior es el borde de {Z > CPM_MIN} en vez del
+#   circulo de radio max(nivel 2) + 10 m; con teselas (sin malla) queda el circulo
+
+import json
+import os
+
+import folium
+import numpy as np
+import pandas as pd
+
+from . import RUTA_HTML
+from . import datos
+from .comun import colormap_int, grosor_por_nivel
+from .geodesia import ProyeccionLocal
+from . import interpolacion, isobandas, ligero, piramide, refinamiento
+from .idw import K_DEFECTO
+
+MALLA_ADAPTATIVA = True
+BAJA_MEMORIA = False    # ligero.py: ejes 1D, float32, buffers por hilo (Pi con poca RAM libre)
+TESELAS = False         # piramide.py: requiere el servidor de teselas y la ruta /teselas/* en Node-RED
+ZOOM_BASE = 20          # zoom maximo de las teselas de cartodbpositron
+ISOBANDAS = True        # isobandas.py: bordes de nivel como poligonos y perimetro real
+
+
+def _foco(df: pd.DataFrame) -> tuple:
+    indice_max = df[df["CPM"] == df["CPM"].max()].index[0]
+    return float(df.loc[indice_max, "Latitud"]), float(df.loc[indice_max, "Longitud"])
+
+
+def _puntos(m, df: pd.DataFrame, fmt_cpm):
+    """Mediciones como una sola capa GeoJSON (circulos en canvas); color y popup se arman
+    en el navegador a partir de las propiedades n (nivel) y c (CPM ya formateado).
+    `fmt_cpm` recibe la columna CPM y devuelve textos."""
+    lons = df["Longitud"].astype(float).round(7).tolist()
+    lats = df["Latitud"].astype(float).round(7).tolist()
+    niv = df["Nivel"].astype(int).tolist()
+    cpm = fmt_cpm(df["CPM"]).astype(str).tolist()
+    capa = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lo, la]}, "properties": {"n": n, "c": c}}
+            for lo, la, n, c in zip(lons, lats, niv, cpm)
+        ],
+    }
+    colores = json.dumps([colormap_int.get(n, "#B0B0B0") for n in range(6)])
+    folium.GeoJson(
+        capa, name="Mediciones", control=False,
+        marker=folium.CircleMarker(radius=3, color="black", fill=True, fill_opacity=0.9, weight=0.3),
+        on_each_feature=folium.JsCode(f"""
+            function (feature, layer) {{
+                const p = feature.properties;
+                layer.setStyle({{fillColor: {colores}[p.n] || "#B0B0B0"}});
+                layer.bindPopup(() => "Nivel " + p.n + " (" + p.c + " CPM)");
+            }}
+        """),
+    ).add_to(m)
+
+
+def _radios_por_nivel(df: pd.DataFrame, proy: ProyeccionLocal) -> dict:
+    """Distancia (m) de la muestra mas lejana al foco de cada nivel 2..5, + 1 m (0 si no hay)."""
+    dist = proy.distancia(df["Latitud"].to_numpy(float), df["Longitud"].to_numpy(float))
+    lejos = pd.Series(dist, index=df.index).groupby(df["Nivel"].to_numpy()).max()
+    return {nivel: float(lejos[nivel]) + 1.0 if nivel in lejos.index else 0.0 for nivel in range(2, 6)}
+
+
+def _radios_exclusion(df: pd.DataFrame, proy: ProyeccionLocal) -> dict:
+    radios = _radios_por_nivel(df, proy)
+    radios[1] = radios[2] + 10.0 if radios[2] else 15.0
+    return radios
+
+
+def _circulos_exclusion(m, radios: dict, lat_centro: float, lon_centro: float):
+    for nivel in range(1, 6):
+        radio_m = radios[nivel]
+        if radio_m > 0:
+            folium.Circle(
+                location=[lat_centro, lon_centro],
+                radius=float(radio_m),
+                color=colormap_int[nivel],
+                weight=grosor_por_nivel[nivel],
+                fill=False,
+                popup=f"Zona Nivel {nivel}"
+            ).add_to(m)
+
+
+def _linea_al_foco(m, ini: tuple, proy: ProyeccionLocal):
+    foco = (proy.lat0, proy.lon0)
+    texto_distancia = f"Distancia al foco: {float(proy.distancia(*ini)):.1f} m"
+    folium.PolyLine(
+        [ini, foco],
+        color="black",
+        weight=2,
+        popup=texto_distancia,
+        tooltip=texto_distancia
+    ).add_to(m)
+
+
+def _perimetro_exterior(m, df: pd.DataFrame, proy: ProyeccionLocal):
+    # perimetro exterior (nivel 1) usando max distancia de niveles 2..5
+    lat_centro, lon_centro = proy.lat0, proy.lon0
+    radios = _radios_por_nivel(df, proy)
+    radio_exterior = (radios[2] + 10.0) if radios[2] else 15.0
+
+    folium.Circle(
+        location=[lat_centro, lon_centro],
+        radius=radio_exterior,
+        color=colormap_int[1],
+        weight=0.8,
+        fill=False,
+        popup="Perimetro exterior (Nivel 1)"
+    ).add_to(m)
+
+
+def _campo(lats, lons, vals, lim: tuple, proy: ProyeccionLocal, usar_rbf: bool, k: int | None,
+           radio: float | None, adaptativa: bool, baja_memoria: bool) -> tuple:
+    """(Z, nombre, a_metros): malla interpolada, nombre de la capa y (fila, col) -> metros."""
+    h, w, _ = interpolacion.forma_metrica(lim, proy)
+    # muestras y celdas en metros alrededor del foco: pesos isotropicos, `radio` en metros
+    xs, ys = proy.enu(lats, lons)
+    if baja_memoria:
+        QX, QY = ligero.ejes(lim, proy, h, w)       # ejes 1D, sin malla completa
+        a_metros = isobandas.ejes_metricos(QX, QY)
+    else:
+        Lon, Lat = interpolacion.malla(lim, h, w)
+        QX, QY = proy.enu(Lat, Lon)
+        a_metros = isobandas.ejes_latlon(lim, h, w, proy)
+    evaluar, nombre = interpolacion.evaluador(xs, ys, vals, usar_rbf, (QX.min(), QX.max(), QY.min(), QY.max()),
+                                              k, radio, baja_memoria)
+    if adaptativa:
+        Z = refinamiento.adaptativa(evaluar, QX, QY, vals)
+    elif baja_memoria:
+        Z = evaluar.malla(QX, QY)
+    else:
+        Z = evaluar(QX, QY)
+    return Z, nombre, a_metros
+
+
+def _capa_raster(m, Z, vals, lim: tuple, nombre: str):
+    img = interpolacion.raster_niveles(Z, vals)
+    lat_min, lat_max, lon_min, lon_max = lim
+    folium.raster_layers.ImageOverlay(
+        image=img, bounds=[[lat_min, lon_min], [lat_max, lon_max]], opacity=1.0, interactive=False,
+        cross_origin=False, zindex=1, name=nombre
+    ).add_to(m)
+
+
+def _zonas_por_nivel(m, bandas: dict):
+    """Bordes de las isobandas (sin relleno: el color ya lo da el raster), con el area de
+    cada nivel en el popup."""
+    if not bandas["features"]:
+        return
+    folium.GeoJson(
+        bandas, name="Zonas por nivel",
+        style_function=lambda f: {"color": f["properties"]["color"], "weight": grosor_por_nivel[f["properties"]["nivel"]],
+                                  "fill": False},
+        popup=folium.GeoJsonPopup(fields=["nivel", "area_m2"], aliases=["Nivel", "Area (m2)"]),
+    ).add_to(m)
+
+
+def _perimetro_isobandas(m, anillos: list) -> bool:
+    """Perimetro exterior (nivel 1) como el borde de {Z > CPM_MIN}; False si no hay."""
+    for anillo in anillos:
+        folium.PolyLine(
+            anillo, color=colormap_int[1], weight=0.8, popup="Perimetro exterior (Nivel 1)"
+        ).add_to(m)
+    return bool(anillos)
+
+
+def zonas(df: pd.DataFrame, usar_rbf: bool = False, k: int | None = K_DEFECTO, radio: float | None = None,
+          adaptativa: bool | None = None, baja_memoria: bool | None = None) -> dict:
+    """Isobandas de nivel (FeatureCollection GeoJSON) de la malla del mapa idw/rbf."""
+    lat_centro, lon_centro = _foco(df)
+    proy = ProyeccionLocal(lat_centro, lon_centro)
+    lats = df["Latitud"].astype(float).to_numpy()
+    lons = df["Longitud"].astype(float).to_numpy()
+    vals = df["CPM"].astype(float).to_numpy()
+    Z, _, a_metros = _campo(lats, lons, vals, interpolacion.limites(lats, lons), proy, usar_rbf, k, radio,
+                            MALLA_ADAPTATIVA if adaptativa is None else adaptativa,
+                            BAJA_MEMORIA if baja_memoria is None else baja_memoria)
+    return isobandas.isobandas(Z, vals, a_metros, proy)
+
+
+def _mapa_interpolado(df: pd.DataFrame, usar_rbf: bool, k: int | None = K_DEFECTO, radio: float | None = None,
+                      adaptativa: bool | None = None, baja_memoria: bool | None = None, teselas: bool | None = None,
+                      zonas_nivel: bool | None = None):
+    lat_centro, lon_centro = _foco(df)
+    proy = ProyeccionLocal(lat_centro, lon_centro)
+    adaptativa = MALLA_ADAPTATIVA if adaptativa is None else adaptativa
+    baja_memoria = BAJA_MEMORIA if baja_memoria is None else baja_memoria
+    teselas = TESELAS if teselas is None else teselas
+    zonas_nivel = ISOBANDAS if zonas_nivel is None else zonas_nivel
+
+    lats = df["Latitud"].astype(float).to_numpy()
+    lons = df["Longitud"].astype(float).to_numpy()
+    vals = df["CPM"].astype(float).to_numpy()
+    lim = interpolacion.limites(lats, lons)
+
+    url = None
+    perimetro = []
+    if teselas:
+        try:
+            url = piramide.publicar(lats, lons, vals, (lat_centro, lon_centro), usar_rbf, k, radio)
+        except OSError:
+            url = None      # carpeta de teselas no escribible: raster embebido, como siempre
+
+    if url is None:
+        m = folium.Map(location=[lat_centro, lon_centro], zoom_start=20, tiles='cartodbpositron', prefer_canvas=True)
+        Z, nombre, a_metros = _campo(lats, lons, vals, lim, proy, usar_rbf, k, radio, adaptativa, baja_memoria)
+        _capa_raster(m, Z, vals, lim, nombre)
+        if zonas_nivel:
+            _zonas_por_nivel(m, isobandas.isobandas(Z, vals, a_metros, proy))
+            perimetro = isobandas.perimetro(Z, vals, a_metros, proy)
+    else:
+        # el mapa base se estira pasado su zoom 20; las teselas de zonificacion llegan a Z_MAX
+        m = folium.Map(location=[lat_centro, lon_centro], zoom_start=20, tiles=None, prefer_canvas=True)
+        folium.TileLayer('cartodbpositron', max_zoom=piramide.Z_MAX, max_native_zoom=ZOOM_BASE).add_to(m)
+        lat_min, lat_max, lon_min, lon_max = lim
+        folium.TileLayer(
+            tiles=url, attr="Zonificacion", overlay=True, opacity=1.0, z_index=1,
+            name="IDW" if not usar_rbf else "RBF" if interpolacion.SCIPY_OK else "RBF (fallback IDW)",
+            min_zoom=piramide.Z_MIN, max_zoom=piramide.Z_MAX, max_native_zoom=piramide.Z_MAX,
+            bounds=[[lat_min, lon_min], [lat_max, lon_max]]
+        ).add_to(m)
+
+    _puntos(m, df, lambda c: c.astype(float).map("{:.1f}".format))
+    if not _perimetro_isobandas(m, perimetro):
+        _perimetro_exterior(m, df, proy)       # teselas (sin malla) o nada sobre CPM_MIN
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m
+
+
+def mapa_concentrico(df: pd.DataFrame):
+    lat_centro, lon_centro = _foco(df)
+    proy = ProyeccionLocal(lat_centro, lon_centro)
+    ini = (float(df.loc[df.index[0], "Latitud"]), float(df.loc[df.index[0], "Longitud"]))
+    radios = _radios_exclusion(df, proy)
+
+    m = folium.Map(location=[lat_centro, lon_centro], zoom_start=20, tiles='cartodbpositron', prefer_canvas=True)
+    _puntos(m, df, lambda c: c)
+    _circulos_exclusion(m, radios, lat_centro, lon_centro)
+    _linea_al_foco(m, ini, proy)
+    return m
+
+
+def mapa_idw(df: pd.DataFrame):
+    return _mapa_interpolado(df, usar_rbf=False)
+
+
+def mapa_rbf(df: pd.DataFrame):
+    return _mapa_interpolado(df, usar_rbf=True)
+
+
+def _ordenar_por_tiempo(df: pd.DataFrame) -> pd.DataFrame:
+    if set(["Ano", "Mes", "Dia", "Hora", "Minuto", "Segundo"]).issubset(df.columns):
+        df["ts"] = pd.to_datetime(
+            df[["Ano", "Mes", "Dia", "Hora", "Minuto", "Segundo"]]
+            .rename(columns={"Ano": "year", "Mes": "month", "Dia": "day", "Hora": "hour", "Minuto": "minute",
+                             "Segundo": "second"}),
+            errors="coerce"
+        )
+        df.sort_values("ts", inplace=True, kind="stable")
+    elif set(["DATE", "TIME"]).issubset(df.columns):
+        df["ts"] = pd.to_datetime(df["DATE"].astype(str) + " " + df["TIME"].astype(str), errors="coerce")
+        df.sort_values("ts", inplace=True, kind="stable")
+    else:
+        df["ts"] = pd.NaT
+    return df.reset_index(drop=True)
+
+
+def mapa_trayecto(df: pd.DataFrame):
+    df = _ordenar_por_tiempo(df)
+    lat_centro, lon_centro = _foco(df)
+    proy = ProyeccionLocal(lat_centro, lon_centro)
+    ini = (float(df.loc[df.index[0], "Latitud"]), float(df.loc[df.index[0], "Longitud"]))
+    radios = _radios_exclusion(df, proy)
+
+    m = folium.Map(location=[lat_centro, lon_centro], zoom_start=20, tiles='cartodbpositron', prefer_canvas=True)
+    _puntos(m, df, lambda c: c.astype(int))
+    _circulos_exclusion(m, radios, lat_centro, lon_centro)
+    _linea_al_foco(m, ini, proy)
+
+    # camino recorrido por tiempo GPS (df ya esta ordenado por ts)
+    coords_camino = list(zip(df["Latitud"].astype(float), df["Longitud"].astype(float)))
+    coords_camino = [(la, lo) for la, lo in coords_camino if np.isfinite(la) and np.isfinite(lo)]
+    if len(coords_camino) >= 2:
+        folium.PolyLine(coords_camino, color="#333333", weight=2.5, opacity=0.9,
+                        tooltip="Camino recorrido (orden GPS)").add_to(m)
+    return m
+
+
+TECNICAS = {
+    "concentrico": mapa_concentrico,
+    "idw": mapa_idw,
+    "rbf": mapa_rbf,
+    "trayecto": mapa_trayecto,
+}
+
+
+def generar(tecnica: str, ruta_csv: str | None = None, ruta_html: str = RUTA_HTML) -> str:
+    """Genera el mapa de `tecnica` con `ruta_csv` (por defecto el CSV mas reciente) y lo guarda en `ruta_html`."""
+    if tecnica not in TECNICAS:
+        raise ValueError(f"tecnica desconocida: {tecnica!r} (opciones: {', '.join(TECNICAS)})")
+    df = datos.cargar(ruta_csv or datos.csv_reciente())
+    m = TECNICAS[tecnica](df)
+    os.makedirs(os.path.dirname(ruta_html) or ".", exist_ok=True)
+    m.save(ruta_html)
+    return ruta_html
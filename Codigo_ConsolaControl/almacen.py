@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# almacen.py
+# Almacen de mediciones del receptor, solo-agregar, un archivo SQLite (WAL) por procedimiento
+# - Fuente de verdad de las mediciones (antes global.tabla_datos de Node-RED): sobrevive a
+#   reinicios del flujo y no crece en memoria
+# - Escrituras en lote desde un hilo propio, commit con fsync (synchronous=FULL)
+# - Lectura incremental por la clave primaria (cursor = ultima fila leida): la tabla del
+#   dashboard ("Lee almacen" en Node-RED) pide solo las filas nuevas; los mapas leen el .db
+#   directamente (zonificacion.datos)
+# - El procedimiento se nombra YYYYMMDD_<operacion> y Node-RED lo manda ya fechado en el
+#   mensaje retenido: al reconectar al broker (aunque sea otro dia) se recibe el mismo
+#   nombre y se sigue escribiendo en el mismo archivo
+#
+# Uso CLI (Node-RED exec, copiado en /home/itoroc/almacen.py junto a DetectorRemoto.py;
+# RUTA puede ser el .db o solo el nombre del procedimiento):
+#   python3 almacen.py json 20250915_Operacion --desde 120
+#   python3 almacen.py tail /home/itoroc/Database/almacen/20250915_Operacion.db --desde 120
+#   python3 almacen.py csv  20250915_Operacion --salida /home/itoroc/Database/20250915_Operacion.csv
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+RUTA_ALMACEN = "/home/itoroc/Database/almacen"
+LOTE = 64               # filas por commit
+PERIODO_S = 1.0         # commit aunque el lote no este completo
+CPM_POR_USV_H = 151.0   # mismo factor que dosis_usv_h del registro JSON (receptor.py)
+
+_FECHADO = re.compile(r"\d{8}_")
+
+# escala de intensidad: copia de CPM_MIN/CORTES_CPM de zonificacion/niveles.py, que no
+# esta en el path del receptor (benchmarks/bench_niveles.py comprueba que coincidan)
+CPM_MIN = 5
+CORTES_CPM = (150, 500, 1500, 6000, 15000)     # limite superior (inclusive) de los niveles 1..5
+_NIVEL_DE_CLASE = (1, 2, 3, 4, 5, 0)
+
+# columnas del CSV exportado ("Exporta almacen" en Node-RED)
+COLUMNAS_CSV = ["Registro", "Ano", "Mes", "Dia", "Hora", "Minuto", "Segundo",
+                "Latitud", "Longitud", "Intensidad", "CPM", "D_uSv_h"]
+
+_ESQUEMA = (
+    "CREATE TABLE IF NOT EXISTS mediciones ("
+    " fila INTEGER PRIMARY KEY,"
+    " t_rx REAL NOT NULL,"
+    " dispositivo TEXT NOT NULL,"
+    " seq INTEGER NOT NULL,"
+    " lat REAL NOT NULL,"
+    " lon REAL NOT NULL,"
+    " cpm INTEGER NOT NULL,"
+    " alt REAL,"
+    " sat INTEGER,"
+    " fecha TEXT,"
+    " hora TEXT,"
+    " intensidad INTEGER NOT NULL,"
+    " dosis_usv_h REAL NOT NULL)"
+)
+
+
+def nivel_cpm(cpm: int) -> int:
+    # misma tabla que zonificacion/niveles.py (aca sin numpy): < CPM_MIN y > 15000 -> 0
+    if cpm < CPM_MIN:
+        return 0
+    return _NIVEL_DE_CLASE[bisect.bisect_left(CORTES_CPM, cpm)]
+
+
+def nombre_procedimiento(operacion: str, fecha: str | None = None, activo: str | None = None) -> str:
+    """YYYYMMDD_<operacion>, igual que el nombre de los CSV exportados por Node-RED.
+    Si `operacion` ya trae la fecha (asi la manda Node-RED) se respeta. Si no (flujo antiguo)
+    y `activo` es la misma operacion, se sigue con `activo`: el mensaje retenido que repite el
+    broker al reconectar despues de medianoche no abre un archivo nuevo a mitad del procedimiento."""
+    op = re.sub(r"[^\w\-.]", "_", re.sub(r"\s+", "_", operacion or "SinNombre"))
+    if _FECHADO.match(op):
+        return op
+    if activo is not None and _FECHADO.match(activo) and activo[9:] == op:
+        return activo
+    return f"{fecha or time.strftime('%Y%m%d')}_{op}"
+
+
+def ruta_procedimiento(ruta: str, directorio: str = RUTA_ALMACEN) -> str:
+    """Ruta del .db: `ruta` tal cual, o <directorio>/<ruta>.db si es solo el nombre."""
+    if os.sep in ruta or ruta.endswith(".db"):
+        return ruta
+    return os.path.join(directorio, f"{ruta}.db")
+
+
+def abrir(ruta: str, solo_lectura: bool = False) -> sqlite3.Connection:
+    if solo_lectura:
+        db = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+    else:
+        d = os.path.dirname(ruta)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        db = sqlite3.connect(ruta, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=FULL")
+        db.execute(_ESQUEMA)
+        db.commit()
+    return db
+
+
+def leer_desde(db: sqlite3.Connection, desde: int = 0, limite: int | None = None) -> list:
+    """Filas con fila > desde, en orden. Usa la clave primaria: costo proporcional a lo nuevo."""
+    sql = ("SELECT fila, t_rx, dispositivo, seq, lat, lon, cpm, alt, sat, fecha, hora, intensidad, dosis_usv_h"
+           " FROM mediciones WHERE fila > ? ORDER BY fila")
+    if limite is not None:
+        return db.execute(sql + " LIMIT ?", (desde, limite)).fetchall()
+    return db.execute(sql, (desde,)).fetchall()
+
+
+def fila_csv(r: tuple) -> list:
+    fila, _, _, _, lat, lon, cpm, _, _, fecha, hora, intensidad, dosis = r
+    try:
+        ano, mes, dia = (int(x) for x in fecha.split("-"))
+    except (AttributeError, ValueError):
+        ano = mes = dia = 0
+    try:
+        hh, mm, ss = (int(x) for x in hora.split(":"))
+    except (AttributeError, ValueError):
+        hh = mm = ss = 0
+    return [f"{fila:04d}", ano, mes, dia, hh, mm, ss, lat, lon, intensidad, cpm, dosis]
+
+
+class AlmacenMediciones:
+    def __init__(self, directorio: str = RUTA_ALMACEN, procedimiento: str | None = None,
+                 lote: int = LOTE, periodo_s: float = PERIODO_S):
+        self.directorio = directorio
+        self.lote = lote
+        self.periodo_s = periodo_s
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self._hay_lote = threading.Event()
+        self._parar = threading.Event()
+        self._hilo = None
+        self._db = None
+        self.procedimiento = None
+        self.ruta = None
+        self.escritas = 0
+        self.cambiar_procedimiento(procedimiento or nombre_procedimiento("SinNombre"))
+
+    # ---- ciclo de vida ----
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._escritor, name="almacen", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0):
+        self._parar.set()
+        self._hay_lote.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        try:
+            self._vaciar()
+        except sqlite3.Error as e:
+            print(f"[WARN] Almacen: {len(self._pendientes)} filas sin escribir al detener: {e}")
+        with self._lock:
+            self._db.close()
+
+    def cambiar_procedimiento(self, procedimiento: str):
+        """Cierra el archivo actual (vaciando lo pendiente) y abre <directorio>/<procedimiento>.db."""
+        if procedimiento == self.procedimiento:
+            return
+        if self._db is not None:
+            self._vaciar()
+        ruta = os.path.join(self.directorio, f"{procedimiento}.db")
+        db = abrir(ruta)
+        with self._lock:
+            viejo, self._db = self._db, db
+            self.procedimiento = procedimiento
+            self.ruta = ruta
+        if viejo is not None:
+            viejo.close()
+
+    # ---- escritura ----
+    def agregar(self, trama, t_rx: float | None = None):
+        fila = (time.time() if t_rx is None else t_rx, trama.dispositivo, trama.seq,
+                trama.lat, trama.lon, trama.cpm, trama.alt, trama.sat, trama.fecha, trama.hora,
+                nivel_cpm(trama.cpm), round(trama.cpm / CPM_POR_USV_H, 2))
+        with self._lock:
+            self._pendientes.append(fila)
+            lleno = len(self._pendientes) >= self.lote
+        if lleno:
+            self._hay_lote.set()
+
+    def _vaciar(self):
+        with self._lock:
+            filas, self._pendientes = self._pendientes, []
+            if not filas:
+                return
+            try:
+                self._db.executemany(
+                    "INSERT INTO mediciones (t_rx, dispositivo, seq, lat, lon, cpm, alt, sat, fecha, hora,"
+                    " intensidad, dosis_usv_h) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", filas)
+                self._db.commit()
+            except sqlite3.Error:
+                # el lote vuelve al frente de la cola y se reintenta en el proximo ciclo
+                try:
+                    self._db.rollback()
+                except sqlite3.Error:
+                    pass
+                self._pendientes[:0] = filas
+                raise
+            self.escritas += len(filas)
+
+    def _escritor(self):
+        while not self._parar.is_set():
+            self._hay_lote.wait(self.periodo_s)
+            self._hay_lote.clear()
+            try:
+                self._vaciar()
+            except sqlite3.Error as e:
+                print(f"[WARN] Almacen fallo escribiendo: {e}")
+
+
+def _escribir_csv(filas: list, f, encabezado: bool = True):
+    w = csv.writer(f, lineterminator="\n")
+    if encabezado:
+        w.writerow(COLUMNAS_CSV)
+    for r in filas:
+        w.writerow(fila_csv(r))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Consulta del almacen de mediciones")
+    ap.add_argument("accion", choices=["tail", "csv", "json"],
+                    help="tail/csv: filas como CSV; json: {procedimiento, hasta, filas} para Node-RED")
+    ap.add_argument("ruta", help="archivo .db del procedimiento, o su nombre (YYYYMMDD_<operacion>)")
+    ap.add_argument("--desde", type=int, default=0, help="ultima fila ya leida")
+    ap.add_argument("--limite", type=int, default=None)
+    ap.add_argument("--salida", default=None, help="csv: archivo destino (se reemplaza completo)")
+    args = ap.parse_args()
+
+    ruta = ruta_procedimiento(args.ruta)
+    if os.path.exists(ruta):
+        db = abrir(ruta, solo_lectura=True)
+        filas = leer_desde(db, args.desde, args.limite)
+        db.close()
+    else:
+        filas = []      # procedimiento sin mediciones todavia
+
+    if args.accion == "json":
+        json.dump({
+            "procedimiento": os.path.splitext(os.path.basename(ruta))[0],
+            "hasta": filas[-1][0] if filas else args.desde,
+            "filas": [dict(zip(COLUMNAS_CSV, fila_csv(r))) for r in filas],
+        }, sys.stdout, separators=(",", ":"))
+    elif args.salida:
+        tmp = f"{args.salida}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            _escribir_csv(filas, f)
+        os.replace(tmp, args.salida)
+    else:
+        _escribir_csv(filas, sys.stdout, args.accion == "csv" or args.desde == 0)
+
+
+if __name__ == "__main__":
+    main()
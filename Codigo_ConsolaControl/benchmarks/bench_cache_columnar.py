@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# bench_cache_columnar.py
+# Carga de un CSV de procedimiento de 10k a 1M filas: como estaba (read_csv con dtypes
+# inferidos + Tipo/renombre/Nivel en cada clic) contra datos.cargar con cache_columnar
+# - primera vez (parsea y escribe los .npy), proceso nuevo con la cache en disco
+#   (np.load mmap, sin parsear), servicio residente (cache en memoria)
+# - comprueba que los valores son los del CSV, que las columnas son vistas sin copia
+#   de la cache y que el LRU respeta el presupuesto de disco
+# Uso: python3 benchmarks/bench_cache_columnar.py [filas ...]
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import cache_columnar, datos
+from zonificacion.niveles import niveles
+from zonificacion.sintetico import escribir_csv
+
+TAMANOS = (10_000, 100_000, 1_000_000)
+
+
+def viejo(ruta: str) -> pd.DataFrame:
+    """_leer() + _preparar() como estaban antes de la cache columnar."""
+    df = pd.read_csv(ruta)
+    df["Tipo"] = "Sensor"
+    df.rename(columns={"D_uSv_h": "Dosis_uSv_h"}, inplace=True)
+    df["Nivel"] = niveles(df["CPM"])
+    return df
+
+
+def cronometrar(fn, rep: int = 3) -> tuple:
+    t = []
+    for _ in range(rep):
+        t0 = time.perf_counter()
+        r = fn()
+        t.append((time.perf_counter() - t0) * 1000.0)
+    return r, sorted(t)[len(t) // 2]
+
+
+def en_frio(ruta: str) -> pd.DataFrame:
+    datos._cache.clear()
+    for _, _, e in cache_columnar._entradas(cache_columnar.RUTA_CACHE):
+        cache_columnar.shutil.rmtree(e)
+    return datos.cargar(ruta)
+
+
+def en_disco(ruta: str) -> pd.DataFrame:
+    datos._cache.clear()        # como un tec0X --local recien lanzado
+    return datos.cargar(ruta)
+
+
+def mb(carpeta: str, ruta: str | None = None) -> float:
+    """MB de la cache completa, o solo de la entrada de `ruta`."""
+    prefijo = cache_columnar._prefijo(ruta) if ruta else ""
+    return sum(e[1] for e in cache_columnar._entradas(carpeta)
+               if os.path.basename(e[2]).startswith(prefijo)) / 2 ** 20
+
+
+def main():
+    tamanos = [int(a) for a in sys.argv[1:]] or TAMANOS
+    with tempfile.TemporaryDirectory() as d:
+        cache_columnar.RUTA_CACHE = os.path.join(d, "cache")
+        print(f"{'filas':>9} {'CSV MB':>7} {'cache MB':>9} {'antes ms':>9} {'1a vez ms':>10} "
+              f"{'disco ms':>9} {'memoria ms':>11}")
+        for n in tamanos:
+            ruta = os.path.join(d, f"20250915_{n}.csv")
+            escribir_csv(ruta, n)
+            ref, t_viejo = cronometrar(lambda: viejo(ruta))
+            _, t_frio = cronometrar(lambda: en_frio(ruta))
+            df, t_disco = cronometrar(lambda: en_disco(ruta))
+            _, t_mem = cronometrar(lambda: datos.cargar(ruta), rep=5)
+
+            pd.testing.assert_frame_equal(df[ref.columns], ref, check_dtype=False)
+            cols = datos._cache[ruta][1]
+            assert all(isinstance(cols[c].base, np.memmap) and not cols[c].flags.writeable for c in cols)
+            assert all(np.shares_memory(df[c].to_numpy(), cols[c]) for c in cols)
+            assert df["Latitud"].dtype == np.float64 and df["CPM"].dtype == np.int32
+            print(f"{n:>9} {os.path.getsize(ruta) / 2 ** 20:>7.1f} {mb(cache_columnar.RUTA_CACHE, ruta):>9.1f} "
+                  f"{t_viejo:>9.1f} {t_frio:>10.1f} {t_disco:>9.2f} {t_mem:>11.3f}")
+
+        # LRU: 5 MB alcanzan para dos archivos de 50k filas (~1.8 MB cada uno)
+        cache_columnar.PRESUPUESTO_MB = 5.0
+        rutas = []
+        for i in range(4):
+            rutas.append(os.path.join(d, f"20250916_{i}.csv"))
+            escribir_csv(rutas[-1], 50_000, semilla=i)
+            en_disco(rutas[-1])
+        en_disco(rutas[1])          # el 1 pasa a ser el mas reciente
+        escribir_csv(os.path.join(d, "20250917.csv"), 50_000)
+        en_disco(os.path.join(d, "20250917.csv"))
+        quedan = {os.path.basename(cache_columnar.buscar(r)[0]["ruta"]) for r in rutas
+                  if cache_columnar.buscar(r) is not None}
+        assert mb(cache_columnar.RUTA_CACHE) <= cache_columnar.PRESUPUESTO_MB, quedan
+        assert "20250916_1.csv" in quedan and "20250916_0.csv" not in quedan, quedan
+        print(f"\nLRU con {cache_columnar.PRESUPUESTO_MB:.1f} MB: quedan {sorted(quedan)} + 20250917.csv")
+        print("OK: mismos valores que read_csv, columnas = vistas de la cache, LRU bajo presupuesto")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# bench_geodesia.py
+# Distancias al foco: como estaba (tec01/tec04: sqrt(dlat^2 + dlon^2) * 111000;
+# tec02/tec03: geopy geodesic por fila) contra geodesia.ProyeccionLocal (una proyeccion
+# ENU vectorizada). Referencia: geodesic de geopy (Karney).
+# - error maximo en metros y tiempo para N muestras a hasta 60 / 300 / 1000 m del foco
+# - anisotropia de los pesos IDW en grados: distancia E-O vs N-S a igual distancia real
+# Uso: python3 benchmarks/bench_geodesia.py [muestras]
+
+import os
+import sys
+import time
+
+import numpy as np
+from geopy.distance import geodesic
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion.geodesia import ProyeccionLocal
+from zonificacion.sintetico import LAT0, LON0, mediciones
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    foco = (LAT0, LON0)
+    print(f"{n} muestras, foco en ({LAT0}, {LON0})")
+    print(f"{'radio m':>8} {'plano 111000':>20} {'geopy por fila':>20} {'ProyeccionLocal':>20}")
+    print(f"{'':>8} {'err max m':>10} {'ms':>9} {'err max m':>10} {'ms':>9} {'err max m':>10} {'ms':>9}")
+    for radio in (60.0, 300.0, 1000.0):
+        la, lo, _ = map(np.array, mediciones(n, radio_m=radio))
+        ref = np.array([geodesic(foco, p).meters for p in zip(la, lo)])
+
+        plano, t_p = cronometrar(lambda: np.sqrt((la - LAT0) ** 2 + (lo - LON0) ** 2) * 111000)
+        geo, t_g = cronometrar(lambda: np.array([geodesic(foco, (a, b)).meters for a, b in zip(la, lo)]))
+        proy, t_e = cronometrar(lambda: ProyeccionLocal(*foco).distancia(la, lo))
+        err = lambda d: f"{np.max(np.abs(d - ref)):.2e}"
+        print(f"{radio:>8.0f} {err(plano):>10} {t_p:>9.2f} {err(geo):>10} {t_g:>9.0f} {err(proy):>10} {t_e:>9.2f}")
+
+    # 10 m al este y 10 m al norte del foco, en grados
+    p = ProyeccionLocal(*foco)
+    lat_n, _ = p.latlon(0.0, 10.0)
+    _, lon_e = p.latlon(10.0, 0.0)
+    print(f"\n10 m al norte = {lat_n - LAT0:.3e} grados, 10 m al este = {lon_e - LON0:.3e} grados: "
+          f"en grados la misma distancia E-O pesa como {(lon_e - LON0) / (lat_n - LAT0):.2f}x la N-S")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# bench_idw.py
+# IDW denso (O(H*W*N), como tec02/tec03) contra IDW por vecinos (idw.idw_vecinos)
+# sobre la malla de 320x320 de los mapas, de 100 a 100k muestras.
+# - comprueba que con k = N ambos indices reproducen el denso
+# - el denso se omite sobre DENSO_MAX muestras (minutos de CPU)
+# Uso: python3 benchmarks/bench_idw.py [k]
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import interpolacion
+from zonificacion.idw import idw_vecinos, KDTREE_OK
+from zonificacion.sintetico import mediciones
+
+TAMANOS = (100, 1000, 3600, 10000, 100000)
+DENSO_MAX = 10000
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+
+    # equivalencia con k = N (malla chica para que el denso sea rapido)
+    for n in (100, 1000):
+        la, lo, c = map(np.array, mediciones(n))
+        Lon, Lat = interpolacion.malla(interpolacion.limites(la, lo), 120, 120)
+        ref = interpolacion.idw(la, lo, c, Lat, Lon)
+        indices = ["malla"] + (["kdtree"] if KDTREE_OK else [])
+        for ind in indices:
+            z = idw_vecinos(la, lo, c, Lat, Lon, k=n, indice=ind)
+            err = float(np.max(np.abs(z - ref) / ref))
+            assert err < 1e-9, (n, ind, err)
+    print(f"OK: con k = N la malla{' y el kd-tree' if KDTREE_OK else ''} reproducen el IDW denso\n")
+
+    print(f"malla {interpolacion.H}x{interpolacion.W}, k = {k}, radio = 15 m (~1.35e-4 grados)")
+    print(f"{'muestras':>9} {'denso ms':>10} {'malla k ms':>11} {'kdtree k ms':>12} {'malla radio ms':>15} "
+          f"{'dif. k vs denso':>16}")
+    for n in TAMANOS:
+        la, lo, c = map(np.array, mediciones(n))
+        Lon, Lat = interpolacion.malla(interpolacion.limites(la, lo))
+        ref, t_denso = cronometrar(lambda: interpolacion.idw(la, lo, c, Lat, Lon)) if n <= DENSO_MAX else (None, None)
+        zm, t_malla = cronometrar(lambda: idw_vecinos(la, lo, c, Lat, Lon, k=k, indice="malla"))
+        t_kd = cronometrar(lambda: idw_vecinos(la, lo, c, Lat, Lon, k=k, indice="kdtree"))[1] if KDTREE_OK else None
+        t_rad = cronometrar(lambda: idw_vecinos(la, lo, c, Lat, Lon, k=None, radio=1.35e-4, indice="malla"))[1]
+        dif = f"{float(np.median(np.abs(zm - ref) / ref)):.2%}" if ref is not None else "-"
+        fmt = lambda t: f"{t:.0f}" if t is not None else "-"
+        print(f"{n:>9} {fmt(t_denso):>10} {fmt(t_malla):>11} {fmt(t_kd):>12} {fmt(t_rad):>15} {dif:>16}")
+
+
+if __name__ == "__main__":
+    main()
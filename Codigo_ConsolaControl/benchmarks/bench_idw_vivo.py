@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# bench_idw_vivo.py
+# Acumulador IDW en vivo (idw_vivo.AcumuladorIDW) contra recalcular todo en cada trama.
+# - comprueba que el raster acumulado es igual al IDW por radio calculado de una vez
+#   (idw.idw_vecinos en metros, centros de celda) y que crecer/re-anclar no lo altera
+# - mide costo por trama y costo de armar el overlay PNG
+# Uso: python3 benchmarks/bench_idw_vivo.py [muestras]
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion.idw import idw_vecinos
+from zonificacion.idw_vivo import AcumuladorIDW
+from zonificacion.sintetico import mediciones
+
+
+def referencia(acum: AcumuladorIDW, lats, lons, cpms) -> np.ndarray:
+    """IDW por radio de todas las lecturas, en los centros de celda de la malla del acumulador."""
+    ny, nx = acum.forma
+    xs, ys = acum.xy(np.asarray(lats), np.asarray(lons))
+    cx = (np.arange(acum.ix0, acum.ix0 + nx) + 0.5) * acum.celda
+    cy = (np.arange(acum.iy0, acum.iy0 + ny) + 0.5) * acum.celda
+    QX, QY = np.meshgrid(cx, cy)
+    return idw_vecinos(xs, ys, np.asarray(cpms, dtype=float), QX, QY, k=None, radio=acum.radio, indice="malla")
+
+
+def iguales(a, b) -> bool:
+    return np.array_equal(np.isnan(a), np.isnan(b)) and np.allclose(a[~np.isnan(a)], b[~np.isnan(b)], rtol=1e-9)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    lats, lons, cpms = mediciones(n, radio_m=150.0)
+
+    acum = AcumuladorIDW()
+    t0 = time.perf_counter()
+    for la, lo, c in zip(lats, lons, cpms):
+        acum.agregar(la, lo, c)
+    t_trama = (time.perf_counter() - t0) / n * 1e6
+    assert iguales(acum.raster(), referencia(acum, lats, lons, cpms)), "el acumulado difiere del IDW por radio"
+    print(f"OK: {n} lecturas acumuladas = IDW por radio (malla {acum.forma[1]}x{acum.forma[0]} celdas de "
+          f"{acum.celda} m, radio {acum.radio} m)")
+
+    # recorrido que se sale de la ventana maxima: re-anclaje (la malla no crece sin limite
+    # y la zona de la ultima lectura sigue cubierta)
+    chico = AcumuladorIDW(max_celdas=200, margen_celdas=16)
+    for i, (la, lo, c) in enumerate(zip(lats, lons, cpms)):
+        chico.agregar(la + i * 2e-6, lo, c)
+    ny, nx = chico.forma
+    assert chico.reanclajes > 0 and ny <= 200 and nx <= 200
+    x, y = chico.xy(lats[-1] + (n - 1) * 2e-6, lons[-1])
+    fila, col = int(y // chico.celda) - chico.iy0, int(x // chico.celda) - chico.ix0
+    assert not np.isnan(chico.raster()[fila, col])
+    print(f"OK: recorrido de {n * 2e-6 * 111320:.0f} m al norte -> {chico.reanclajes} re-anclajes, malla {nx}x{ny}")
+
+    t0 = time.perf_counter()
+    carga = acum.overlay()
+    t_overlay = (time.perf_counter() - t0) * 1000.0
+
+    grid = acum.raster()
+    t0 = time.perf_counter()
+    referencia(acum, lats, lons, cpms)
+    t_total = (time.perf_counter() - t0) * 1000.0
+
+    print(f"\ncosto por trama (acumulador):          {t_trama:8.1f} us")
+    print(f"recalcular todo (radio, malla index):    {t_total:8.1f} ms  -> {t_total * 1000 / t_trama:,.0f}x por trama")
+    print(f"overlay PNG ({grid.shape[1]}x{grid.shape[0]}):                 {t_overlay:8.1f} ms, "
+          f"{len(carga['png']) / 1024:.0f} KiB base64")
+    print(f"a {1000 / t_trama * 1000:,.0f} tramas/s sostenidas; publicar cada 2 s cuesta {t_overlay / 20:.1f} % de CPU")
+
+
+if __name__ == "__main__":
+    main()
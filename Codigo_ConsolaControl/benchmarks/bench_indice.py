@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# bench_indice.py
+# Resolver "el CSV mas reciente" y cargarlo, en una carpeta Database sintetica con
+# meses de procedimientos: como estaba (listdir + sort por getmtime + copia a
+# YYYYMMDD_Actual.csv + read_csv completo en cada clic) contra indice.py + datos.cargar
+# (manifiesto incremental, sin copia, solo las filas agregadas en el servicio residente).
+# - comprueba que las estadisticas del indice y la carga incremental coinciden con
+#   leer el archivo completo despues de varias rondas de filas nuevas
+# Uso: python3 benchmarks/bench_indice.py [procedimientos] [filas]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import cache_columnar, datos, indice
+from zonificacion.sintetico import COLUMNAS_CSV, escribir_csv, mediciones
+
+
+def viejo(carpeta: str) -> pd.DataFrame:
+    """csv_reciente() + _leer() originales."""
+    csvs = [f for f in os.listdir(carpeta) if f.endswith(".csv")]
+    csvs.sort(key=lambda f: os.path.getmtime(os.path.join(carpeta, f)), reverse=True)
+    reciente = os.path.join(carpeta, csvs[0])
+    estandar = os.path.join(carpeta, pd.Timestamp.now().strftime("%Y%m%d") + "_Actual.csv")
+    if reciente != estandar:
+        shutil.copy(reciente, estandar)
+    return pd.read_csv(estandar)
+
+
+def escribir_tabla(ruta: str, filas: list):
+    """Como "Exporta tabla_datos": reescribe todo, sin \\n final."""
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(",".join(COLUMNAS_CSV) + "\n" + "\n".join(filas))
+
+
+def filas_sinteticas(n: int) -> list:
+    lats, lons, cpms = mediciones(n, semilla=7)
+    return [f"{i + 1:04d},2025,9,15,{12 + i // 3600},{i // 60 % 60},{i % 60},{la:.7f},{lo:.7f},0,{c},"
+            f"{round(c / 151, 2)}" for i, (la, lo, c) in enumerate(zip(lats, lons, cpms))]
+
+
+def cronometrar(fn, rep: int = 5) -> tuple:
+    t = []
+    for _ in range(rep):
+        t0 = time.perf_counter()
+        r = fn()
+        t.append((time.perf_counter() - t0) * 1000.0)
+    return r, sorted(t)[len(t) // 2]
+
+
+def rondas(d: str, actual: str, n: int) -> tuple:
+    """Archivo de n filas que crece 5 veces de a 60 (cada clic en Node-RED lo reescribe
+    entero); compara con la lectura completa. Medianas en ms (incremental, completa)."""
+    todas = filas_sinteticas(n + 300)
+    escribir_tabla(actual, todas[:n])
+    indice.actualizar(d)
+    datos.cargar(actual)
+    t_inc, t_completo = [], []
+    for k in range(n + 60, n + 301, 60):
+        escribir_tabla(actual, todas[:k])
+        t0 = time.perf_counter()
+        e = indice.actualizar(d)[os.path.basename(actual)]
+        df = datos.cargar(actual)
+        t_inc.append((time.perf_counter() - t0) * 1000.0)
+        t0 = time.perf_counter()
+        ref = datos._preparar(pd.read_csv(actual))
+        t_completo.append((time.perf_counter() - t0) * 1000.0)
+        pd.testing.assert_frame_equal(df, ref)
+        assert e["filas"] == len(ref) and e["cpm_max"] == ref["CPM"].max()
+        assert (e["lat_min"], e["lat_max"]) == (ref["Latitud"].min(), ref["Latitud"].max())
+    assert indice.cargar_indice(d)[os.path.basename(actual)]["filas"] == n + 300
+    return sorted(t_inc)[2], sorted(t_completo)[2]
+
+
+def main():
+    procedimientos = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 3600
+
+    with tempfile.TemporaryDirectory() as d, tempfile.TemporaryDirectory() as cache:
+        cache_columnar.RUTA_CACHE = cache
+        for i in range(procedimientos):
+            escribir_csv(os.path.join(d, f"2025{1 + i // 28:02d}{1 + i % 28:02d}_Proc{i}.csv"), n, semilla=i)
+        actual = os.path.join(d, pd.Timestamp.now().strftime("%Y%m%d") + "_Actual.csv")
+        escribir_tabla(actual, filas_sinteticas(n))
+
+        _, t_frio = cronometrar(lambda: indice.actualizar(d), rep=1)
+        _, t_tibio = cronometrar(lambda: indice.actualizar(d))
+        _, t_viejo = cronometrar(lambda: viejo(d))
+        _, t_ultimo = cronometrar(lambda: datos.cargar(datos.csv_reciente(d)))
+        assert datos.csv_reciente(d) == actual
+
+        print(f"{procedimientos} procedimientos de {n} filas + {os.path.basename(actual)}")
+        print(f"indice en frio (una vez):                      {t_frio:8.0f} ms")
+        print(f"indice sin cambios (scandir + stat):           {t_tibio:8.1f} ms")
+        print(f"antes: listdir + getmtime + copia + read_csv:  {t_viejo:8.1f} ms por clic")
+        print(f"ahora: csv_reciente + cargar (sin cambios):    {t_ultimo:8.1f} ms por clic")
+        for filas in (n, 50000):
+            t_inc, t_completo = rondas(d, actual, filas)
+            print(f"ahora: {filas} filas +60, indice + cargar:     {t_inc:8.1f} ms (read_csv completo: {t_completo:.1f} ms)")
+        print("\nOK: indice y carga incremental = lectura completa tras cada ronda de 60 filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# bench_isobandas.py
+# Poligonizacion de los niveles (isobandas.py) segun el tamano de la malla.
+# - campo analitico 2 + 20000 exp(-r^2 / 450) en +-100 m sobre mallas de 128^2 a 2048^2:
+#   tiempo de isobandas(), vertices del marching squares antes y despues de simplificar,
+#   tamano del GeoJSON y error de area de cada nivel contra el de los discos exactos
+#   (con y sin simplificacion)
+# - mapas IDW/RBF de recorridos sinteticos de 60 m y 1000 m (la malla de tecnicas):
+#   tiempo de interpolar contra tiempo de poligonizar, y area de cada nivel contra
+#   contar celdas del raster por nivel
+# Uso: python3 benchmarks/bench_isobandas.py [muestras]
+
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import datos, interpolacion, isobandas, tecnicas
+from zonificacion.geodesia import ProyeccionLocal
+from zonificacion.niveles import niveles
+from zonificacion.sintetico import COLUMNAS_CSV, LAT0, LON0, mediciones
+
+LADOS = (128, 256, 512, 1024, 2048)
+RADIOS = (60.0, 1000.0)
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, (time.perf_counter() - t0) * 1000.0
+
+
+def marco(n: int, radio: float) -> pd.DataFrame:
+    lats, lons, cpms = mediciones(n, semilla=3, radio_m=radio)
+    filas = [[i + 1, 2025, 9, 15, 12 + i // 3600, i // 60 % 60, i % 60, la, lo, 0, c, round(c / 151, 2)]
+             for i, (la, lo, c) in enumerate(zip(lats, lons, cpms))]
+    return datos._preparar(pd.DataFrame(filas, columns=COLUMNAS_CSV))
+
+
+def areas(fc: dict) -> dict:
+    return {f["properties"]["nivel"]: f["properties"]["area_m2"] for f in fc["features"]}
+
+
+def analitico():
+    proy = ProyeccionLocal(LAT0, LON0)
+    vals = np.r_[np.zeros(50), np.full(50, 3e4)]        # p1-p99 sin recortar el campo
+    u = isobandas.UMBRALES
+    disco = lambda c: math.pi * 450.0 * math.log(20000.0 / (c - 2.0))
+    exacta = {k: disco(u[k - 1]) - disco(u[k]) for k in range(1, len(u))}
+    print(f"campo analitico en +-100 m; tolerancia {isobandas.TOLERANCIA_M} m")
+    print(f"{'malla':>11} {'m/celda':>8} {'ms':>8} {'vertices':>9} {'simplif.':>9} {'GeoJSON KB':>11} "
+          f"{'err. area':>10} {'sin simplif.':>13}")
+    for lado in LADOS:
+        ex = np.linspace(-100.0, 100.0, lado)
+        ny = ex[::-1].copy()
+        X, Y = np.meshgrid(ex, ny)
+        Z = 2.0 + 20000.0 * np.exp(-(X ** 2 + Y ** 2) / 450.0)
+        a_metros = isobandas.ejes_metricos(ex, ny)
+
+        fc, t = cronometrar(lambda: isobandas.isobandas(Z, vals, a_metros, proy))
+        crudos = sum(len(r) for c in u for r in isobandas.anillos(Z, c))
+        finales = sum(len(anillo) - 1 for f in fc["features"] for p in f["geometry"]["coordinates"] for anillo in p)
+        kb = len(json.dumps(fc)) / 1024
+        err = max(abs(a - exacta[k]) / exacta[k] for k, a in areas(fc).items()) * 100
+        err0 = max(abs(a - exacta[k]) / exacta[k]
+                   for k, a in areas(isobandas.isobandas(Z, vals, a_metros, proy, tolerancia_m=0)).items()) * 100
+        assert len(fc["features"]) == 5 and err0 < 1.0 and err < 2.0, (lado, err0, err)
+        print(f"{lado:>5}x{lado:<5} {200.0 / (lado - 1):>8.3f} {t:>8.0f} {crudos:>9} {finales:>9} {kb:>11.1f} "
+              f"{err:>9.2f}% {err0:>12.2f}%")
+
+
+def mapas(n: int):
+    print(f"\nmapas de tecnicas, {n} muestras")
+    print(f"{'radio':>6} {'tec':>4} {'celdas':>9} {'m/celda':>8} {'interp. ms':>11} {'isobandas ms':>13} "
+          f"{'niveles':>8} {'dif. area':>10}")
+    for radio in RADIOS:
+        df = marco(n, radio)
+        foco = tecnicas._foco(df)
+        proy = ProyeccionLocal(*foco)
+        lats = df["Latitud"].to_numpy(float)
+        lons = df["Longitud"].to_numpy(float)
+        vals = df["CPM"].to_numpy(float)
+        lim = interpolacion.limites(lats, lons)
+        for usar_rbf in (False, True):
+            (Z, _, a_metros), t_campo = cronometrar(lambda: tecnicas._campo(
+                lats, lons, vals, lim, proy, usar_rbf, tecnicas.K_DEFECTO, None, True, False))
+            fc, t_bandas = cronometrar(lambda: isobandas.isobandas(Z, vals, a_metros, proy))
+            # area de una celda en metros y conteo de celdas por nivel
+            x, y = a_metros(np.array([0.0, 0.0, 1.0]), np.array([0.0, 1.0, 0.0]))
+            celda = abs((x[1] - x[0]) * (y[2] - y[0]) - (y[1] - y[0]) * (x[2] - x[0]))
+            nv = niveles(interpolacion.recortar(Z, vals))
+            poligonos = areas(fc)
+            total = sum(poligonos.values())
+            dif = sum(abs(a - np.count_nonzero(nv == k) * celda) for k, a in poligonos.items()) / total * 100
+            assert dif < 2.0, (radio, usar_rbf, dif)
+            print(f"{radio:>6.0f} {'rbf' if usar_rbf else 'idw':>4} {Z.size:>9} {math.sqrt(celda):>8.2f} "
+                  f"{t_campo:>11.0f} {t_bandas:>13.0f} {len(poligonos):>8} {dif:>9.2f}%")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    analitico()
+    mapas(n)
+    print("\nerr. area: peor nivel contra el disco exacto; dif. area: suma de |poligono - celdas| / area total")
+    print("OK: areas de las isobandas = discos exactos (< 1 % sin simplificar, < 2 % con) y = conteo de celdas del raster (< 2 %)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# bench_lote.py
+# Las cuatro tecnicas como las pedia Node-RED (un python3 tec0X_*.py --local por boton,
+# cada uno leyendo el CSV y pisando el mismo HTML) contra tec_todas.py --local (una
+# carga, un HTML por tecnica) y contra un clic sin datos nuevos (sello vigente).
+# Despues, reconstruccion del archivo (lote.reconstruir) de una Database sintetica con
+# 1 proceso y con paralelo.HILOS procesos, y una segunda pasada sin cambios.
+# - comprueba que salen los cuatro HTML por procedimiento y que la segunda pasada no
+#   regenera nada; en la Pi (4 nucleos) el pool reparte los procedimientos
+# Uso: python3 benchmarks/bench_lote.py [muestras] [procedimientos] [repeticiones]
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ZONAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa")
+sys.path.insert(0, ZONAS)
+from zonificacion import NOMBRES_TECNICAS, cache_columnar, lote, paralelo
+from zonificacion.sintetico import escribir_csv
+
+SCRIPTS = ["tec01_concentrico.py", "tec02_IDW.py", "tec03_RBF.py", "tec04_trayecto.py"]
+
+
+def cronometrar(fn, rep: int) -> float:
+    """Mediana en ms."""
+    t = []
+    for _ in range(rep):
+        t0 = time.perf_counter()
+        fn()
+        t.append((time.perf_counter() - t0) * 1000.0)
+    return sorted(t)[len(t) // 2]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    procedimientos = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    rep = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    with tempfile.TemporaryDirectory() as d, tempfile.TemporaryDirectory() as cache:
+        cache_columnar.RUTA_CACHE = cache
+        csv = os.path.join(d, "20250915_Bench.csv")
+        escribir_csv(csv, n)
+        silencio = dict(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ZONAS, check=True)
+        python = [sys.executable, "-W", "ignore"]
+
+        def antes():
+            html = os.path.join(d, "mapa_zonas.html")
+            for script in SCRIPTS:
+                subprocess.run(python + [script, "--local", "--csv", csv, "--html", html], **silencio)
+
+        vueltas = iter(range(rep))
+
+        def ahora():
+            carpeta = os.path.join(d, f"zonas{next(vueltas)}")      # sin sello: genera las cuatro
+            subprocess.run(python + ["tec_todas.py", "--local", "--csv", csv, "--carpeta", carpeta], **silencio)
+
+        t_antes = cronometrar(antes, rep)
+        t_ahora = cronometrar(ahora, rep)
+        carpeta = os.path.join(d, "zonas0")
+        assert all(os.path.getsize(lote.ruta_mapa(carpeta, t)) > 0 for t in NOMBRES_TECNICAS)
+        t_igual = cronometrar(lambda: subprocess.run(
+            python + ["tec_todas.py", "--local", "--csv", csv, "--carpeta", carpeta], **silencio), rep)
+
+        print(f"{n} muestras, mediana de {rep} corridas (procesos en frio, como Node-RED exec)")
+        print(f"antes: 4 x tec0X_*.py --local (un HTML):       {t_antes:8.0f} ms")
+        print(f"ahora: tec_todas.py --local (4 HTML):          {t_ahora:8.0f} ms")
+        print(f"ahora: tec_todas.py, CSV sin cambios:          {t_igual:8.0f} ms")
+
+        database = os.path.join(d, "Database")
+        os.makedirs(database)
+        for i in range(procedimientos):
+            escribir_csv(os.path.join(database, f"202509{1 + i:02d}_Proc{i}.csv"), n, semilla=i)
+        print(f"\nreconstruir archivo: {procedimientos} procedimientos de {n} muestras")
+        for procesos in sorted({1, paralelo.HILOS}):
+            salida = os.path.join(d, f"archivo{procesos}")
+            t0 = time.perf_counter()
+            estado = lote.reconstruir(database, salida, procesos)
+            t = (time.perf_counter() - t0) * 1000.0
+            assert set(estado.values()) == {"generado"}, estado
+            print(f"{procesos} proceso(s):                                {t:8.0f} ms")
+        t0 = time.perf_counter()
+        estado = lote.reconstruir(database, salida, paralelo.HILOS)
+        t = (time.perf_counter() - t0) * 1000.0
+        assert set(estado.values()) == {"sin cambios"}, estado
+        print(f"segunda pasada, sin cambios:                 {t:8.1f} ms")
+        for nombre in estado:
+            destino = os.path.join(salida, os.path.splitext(nombre)[0])
+            assert all(os.path.exists(lote.ruta_mapa(destino, t)) for t in NOMBRES_TECNICAS)
+        print("\nOK: cuatro mapas por procedimiento; la segunda pasada no regenera nada")
+
+
+if __name__ == "__main__":
+    main()
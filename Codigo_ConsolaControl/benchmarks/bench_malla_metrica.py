@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# bench_malla_metrica.py
+# Malla de los mapas IDW/RBF: 320x320 fija en grados (como estaba) contra celdas de
+# interpolacion.PASO_M metros con tope MAX_CELDAS, y esta ultima evaluada completa contra
+# refinamiento.adaptativa (solo donde hay bordes de nivel o gradiente fuerte).
+# - recorridos de 15 m (un techo), 60 m y 1000 m (un camino de 2 km) de radio
+# - por malla: celdas, metros por celda E-O / N-S, celdas evaluadas y tiempo
+# - adaptativa: % de celdas con el mismo color que la malla metrica completa
+# Uso: python3 benchmarks/bench_malla_metrica.py [muestras]
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import interpolacion, refinamiento
+from zonificacion.geodesia import ProyeccionLocal
+from zonificacion.idw import idw_vecinos
+from zonificacion.niveles import rgba
+from zonificacion.rbf_local import RBFTeselas
+from zonificacion.sintetico import mediciones
+
+RADIOS = (15.0, 60.0, 1000.0)
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    print(f"{n} muestras; celda pedida {interpolacion.PASO_M} m, tope {interpolacion.MAX_CELDAS} celdas, "
+          f"bloque {refinamiento.BLOQUE}, tolerancia {refinamiento.TOLERANCIA}")
+    print(f"{'radio':>6} {'':>4} {'malla':>18} {'celdas':>7} {'m/celda E-O x N-S':>18} "
+          f"{'evaluadas':>10} {'ms':>7} {'mismo color':>12}")
+    for radio in RADIOS:
+        la, lo, c = map(np.array, mediciones(n, radio_m=radio))
+        c = c.astype(float)
+        proy = ProyeccionLocal(la.mean(), lo.mean())
+        xs, ys = proy.enu(la, lo)
+        lim = interpolacion.limites(la, lo)
+        zmin, zmax = np.percentile(c, 1), np.percentile(c, 99)
+        color = lambda Z: rgba(np.clip(Z, zmin, zmax))
+
+        for tec in ("IDW", "RBF"):
+            filas = []
+            for nombre, (h, w) in (("320x320 grados", (interpolacion.H, interpolacion.W)),
+                                   ("metrica", interpolacion.forma_metrica(lim, proy)[:2])):
+                Lon, Lat = interpolacion.malla(lim, h, w)
+                QX, QY = proy.enu(Lat, Lon)
+                if tec == "RBF":
+                    evaluar = RBFTeselas(xs, ys, c, (min(xs.min(), QX.min()), max(xs.max(), QX.max()),
+                                                     min(ys.min(), QY.min()), max(ys.max(), QY.max())))
+                else:
+                    evaluar = lambda qx, qy: idw_vecinos(ys, xs, c, qy, qx)
+                paso = (np.ptp(QX) / (w - 1), np.ptp(QY) / (h - 1))
+                Z, t = cronometrar(lambda: evaluar(QX, QY))
+                filas.append((nombre, h, w, paso, h * w, t, ""))
+            (Za, info), t_a = cronometrar(lambda: refinamiento.adaptativa(evaluar, QX, QY, c, devolver_info=True))
+            igual = np.all(color(Za) == color(Z), axis=-1).mean()
+            filas.append(("adaptativa", h, w, paso, info["evaluadas"], t_a, f"{100 * igual:.2f}%"))
+            for nombre, h, w, paso, evaluadas, t, igual in filas:
+                print(f"{radio:>6.0f} {tec:>4} {nombre:>18} {h * w:>7} {paso[0]:>8.2f} x {paso[1]:<7.2f} "
+                      f"{evaluadas:>10} {t:>7.0f} {igual:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# bench_mapa_puntos.py
+# Capa de mediciones de los mapas: un folium.CircleMarker por fila con iterrows (como
+# estaba) contra tecnicas._puntos (una capa GeoJSON, popups armados en el navegador).
+# - mide: generar + guardar el HTML, tamano del HTML, objetos JS creados y, si hay node,
+#   tiempo de compilar el JS del HTML (lo que el navegador de la consola hace antes de
+#   pintar; sin Leaflet no se puede ejecutar aqui)
+# Uso: python3 benchmarks/bench_mapa_puntos.py [muestras ...]
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import folium
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import cache_columnar, datos, tecnicas
+from zonificacion.comun import colormap_int
+from zonificacion.sintetico import escribir_csv
+
+TAMANOS = (300, 3600, 20000)
+NODE = shutil.which("node")
+COMPILAR_JS = """
+const fs = require("fs"), vm = require("vm");
+const html = fs.readFileSync(process.argv[1], "utf8");
+const js = [...html.matchAll(/<script>([\\s\\S]*?)<\\/script>/g)].map(m => m[1]).join("\\n");
+const t0 = process.hrtime.bigint();
+new vm.Script(js);
+console.log(Number(process.hrtime.bigint() - t0) / 1e6);
+"""
+
+
+def puntos_viejo(m, df: pd.DataFrame, fmt_cpm):
+    for _, row in df.iterrows():
+        color = colormap_int.get(int(row["Nivel"]), "#B0B0B0")
+        folium.CircleMarker(
+            location=(float(row["Latitud"]), float(row["Longitud"])),
+            radius=3, color="black", fill=True, fill_opacity=0.9,
+            fill_color=color, weight=0.3,
+            popup=f"Nivel {int(row['Nivel'])} ({fmt_cpm(row['CPM'])} CPM)"
+        ).add_to(m)
+
+
+def medir(df: pd.DataFrame, puntos, fmt_cpm, ruta: str) -> tuple:
+    t0 = time.perf_counter()
+    m = folium.Map(location=[df["Latitud"].mean(), df["Longitud"].mean()], zoom_start=20,
+                   tiles="cartodbpositron", prefer_canvas=puntos is tecnicas._puntos)
+    puntos(m, df, fmt_cpm)
+    m.save(ruta)
+    t_gen = (time.perf_counter() - t0) * 1000.0
+    html = open(ruta, encoding="utf-8").read()
+    objetos = len(re.findall(r"^\s*var \w+ = ", html, re.M))
+    t_js = None
+    if NODE:
+        r = subprocess.run([NODE, "-e", COMPILAR_JS, ruta], capture_output=True, text=True)
+        t_js = float(r.stdout) if r.returncode == 0 else None
+    return t_gen, os.path.getsize(ruta), objetos, t_js
+
+
+def main():
+    tamanos = [int(a) for a in sys.argv[1:]] or TAMANOS
+    fmt = lambda t: f"{t:.0f}" if t is not None else "-"
+    print(f"{'muestras':>9} {'':>8} {'generar ms':>11} {'HTML KiB':>9} {'vars JS':>8} {'compilar JS ms':>15}")
+    with tempfile.TemporaryDirectory() as d:
+        cache_columnar.RUTA_CACHE = os.path.join(d, "cache")
+        for n in tamanos:
+            csv = os.path.join(d, "20250915_Bench.csv")
+            escribir_csv(csv, n)
+            df = datos.cargar(csv)
+            for nombre, puntos, fmt_cpm in (("antes", puntos_viejo, lambda c: c),
+                                             ("despues", tecnicas._puntos, lambda c: c)):
+                t_gen, tam, objetos, t_js = medir(df, puntos, fmt_cpm, os.path.join(d, f"{nombre}.html"))
+                print(f"{n:>9} {nombre:>8} {t_gen:>11.0f} {tam / 1024:>9.0f} {objetos:>8} {fmt(t_js):>15}")
+
+
+if __name__ == "__main__":
+    main()
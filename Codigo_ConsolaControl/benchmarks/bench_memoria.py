@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# bench_memoria.py
+# Pico de memoria (tracemalloc: numpy registra sus reservas) de la interpolacion de un
+# mapa: como estaba (meshgrid 320x320 float64 + IDW denso en trozos de 2000 celdas con
+# temporales float64 de 2000 x N), el camino float64 actual (malla metrica + idw_vecinos /
+# RBFTeselas) y el modo ligero (ejes 1D, float32, buffers por hilo reusados con out=).
+# - comprueba que el pico del modo ligero queda bajo el presupuesto de paralelo
+#   (+ la salida Z en float32 y lo fijo del evaluador: copias float32 de las muestras,
+#   kd-tree; ~64 bytes por muestra)
+# - comprueba que los colores por nivel coinciden con el camino float64
+# Uso: python3 benchmarks/bench_memoria.py [muestras] [presupuesto_mb]
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import interpolacion, ligero, paralelo
+from zonificacion.geodesia import ProyeccionLocal
+from zonificacion.idw import idw_vecinos
+from zonificacion.niveles import rgba
+from zonificacion.rbf_local import RBFTeselas
+from zonificacion.sintetico import mediciones
+
+MARGEN_MB = 1.0
+VIEJO_MAX = 20000        # el IDW original tarda minutos y reserva GB por encima
+BYTES_POR_MUESTRA = 64
+
+
+def idw_viejo(lats, lons, vals, Lat, Lon, p: float = 2.0, chunk: int = 2000):
+    """interpolacion.idw de tec02 original (grados, trozos fijos de 2000 celdas)."""
+    eps = 1e-12
+    Z = np.empty(Lat.shape, dtype=float)
+    q_lat = Lat.ravel()
+    q_lon = Lon.ravel()
+    M = q_lat.shape[0]
+    for start in range(0, M, chunk):
+        end = min(start + chunk, M)
+        dlat = q_lat[start:end][:, None] - lats[None, :]
+        dlon = q_lon[start:end][:, None] - lons[None, :]
+        dist = np.sqrt(dlat*dlat + dlon*dlon) + eps
+        w = 1.0 / np.power(dist, p)
+        Z.ravel()[start:end] = (w * vals[None, :]).sum(axis=1) / (w.sum(axis=1) + eps)
+    return Z
+
+
+def medir(fn) -> tuple:
+    """(resultado, pico MB, ms); buffers por hilo de ligero vacios al empezar."""
+    ligero._local = threading.local()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    r = fn()
+    t = (time.perf_counter() - t0) * 1000.0
+    pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return r, pico, t
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    presupuesto = float(sys.argv[2]) if len(sys.argv) > 2 else 16.0
+    paralelo.PRESUPUESTO_MB = presupuesto
+    la, lo, c = map(np.array, mediciones(n))
+    c = c.astype(float)
+    proy = ProyeccionLocal(la.mean(), lo.mean())
+    xs, ys = proy.enu(la, lo)
+    lim = interpolacion.limites(la, lo)
+    h, w, paso = interpolacion.forma_metrica(lim, proy)
+    zmin, zmax = np.percentile(c, 1), np.percentile(c, 99)
+    color = lambda Z: rgba(np.clip(Z, zmin, zmax))
+    tope = presupuesto + (h * w * 4 + n * BYTES_POR_MUESTRA) / 2 ** 20 + MARGEN_MB
+
+    def float64(evaluar):
+        Lon, Lat = interpolacion.malla(lim, h, w)
+        QX, QY = proy.enu(Lat, Lon)
+        return evaluar(QX, QY)
+
+    ajuste = RBFTeselas(xs, ys, c, (xs.min() - 10, xs.max() + 10, ys.min() - 10, ys.max() + 10))
+    ex, ny = ligero.ejes(lim, proy, h, w)
+    casos = [
+        ("IDW denso", lambda: float64(lambda qx, qy: idw_vecinos(ys, xs, c, qy, qx, k=None)),
+         lambda: ligero.IDWLigero(xs, ys, c, k=None).malla(ex, ny)),
+        ("IDW k=64", lambda: float64(lambda qx, qy: idw_vecinos(ys, xs, c, qy, qx)),
+         lambda: ligero.IDWLigero(xs, ys, c).malla(ex, ny)),
+        ("RBF teselas", lambda: float64(ajuste), lambda: ligero.RBFLigero(ajuste).malla(ex, ny)),
+    ]
+    print(f"{n} muestras, malla metrica {h}x{w} ({paso:.2f} m), presupuesto {presupuesto:.0f} MB, "
+          f"{paralelo.HILOS} hilo(s); tope del modo ligero {tope:.1f} MB")
+    print(f"{'':>14} {'pico MB':>9} {'ms':>8}")
+
+    def viejo():
+        Lon, Lat = interpolacion.malla(lim)
+        return idw_viejo(la, lo, c, Lat, Lon)
+    if n <= VIEJO_MAX:
+        _, pico, t = medir(viejo)
+        print(f"{'antes (IDW)':>14} {pico:>9.1f} {t:>8.0f}   meshgrid 320x320 + trozos de 2000 x {n} float64")
+
+    for nombre, f64, liviano in casos:
+        ref, p64, t64 = medir(f64)
+        z, p32, t32 = medir(liviano)
+        igual = np.all(color(z) == color(ref), axis=-1).mean()
+        print(f"{nombre:>14} {p64:>9.1f} {t64:>8.0f}   float64")
+        print(f"{'':>14} {p32:>9.1f} {t32:>8.0f}   ligero; mismo color {100 * igual:.2f}%")
+        assert z.dtype == np.float32 and z.shape == (h, w)
+        assert p32 <= tope, f"{nombre}: pico {p32:.1f} MB > {tope:.1f} MB"
+        assert igual >= 0.99, nombre
+    print(f"\nOK: modo ligero bajo {tope:.1f} MB en las tres interpolaciones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# bench_niveles.py
+# Clasificacion y coloreado por nivel: como estaba (Series.apply por fila, np.vectorize
+# sobre la malla + 6 pasadas de mascaras) contra niveles.niveles / niveles.rgba
+# (searchsorted + tabla RGBA), en mallas de 320x320 (la de los mapas) a 4000x4000.
+# - comprueba que niveles() reproduce calcular_nivel (escala Node-RED) en 5..20000 CPM
+#   (bajo 5 calcular_nivel daba 2; ahora 0, como el raster) y que la imagen coincide
+#   con la anterior donde las dos escalas ya coincidian (5..15000)
+# - comprueba que almacen.nivel_cpm (intensidad del receptor, sin numpy) da lo mismo que
+#   niveles() en los bordes de cada banda y en 0..20000 CPM
+# Uso: python3 benchmarks/bench_niveles.py
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from almacen import nivel_cpm
+from zonificacion.comun import colormap_int, nivel_alpha, hex_to_rgb255
+from zonificacion.niveles import CPM_MIN, CORTES_CPM, niveles, rgba
+
+LADOS = (320, 1000, 2000, 4000)
+VIEJO_MAX = 2000        # np.vectorize en 4000x4000 tarda ~10 s
+
+
+def calcular_nivel(cpm):
+    # escala por fila de tec01..tec04 originales
+    if cpm >= 5 and cpm <= 150: return 1
+    elif cpm <= 500: return 2
+    elif cpm <= 1500: return 3
+    elif cpm <= 6000: return 4
+    elif cpm <= 15000: return 5
+    else: return 0
+
+
+def nivel_from_cpm(c):
+    # escala del raster de tec02/tec03 originales
+    if c <= 4: return 0
+    if c <= 150: return 1
+    if c <= 500: return 2
+    if c <= 1500: return 3
+    if c <= 6000: return 4
+    return 5
+
+
+def rgba_viejo(Z):
+    valido = np.isfinite(Z)
+    Zlvl = np.vectorize(nivel_from_cpm)(np.where(valido, Z, 0.0)).astype(int)
+    img = np.zeros(Z.shape + (4,), dtype=np.uint8)
+    for lvl in range(0, 6):
+        mask = (Zlvl == lvl) & valido
+        r, g, b = hex_to_rgb255(colormap_int[lvl])
+        a = int(nivel_alpha[lvl] * 255)
+        img[mask, 0] = r; img[mask, 1] = g; img[mask, 2] = b; img[mask, 3] = a
+    return img
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    cpm = np.arange(5, 20001)
+    assert np.array_equal(niveles(cpm), [calcular_nivel(c) for c in cpm])
+    assert (niveles(np.arange(0, 5)) == 0).all()
+    Z = np.random.default_rng(1).uniform(0, 20000, (200, 200))
+    Z[::7, ::5] = np.nan
+    misma = ~(Z < 5) & ~(Z > 15000)
+    assert np.array_equal(rgba(Z)[misma], rgba_viejo(Z)[misma])
+    assert (rgba(Z)[np.isnan(Z)] == 0).all()
+    bordes = sorted({b + d for b in (0, CPM_MIN) + CORTES_CPM for d in (-1, 0, 1)})
+    assert [nivel_cpm(c) for c in bordes] == niveles(bordes).tolist(), bordes
+    todos = np.arange(0, 20001)
+    assert np.array_equal([nivel_cpm(int(c)) for c in todos], niveles(todos))
+    print("OK: niveles() = calcular_nivel en 5..20000 CPM (0 bajo 5); rgba() = raster anterior en 5..15000 y NaN")
+    print(f"OK: almacen.nivel_cpm = niveles() en los bordes {bordes} y en 0..20000 CPM\n")
+
+    rng = np.random.default_rng(2)
+    s = pd.Series(rng.integers(0, 16000, 100_000))
+    _, t_apply = cronometrar(lambda: s.apply(calcular_nivel))
+    _, t_ss = cronometrar(lambda: niveles(s))
+    print(f"columna Nivel, {len(s):,} filas: apply {t_apply:.1f} ms, searchsorted {t_ss:.2f} ms "
+          f"({t_apply / t_ss:,.0f}x)\n")
+
+    print(f"{'malla':>11} {'vectorize+mascaras ms':>22} {'rgba ms':>9} {'aceleracion':>12}")
+    for lado in LADOS:
+        Z = rng.lognormal(6, 1.5, (lado, lado))
+        t_v = cronometrar(lambda: rgba_viejo(Z))[1] if lado <= VIEJO_MAX else None
+        _, t_n = cronometrar(lambda: rgba(Z))
+        vel = f"{t_v / t_n:.0f}x" if t_v else "-"
+        print(f"{lado:>5}x{lado:<5} {(f'{t_v:.0f}' if t_v else '-'):>22} {t_n:>9.1f} {vel:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# bench_paralelo.py
+# Interpolacion en 1, 2 y 4 hilos (paralelo.por_trozos) sobre un recorrido sintetico de
+# 10k muestras: IDW denso (todas las muestras), IDW k vecinos (kd-tree) y RBF por
+# teselas, en la malla metrica de los mapas.
+# - comprueba que el resultado es identico bit a bit con cualquier numero de hilos y
+#   cualquier presupuesto de memoria (trozos distintos)
+# - la aceleracion depende de los nucleos libres: en la Raspberry Pi 4 hay 4
+# Uso: python3 benchmarks/bench_paralelo.py [muestras] [presupuesto_mb]
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import interpolacion, paralelo
+from zonificacion.geodesia import ProyeccionLocal
+from zonificacion.idw import idw_vecinos
+from zonificacion.rbf_local import RBFTeselas
+from zonificacion.sintetico import mediciones
+
+HILOS = (1, 2, 4)
+DENSO_CELDAS = 20000        # el denso es O(celdas * N): malla mas chica
+
+
+def cronometrar(fn, rep: int = 3) -> tuple:
+    t = []
+    for _ in range(rep):
+        t0 = time.perf_counter()
+        r = fn()
+        t.append((time.perf_counter() - t0) * 1000.0)
+    return r, sorted(t)[len(t) // 2]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    presupuesto = float(sys.argv[2]) if len(sys.argv) > 2 else paralelo.PRESUPUESTO_MB
+    la, lo, c = map(np.array, mediciones(n))
+    c = c.astype(float)
+    proy = ProyeccionLocal(la.mean(), lo.mean())
+    xs, ys = proy.enu(la, lo)
+    lim = interpolacion.limites(la, lo)
+    h, w, paso = interpolacion.forma_metrica(lim, proy)
+    QX, QY = proy.enu(*interpolacion.malla(lim, h, w)[::-1])
+    chica = interpolacion.forma_metrica(lim, proy, max_celdas=DENSO_CELDAS)
+    dX, dY = proy.enu(*interpolacion.malla(lim, *chica[:2])[::-1])
+    rbf = RBFTeselas(xs, ys, c, (QX.min(), QX.max(), QY.min(), QY.max()))
+
+    casos = [
+        (f"IDW denso {chica[0]}x{chica[1]}",
+         lambda k, mb: idw_vecinos(ys, xs, c, dY, dX, k=None, hilos=k, presupuesto_mb=mb)),
+        (f"IDW kd-tree {h}x{w}", lambda k, mb: idw_vecinos(ys, xs, c, QY, QX, hilos=k, presupuesto_mb=mb)),
+        (f"RBF teselas {h}x{w}", lambda k, mb: rbf(QX, QY, hilos=k, presupuesto_mb=mb)),
+    ]
+    print(f"{n} muestras, celda {paso:.2f} m, presupuesto {presupuesto:.0f} MB, "
+          f"nucleos disponibles: {paralelo.HILOS}")
+    print(f"{'':>24}" + "".join(f"{f'{k} hilo(s) ms':>15}" for k in HILOS) + f"{'aceleracion x4':>16}")
+    for nombre, fn in casos:
+        ref, t1 = cronometrar(lambda: fn(1, presupuesto))
+        tiempos = [t1]
+        for k in HILOS[1:]:
+            z, t = cronometrar(lambda: fn(k, presupuesto))
+            tiempos.append(t)
+            assert np.array_equal(z, ref, equal_nan=True), (nombre, k)
+        # otro presupuesto = otros trozos: mismo resultado
+        assert np.array_equal(fn(HILOS[-1], presupuesto / 8), ref, equal_nan=True), nombre
+        print(f"{nombre:>24}" + "".join(f"{t:>15.0f}" for t in tiempos) + f"{t1 / tiempos[-1]:>16.2f}")
+    print("\nOK: mismo resultado bit a bit con 1, 2 y 4 hilos y con trozos de otro tamano")
+
+
+if __name__ == "__main__":
+    main()
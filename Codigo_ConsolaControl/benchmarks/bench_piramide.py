@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# bench_piramide.py
+# Overlay IDW/RBF como un raster embebido en el HTML (como estaba) contra teselas XYZ
+# perezosas (piramide.py, tecnicas.TESELAS): tamano del HTML y tiempo de generarlo, y
+# costo de la primera vista (las teselas de una ventana de 1024 x 600 px alrededor del
+# foco) en frio y desde el disco, con la resolucion de cada una.
+# - comprueba que cada tesela (nodos cada PASO_M con malla adaptativa + bilineal) tiene
+#   el color de evaluar el interpolador en cada pixel en >= 99 % de los pixeles
+# - recorridos de 60 m y 1000 m de radio
+# Uso: python3 benchmarks/bench_piramide.py [muestras]
+
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import datos, interpolacion, piramide, tecnicas
+from zonificacion.sintetico import COLUMNAS_CSV, mediciones
+
+RADIOS = (60.0, 1000.0)
+VENTANA = (1024, 600)
+ZOOM = 20
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, (time.perf_counter() - t0) * 1000.0
+
+
+def marco(n: int, radio: float) -> pd.DataFrame:
+    lats, lons, cpms = mediciones(n, semilla=3, radio_m=radio)
+    filas = [[i + 1, 2025, 9, 15, 12 + i // 3600, i // 60 % 60, i % 60, la, lo, 0, c, round(c / 151, 2)]
+             for i, (la, lo, c) in enumerate(zip(lats, lons, cpms))]
+    return datos._preparar(pd.DataFrame(filas, columns=COLUMNAS_CSV))
+
+
+def visibles(p: piramide.Piramide, foco: tuple, z: int) -> list:
+    """Teselas de una ventana VENTANA centrada en el foco, dentro de los limites."""
+    n = piramide.TAM * 2 ** z
+    cx = (foco[1] + 180.0) / 360.0 * n
+    cy = (1.0 - math.asinh(math.tan(math.radians(foco[0]))) / math.pi) / 2.0 * n
+    x0, x1 = int((cx - VENTANA[0] / 2) // piramide.TAM), int((cx + VENTANA[0] / 2) // piramide.TAM)
+    y0, y1 = int((cy - VENTANA[1] / 2) // piramide.TAM), int((cy + VENTANA[1] / 2) // piramide.TAM)
+    return [(z, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) if p.contiene(z, x, y)]
+
+
+def mismo_color(p: piramide.Piramide, z: int, x: int, y: int) -> float:
+    """% de pixeles de la tesela con el color de evaluar cada pixel."""
+    c = np.arange(piramide.TAM) + 0.5
+    Lon, Lat = np.meshgrid(piramide.lon_de_x(x * piramide.TAM + c, z), piramide.lat_de_y(y * piramide.TAM + c, z))
+    lat_min, lat_max, lon_min, lon_max = p.lim
+    dentro = (Lat >= lat_min) & (Lat <= lat_max) & (Lon >= lon_min) & (Lon <= lon_max)
+    Z = np.full(Lat.shape, np.nan)
+    Z[dentro] = p.evaluar(*p.proy.enu(Lat[dentro], Lon[dentro]))
+    ref = interpolacion.raster_niveles(Z, p.vals)
+    img = interpolacion.raster_niveles(p.campo(z, x, y), p.vals)
+    return 100.0 * np.mean(np.all(img[dentro] == ref[dentro], axis=-1)) if dentro.any() else 100.0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    print(f"{n} muestras; ventana {VENTANA[0]}x{VENTANA[1]} px en zoom {ZOOM}; teselas z {piramide.Z_MIN}-{piramide.Z_MAX}")
+    print(f"{'radio':>6} {'tec':>4} {'overlay':>8} {'HTML KB':>8} {'imagen KB':>10} {'gen ms':>7} {'m/px':>6} "
+          f"{'teselas':>8} {'frio ms':>8} {'disco ms':>9} {'mismo color':>12}")
+    for radio in RADIOS:
+        df = marco(n, radio)
+        foco = tecnicas._foco(df)
+        lat_c = math.radians(foco[0])
+        for usar_rbf in (False, True):
+            tec = "rbf" if usar_rbf else "idw"
+            m, t_raster = cronometrar(lambda: tecnicas._mapa_interpolado(df, usar_rbf, teselas=False))
+            html = m.get_root().render()
+            imagen = sum(map(len, re.findall(r"data:image/png;base64,[A-Za-z0-9+/=]+", html))) / 1024
+            lim = interpolacion.limites(df["Latitud"].to_numpy(float), df["Longitud"].to_numpy(float))
+            proy = tecnicas.ProyeccionLocal(*foco)
+            _, _, paso = interpolacion.forma_metrica(lim, proy)
+            print(f"{radio:>6.0f} {tec:>4} {'raster':>8} {len(html) / 1024:>8.0f} {imagen:>10.1f} {t_raster:>7.0f} {paso:>6.2f}")
+
+            with tempfile.TemporaryDirectory() as d:
+                piramide.RUTA_TESELAS = d
+                m, t_teselas = cronometrar(lambda: tecnicas._mapa_interpolado(df, usar_rbf, teselas=True))
+                html_teselas = len(m.get_root().render()) / 1024
+                v = next(e for e in os.listdir(d) if not e.startswith("."))
+                p, t_ajuste = cronometrar(lambda: piramide.Piramide(os.path.join(d, v)))
+                vista = visibles(p, foco, ZOOM)
+                _, t_frio = cronometrar(lambda: [p.tesela(*t) for t in vista])
+                _, t_disco = cronometrar(lambda: [p.tesela(*t) for t in vista])
+                color = min(mismo_color(p, *t) for t in vista)
+                assert color >= 99.0, (radio, tec, color)
+                for z in (ZOOM, piramide.Z_MAX):
+                    m_px = 40075016.7 * math.cos(lat_c) / (piramide.TAM * 2 ** z)
+                    extra = (f"{len(vista):>8} {t_ajuste + t_frio:>8.0f} {t_disco:>9.1f} {color:>11.1f}%"
+                             if z == ZOOM else "")
+                    print(f"{'':>6} {tec:>4} {'z' + str(z):>8} {html_teselas:>8.0f} {0.0:>10.1f} {t_teselas:>7.0f} {m_px:>6.2f} {extra}")
+    print("\nfrio = ajustar el interpolador + calcular las teselas visibles; disco = mismas teselas ya guardadas")
+    print("OK: teselas = evaluar cada pixel (>= 99 % de pixeles del mismo color)")
+
+
+if __name__ == "__main__":
+    main()
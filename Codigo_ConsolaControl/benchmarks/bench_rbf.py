@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# bench_rbf.py
+# RBF global de tec03 original (scipy Rbf en grados, sistema N x N) contra
+# rbf_local.rbf_teselas (metros, teselas con solape, presupuesto de memoria)
+# sobre la malla de 320x320 de los mapas.
+# - comprueba que con una sola tesela rbf_teselas es la solucion global en metros
+# - exactitud contra el campo sin ruido de sintetico.campo(), en las celdas a <= CERCA_M
+#   de alguna muestra (lejos de los datos cualquier interpolador extrapola): error
+#   absoluto medio en CPM y % de celdas con el nivel correcto; ademas diferencia mediana
+#   teselas vs global en metros
+# - del Rbf legacy se reporta ademas % de celdas con CPM < 0 (smooth restado: sistema
+#   indefinido); su evaluacion arma una matriz celdas x N, se omite sobre LEGADO_MAX
+# - la global en metros se omite sobre GLOBAL_MAX muestras (N^2 memoria, N^3 tiempo)
+# Uso: python3 benchmarks/bench_rbf.py [presupuesto_mb]
+
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa"))
+from zonificacion import interpolacion
+from zonificacion.niveles import niveles
+from zonificacion.geodesia import ProyeccionLocal
+from zonificacion.rbf_local import rbf_teselas, rbf_global
+from zonificacion.sintetico import mediciones, campo
+
+TAMANOS = (300, 1000, 3600, 6000, 20000, 50000)
+GLOBAL_MAX = 6000
+LEGADO_MAX = 1000
+CERCA_M = 3.0
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, (time.perf_counter() - t0) * 1000.0
+
+
+def global_metros(la, lo, c, Lat, Lon):
+    proy = ProyeccionLocal.centrada(la, lo)
+    x, y = proy.enu(la, lo)
+    qx, qy = proy.enu(Lat.ravel(), Lon.ravel())
+    return rbf_global(x, y, c, qx, qy).reshape(Lat.shape)
+
+
+def cerca(la, lo, Lat, Lon):
+    proy = ProyeccionLocal.centrada(la, lo)
+    d = cKDTree(np.column_stack(proy.enu(la, lo))).query(np.column_stack(proy.enu(Lat.ravel(), Lon.ravel())))[0]
+    return (d <= CERCA_M).reshape(Lat.shape)
+
+
+def exactitud(Z, T, mascara) -> str:
+    if Z is None:
+        return "-"
+    mae = float(np.mean(np.abs(Z - T)[mascara]))
+    return f"{mae:.0f} / {np.mean(niveles(Z)[mascara] == niveles(T)[mascara]):.1%}"
+
+
+def main():
+    presupuesto = float(sys.argv[1]) if len(sys.argv) > 1 else 64.0
+
+    la, lo, c = map(np.array, mediciones(500))
+    Lon, Lat = interpolacion.malla(interpolacion.limites(la, lo), 80, 80)
+    proy = ProyeccionLocal.centrada(la, lo)
+    z, info = rbf_teselas(*proy.enu(la, lo), c, *proy.enu(Lat, Lon), devolver_info=True)
+    assert info["teselas"] == 1
+    assert np.allclose(z, global_metros(la, lo, c, Lat, Lon), rtol=1e-9, atol=1e-9)
+    print("OK: con una tesela rbf_teselas = RBF global en metros\n")
+
+    print(f"malla {interpolacion.H}x{interpolacion.W}, presupuesto {presupuesto:.0f} MB; "
+          f"exactitud = error medio CPM / % nivel correcto (celdas a <= {CERCA_M:.0f} m de una muestra)")
+    print(f"{'muestras':>9} {'legacy ms':>10} {'legacy':>13} {'<0':>6} {'global m ms':>12} {'global m':>13} "
+          f"{'teselas ms':>11} {'teselas':>13} {'n tes.':>7} {'dif vs gl.':>11}")
+    for n in TAMANOS:
+        la, lo, c = map(np.array, mediciones(n))
+        c = c.astype(float)
+        Lon, Lat = interpolacion.malla(interpolacion.limites(la, lo))
+        T, mascara = campo(Lat, Lon), cerca(la, lo, Lat, Lon)
+        zg, t_g = (None, None) if n > LEGADO_MAX else cronometrar(lambda: interpolacion.rbf(la, lo, c, Lat, Lon))
+        zm, t_m = (None, None) if n > GLOBAL_MAX else cronometrar(lambda: global_metros(la, lo, c, Lat, Lon))
+        proy = ProyeccionLocal.centrada(la, lo)
+        (zt, info), t_t = cronometrar(lambda: rbf_teselas(*proy.enu(la, lo), c, *proy.enu(Lat, Lon),
+                                                          presupuesto_mb=presupuesto, devolver_info=True))
+        fmt = lambda t: f"{t:.0f}" if t is not None else "-"
+        neg = f"{np.mean(zg < 0):.0%}" if zg is not None else "-"
+        dif = f"{np.median(np.abs(zt - zm)[mascara] / zm[mascara]):.2%}" if zm is not None else "-"
+        print(f"{n:>9} {fmt(t_g):>10} {exactitud(zg, T, mascara):>13} {neg:>6} {fmt(t_m):>12} "
+              f"{exactitud(zm, T, mascara):>13} {fmt(t_t):>11} {exactitud(zt, T, mascara):>13} "
+              f"{info['teselas']:>7} {dif:>11}")
+
+if __name__ == "__main__":
+    main()
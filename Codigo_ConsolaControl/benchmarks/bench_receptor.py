@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# bench_receptor.py
+# Carga del receptor sin hardware: LoRaFalso -> Receptor -> SpoolMQTT -> BrokerFalso
+# Reporta tramas/s sostenidas y el giro RX->ACK (p50/p99).
+# Uso:
+#   python3 benchmarks/bench_receptor.py                 # barrido de tasas
+#   python3 benchmarks/bench_receptor.py --tasa 200      # tasa fija (tramas/s)
+#   python3 benchmarks/bench_receptor.py --grabacion log.txt --tasa 0
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from lora_falso import BrokerFalso, ReceptorLoRaFalso, tramas_sinteticas, leer_grabacion
+from receptor import Receptor, TOPIC_DATOS, percentil
+from spool_mqtt import SpoolMQTT
+
+ACK_TIMEOUT_MS = 800.0   # DetectorRemoto.ino
+
+
+def correr(tramas: list, tasa: float, airtime_ack_s: float = 0.0, drenar_max_s: float = 30.0) -> dict:
+    with tempfile.TemporaryDirectory() as d:
+        broker = BrokerFalso()
+        spool = SpoolMQTT(broker, os.path.join(d, "spool.db"))
+        spool.iniciar("falso")
+        receptor = Receptor(spool, broker, log=lambda *a, **k: None)
+        receptor.lat_muestras = deque()
+        receptor.iniciar()
+        radio = ReceptorLoRaFalso(receptor, airtime_ack_s)
+
+        periodo = 1.0 / tasa if tasa > 0 else 0.0
+        t0 = time.perf_counter()
+        for i, t in enumerate(tramas):
+            if periodo:
+                objetivo = t0 + i * periodo
+                while time.perf_counter() < objetivo:
+                    pass
+            radio.inyectar(t)
+        t_iny = time.perf_counter() - t0
+
+        # esperar que el pipeline se ponga al dia
+        limite = time.perf_counter() + drenar_max_s
+        receptor.esperar_colas()
+        while spool.pendientes() and time.perf_counter() < limite:
+            time.sleep(0.005)
+        t_total = time.perf_counter() - t0
+
+        estad = receptor.estadisticas()
+        dup = sum(e.duplicados for e in receptor.enlaces.values())
+        crc_err = sum(e.crc_err for e in receptor.enlaces.values()) + estad["errores_sin_dispositivo"]
+        muestras = list(receptor.lat_muestras)
+        publicados = sum(len(broker.por_topic(TOPIC_DATOS.format(d))) for d in receptor.enlaces)
+        receptor.detener()
+        spool.detener()
+
+    return {
+        "tramas": len(tramas),
+        "tasa_obj": tasa,
+        "tasa_iny": len(tramas) / t_iny if t_iny else 0.0,
+        "tasa_sost": len(tramas) / t_total if t_total else 0.0,
+        "retraso_s": t_total - t_iny,
+        "publicados": publicados,
+        "duplicados": dup,
+        "crc_err": crc_err,
+        "descartados": estad["eventos_descartados"],
+        "ack_p50_ms": percentil(muestras, 50),
+        "ack_p99_ms": percentil(muestras, 99),
+    }
+
+
+def imprimir(r: dict):
+    print(f"{r['tasa_obj']:>9.0f} {r['tasa_iny']:>9.0f} {r['tasa_sost']:>9.0f} {r['retraso_s']:>8.2f} "
+          f"{r['publicados']:>7} {r['duplicados']:>5} {r['crc_err']:>5} {r['descartados']:>6} "
+          f"{r['ack_p50_ms']:>8.3f} {r['ack_p99_ms']:>8.3f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Banco de carga del receptor LoRa sin hardware")
+    ap.add_argument("--n", type=int, default=3000, help="tramas sinteticas por corrida")
+    ap.add_argument("--tasa", type=float, default=None, help="tramas/s (0 = lo mas rapido posible)")
+    ap.add_argument("--grabacion", help="archivo con tramas grabadas (una por linea)")
+    ap.add_argument("--p-crc", type=float, default=0.02)
+    ap.add_argument("--p-dup", type=float, default=0.05)
+    ap.add_argument("--p-binaria", type=float, default=0.0)
+    ap.add_argument("--airtime-ack", type=float, default=0.0, help="s simulados de TX del ACK")
+    args = ap.parse_args()
+
+    if args.grabacion:
+        tramas = leer_grabacion(args.grabacion)
+    else:
+        tramas = list(tramas_sinteticas(args.n, args.p_crc, args.p_dup, args.p_binaria, hello_cada=1000))
+
+    print(f"{'tasa obj':>9} {'inyect':>9} {'sost':>9} {'retraso':>8} {'public':>7} {'dup':>5} "
+          f"{'crc':>5} {'descart':>6} {'ack p50':>8} {'ack p99':>8}")
+
+    if args.tasa is not None:
+        imprimir(correr(tramas, args.tasa, args.airtime_ack))
+        return
+
+    # barrido: la mayor tasa en que el pipeline no descarta, drena en < 1 s y p99 < timeout
+    max_ok = 0.0
+    for tasa in (50, 100, 200, 500, 1000, 2000, 5000, 10000, 0):
+        r = correr(tramas, tasa, args.airtime_ack)
+        imprimir(r)
+        ok = r["descartados"] == 0 and r["retraso_s"] < 1.0 and r["ack_p99_ms"] < ACK_TIMEOUT_MS
+        if not ok:
+            break
+        max_ok = r["tasa_sost"]
+    print(f"\nmaximo sostenido: {max_ok:,.0f} tramas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# bench_trama.py
+# Micro-benchmark tramas/s: cadena regex + CRC bit a bit (receptor v4)
+# contra decodificar_trama (una pasada + CRC por tabla).
+# Uso: python3 benchmarks/bench_trama.py [n_tramas]
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from trama import crc16_ccitt, decodificar_trama, TramaInvalida
+
+
+# ---- Implementacion previa (copia de DetectorRemoto.py v4) ----
+def crc16_ccitt_bits(data: bytes, poly: int = 0x1021, init_val: int = 0xFFFF) -> int:
+    crc = init_val
+    for b in data:
+        crc ^= (b << 8) & 0xFFFF
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ poly) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+    return crc
+
+def parse_seq_and_crc(payload_str: str):
+    m_seq = re.search(r'(?:SEQ\s*[:=]\s*)([A-Fa-f0-9]+)', payload_str)
+    seq = m_seq.group(1) if m_seq else None
+    m_crc = re.search(r'(?:CRC\s*[:=]\s*)([A-Fa-f0-9]{4})', payload_str)
+    rx_crc = m_crc.group(1).upper() if m_crc else None
+    core = payload_str[:m_crc.start()].rstrip('; ') if m_crc else payload_str
+    calc = f"{crc16_ccitt_bits(core.encode('ascii', errors='ignore')):04X}"
+    ok = (rx_crc is not None and rx_crc == calc)
+    return core, seq, rx_crc, calc, ok
+
+def parse_kv_pairs(text: str) -> dict:
+    kv = {}
+    for m in re.finditer(r'([A-Z]+)\s*=\s*([^,;]+)', text):
+        kv[m.group(1).upper()] = m.group(2)
+    return kv
+
+def decodificar_previo(mensaje: str):
+    if mensaje.startswith("HELLO"):
+        m_seq = re.search(r'(?:SEQ\s*[:=]\s*)([A-Fa-f0-9]+)', mensaje)
+        return m_seq.group(1) if m_seq else "NA"
+    core, seq, rx_crc, calc, ok = parse_seq_and_crc(mensaje)
+    if ok and mensaje.startswith("todo:"):
+        contenido = core.replace("todo:", "", 1)
+        lat, lon, cpm, alt, sat = contenido.split(",")[:5]
+        kv = parse_kv_pairs(contenido)
+        return lat, lon, cpm, alt, sat, kv
+    return None
+
+
+def tramas_sinteticas(n: int) -> list:
+    out = []
+    for i in range(n):
+        core = (f"todo:{-33.4489 + i * 1e-6:.6f},{-70.6693 - i * 1e-6:.6f},{100 + i % 900},"
+                f"{520.0 + i % 7:.2f},{7 + i % 5},DATE=2025-09-15,TIME=23:{i // 60 % 60:02d}:{i % 60:02d},"
+                f"SEQ={1 + i % 99:02d}")
+        out.append(f"{core};CRC={crc16_ccitt(core.encode('ascii')):04X}")
+    return out
+
+
+def medir(fn, tramas: list, rondas: int = 3) -> float:
+    mejor = float("inf")
+    for _ in range(rondas):
+        t0 = time.perf_counter()
+        for t in tramas:
+            try:
+                fn(t)
+            except TramaInvalida:
+                pass
+        mejor = min(mejor, time.perf_counter() - t0)
+    return len(tramas) / mejor
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    tramas = tramas_sinteticas(n)
+
+    # consistencia antes de medir
+    for t in tramas[:200]:
+        lat, lon, cpm, alt, sat, kv = decodificar_previo(t)
+        f = decodificar_trama(t)
+        assert float(lat) == f.lat and int(cpm) == f.cpm and int(kv["SEQ"]) == f.seq
+
+    previo = medir(decodificar_previo, tramas)
+    nuevo = medir(decodificar_trama, tramas)
+    print(f"tramas          : {n}")
+    print(f"regex + CRC bit : {previo:12,.0f} tramas/s")
+    print(f"una pasada+tabla: {nuevo:12,.0f} tramas/s  (x{nuevo / previo:.1f})")
+
+
+if __name__ == "__main__":
+    main()
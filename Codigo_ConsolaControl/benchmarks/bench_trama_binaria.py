@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# bench_trama_binaria.py
+# Trama texto vs binaria v1: verificacion de ida y vuelta y tabla de airtime
+# (formula Semtech SX127x, SF7/BW125/CR4-5, preambulo 8, header explicito, CRC).
+# Uso: python3 benchmarks/bench_trama_binaria.py
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from trama import crc16_ccitt, codificar_binaria, decodificar_payload
+
+
+def airtime_ms(n_bytes: int, sf: int = 7, bw: float = 125e3, cr: int = 1, preambulo: int = 8,
+               crc: bool = True, header_explicito: bool = True) -> float:
+    t_sym = (2 ** sf) / bw * 1000.0
+    de = 1 if t_sym > 16.0 else 0  # low data rate optimize
+    ih = 0 if header_explicito else 1
+    num = 8 * n_bytes - 4 * sf + 28 + (16 if crc else 0) - 20 * ih
+    n_payload = 8 + max(math.ceil(num / (4 * (sf - 2 * de))) * (cr + 4), 0)
+    return (preambulo + 4.25) * t_sym + n_payload * t_sym
+
+
+def ida_y_vuelta(n: int = 5000):
+    rnd = random.Random(1)
+    for i in range(n):
+        seq = 1 + i % 99
+        lat = round(rnd.uniform(-90, 90), 6)
+        lon = round(rnd.uniform(-180, 180), 6)
+        cpm = rnd.randint(0, 65535)
+        alt = float(rnd.randint(-400, 6000))
+        sat = rnd.randint(0, 30)
+        epoch = rnd.randint(0, 2 ** 32 - 1)
+
+        t_bin, _ = decodificar_payload(codificar_binaria(seq, lat, lon, cpm, alt, sat, epoch))
+        assert (t_bin.seq, t_bin.lat, t_bin.lon, t_bin.cpm, t_bin.alt, t_bin.sat) == (seq, lat, lon, cpm, alt, sat)
+
+        # el contenido publicado es equivalente al de la trama de texto
+        core = "todo:" + t_bin.contenido
+        t_txt, _ = decodificar_payload(f"{core};CRC={crc16_ccitt(core.encode()):04X}".encode())
+        assert (t_txt.seq, t_txt.lat, t_txt.lon, t_txt.cpm, t_txt.fecha, t_txt.hora) == \
+               (t_bin.seq, t_bin.lat, t_bin.lon, t_bin.cpm, t_bin.fecha, t_bin.hora)
+    return n
+
+
+def main():
+    n = ida_y_vuelta()
+    print(f"ida y vuelta OK ({n} tramas aleatorias)\n")
+
+    core = "todo:-33.448912,-70.669301,1234,521.40,9,DATE=2025-09-15,TIME=23:45:10,SEQ=07"
+    texto = f"{core};CRC={crc16_ccitt(core.encode()):04X}".encode()
+    binaria = codificar_binaria(7, -33.448912, -70.669301, 1234, 521.4, 9, 1757979910)
+    ack = b"ACK:07,OK"
+
+    print(f"{'formato':<10}{'bytes':>7}{'airtime ms':>12}{'+ACK ms':>10}{'tramas/s max':>14}")
+    for nombre, trama in (("texto", texto), ("binaria", binaria)):
+        t = airtime_ms(len(trama))
+        t_ack = t + airtime_ms(len(ack))
+        print(f"{nombre:<10}{len(trama):>7}{t:>12.1f}{t_ack:>10.1f}{1000.0 / t_ack:>14.1f}")
+
+    for nombre, trama in (("texto", texto), ("binaria", binaria)):
+        t0 = time.perf_counter()
+        for _ in range(20000):
+            decodificar_payload(trama)
+        print(f"decodificar {nombre:<8}: {20000 / (time.perf_counter() - t0):10,.0f} tramas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# bench_zonificacion_servicio.py
+# Arranque en frio (python3 tec0X_*.py --local, como cada clic de Node-RED antes)
+# contra pedidos al servicio residente (mismo script, delegando por socket Unix,
+# y pedido directo con solicitar()). Datos sinteticos, salida en un directorio temporal.
+# Uso: python3 benchmarks/bench_zonificacion_servicio.py [muestras] [repeticiones]
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ZONAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ZonificacionMapa")
+sys.path.insert(0, ZONAS)
+from zonificacion.servicio import solicitar
+from zonificacion.sintetico import escribir_csv
+
+SCRIPTS = [("concentrico", "tec01_concentrico.py"), ("idw", "tec02_IDW.py"),
+           ("rbf", "tec03_RBF.py"), ("trayecto", "tec04_trayecto.py")]
+
+
+def cronometrar(fn, rep: int) -> float:
+    """Mediana en ms."""
+    t = []
+    for _ in range(rep):
+        t0 = time.perf_counter()
+        fn()
+        t.append((time.perf_counter() - t0) * 1000.0)
+    return sorted(t)[len(t) // 2]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    rep = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as d:
+        csv = os.path.join(d, "20250915_Bench.csv")
+        html = os.path.join(d, "mapa.html")
+        sock = os.path.join(d, "zonas.sock")
+        escribir_csv(csv, n)
+        silencio = dict(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ZONAS, check=True)
+
+        t_imports = cronometrar(lambda: subprocess.run(
+            [sys.executable, "-c", "import pandas, numpy, folium, scipy.interpolate"], **silencio), rep)
+        print(f"{n} muestras, mediana de {rep} corridas; solo imports en frio: {t_imports:.0f} ms\n")
+
+        srv = subprocess.Popen([sys.executable, "-m", "zonificacion.servicio", "--socket", sock], cwd=ZONAS,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            limite = time.time() + 60
+            while not os.path.exists(sock):
+                if time.time() > limite:
+                    raise RuntimeError("el servicio no arranco")
+                time.sleep(0.05)
+
+            print(f"{'tecnica':>12} {'frio ms':>9} {'shim+serv ms':>13} {'socket ms':>10} {'aceleracion':>12}")
+            for tecnica, script in SCRIPTS:
+                arg = ["--csv", csv, "--html", html, "--socket", sock]
+                frio = cronometrar(lambda: subprocess.run([sys.executable, script, "--local"] + arg, **silencio), rep)
+                solicitar(tecnica, csv, html, sock)   # primer pedido: lee el CSV
+                shim = cronometrar(lambda: subprocess.run([sys.executable, script] + arg, **silencio), rep)
+                directo = cronometrar(lambda: solicitar(tecnica, csv, html, sock), rep)
+                print(f"{tecnica:>12} {frio:>9.0f} {shim:>13.0f} {directo:>10.0f} {frio / shim:>11.1f}x")
+        finally:
+            srv.terminate()
+            srv.wait(10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# enlace.py
+# Supresion de duplicados por SEQ y estadisticas de calidad del enlace LoRa
+# - El detector numera 1..99 y vuelve a 1 (envioNum en DetectorRemoto.ino);
+#   HELLO usa SEQ=00 y reinicia la ventana.
+# - Si se pierde un ACK el detector reintenta con el mismo SEQ (cola FIFO con
+#   reintentos hasta ~12 s despues), por lo que un reintento puede llegar
+#   tarde y fuera de orden: se usa una ventana de SEQ vistos, no solo "ultimo".
+
+import time
+from collections import deque
+
+SEQ_MOD = 99          # SEQ validos 1..99
+VENTANA = 40          # = QUEUE_MAX del detector; debe ser < SEQ_MOD / 2
+
+
+def distancia_seq(a: int, b: int, mod: int = SEQ_MOD) -> int:
+    """Avance de a -> b con vuelta (1..99 -> 1). 0 si son iguales."""
+    return ((b - 1) - (a - 1)) % mod
+
+
+class EstadoEnlace:
+    """Ventana deslizante de SEQ + contadores. No es thread-safe: usar desde un solo hilo (callback RX)."""
+
+    def __init__(self, ventana: int = VENTANA):
+        self.ventana = ventana
+        self._vistos = deque()
+        self._set = set()
+        self.ultimo_seq = None
+
+        self.recibidos = 0        # tramas validas (incluye duplicados)
+        self.duplicados = 0
+        self.perdidos = 0         # huecos de SEQ aun no recuperados
+        self.recuperados = 0      # llegaron tarde (reintento de una trama perdida)
+        self.crc_err = 0
+        self.invalidas = 0        # otros rechazos del decodificador
+        self.hello = 0
+
+        self.t_ultima = None
+        self.dt_ultimo = 0.0
+        self.dt_prom = 0.0        # EWMA del tiempo entre llegadas (s)
+        self.dt_max = 0.0
+
+    def _recordar(self, seq: int):
+        self._vistos.append(seq)
+        self._set.add(seq)
+        if len(self._vistos) > self.ventana:
+            self._set.discard(self._vistos.popleft())
+
+    def reiniciar(self):
+        self._vistos.clear()
+        self._set.clear()
+        self.ultimo_seq = None
+
+    def registrar_hello(self):
+        self.hello += 1
+        self.reiniciar()
+
+    def registrar_error(self, es_crc: bool):
+        if es_crc:
+            self.crc_err += 1
+        else:
+            self.invalidas += 1
+
+    def registrar(self, seq: int, t: float | None = None) -> bool:
+        """Registra una trama valida. Retorna True si es nueva, False si es duplicada."""
+        t = time.monotonic() if t is None else t
+        self.recibidos += 1
+        if self.t_ultima is not None:
+            dt = t - self.t_ultima
+            self.dt_ultimo = dt
+            self.dt_prom = dt if self.dt_prom == 0.0 else 0.9 * self.dt_prom + 0.1 * dt
+            if dt > self.dt_max:
+                self.dt_max = dt
+        self.t_ultima = t
+
+        if seq in self._set:
+            self.duplicados += 1
+            return False
+
+        if self.ultimo_seq is None:
+            self.ultimo_seq = seq
+        else:
+            d = distancia_seq(self.ultimo_seq, seq)
+            if d <= self.ventana:
+                self.perdidos += d - 1
+                self.ultimo_seq = seq
+            else:
+                # detras del ultimo: reintento tardio de un SEQ que contamos como perdido
+                self.recuperados += 1
+                if self.perdidos > 0:
+                    self.perdidos -= 1
+        self._recordar(seq)
+        return True
+
+    def resumen(self) -> dict:
+        return {
+            "recibidos": self.recibidos,
+            "duplicados": self.duplicados,
+            "perdidos": self.perdidos,
+            "recuperados": self.recuperados,
+            "crc_err": self.crc_err,
+            "invalidas": self.invalidas,
+            "hello": self.hello,
+            "ultimo_seq": self.ultimo_seq,
+            "dt_ultimo_s": round(self.dt_ultimo, 3),
+            "dt_prom_s": round(self.dt_prom, 3),
+            "dt_max_s": round(self.dt_max, 3),
+        }
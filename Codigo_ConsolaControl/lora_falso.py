@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# lora_falso.py
+# Backend SX127x falso y broker MQTT sustituto para probar el receptor sin Raspberry Pi
+# - LoRaFalso: misma API que usa RadioReceptorMixin (set_mode, read_payload, ...);
+#   inyectar() simula una interrupcion RxDone y, si se pidio TX, la TxDone del ACK
+# - BrokerFalso: cliente paho minimo que guarda las publicaciones en memoria
+# - tramas_sinteticas / leer_grabacion: fuentes de tramas para reproducir
+
+import random
+import threading
+import time
+
+from trama import crc16_ccitt, codificar_binaria
+from receptor import MODE, RadioReceptorMixin
+
+
+class LoRaFalso:
+    def __init__(self, airtime_ack_s: float = 0.0):
+        self.airtime_ack_s = airtime_ack_s  # demora simulada entre TX y TxDone
+        self.modo = MODE.SLEEP
+        self.dio_mapping = [0] * 6
+        self._rx = b""
+        self._tx = None
+        self.acks = []          # (t, ack) en orden de TX done
+        self._lock = threading.Lock()  # una interrupcion a la vez, como DIO0
+
+    # ---- API pySX127x usada por el receptor ----
+    def set_mode(self, modo):
+        self.modo = modo
+
+    def set_dio_mapping(self, mapping):
+        self.dio_mapping = list(mapping)
+
+    def clear_irq_flags(self, **flags):
+        pass
+
+    def read_payload(self, nocheck: bool = False):
+        return list(self._rx)
+
+    def write_payload(self, payload):
+        self._tx = bytes(payload)
+
+    # ---- simulacion ----
+    def inyectar(self, payload: bytes):
+        """Entrega una trama como si la radio la hubiera recibido (RxDone) y completa el TX del ACK."""
+        with self._lock:
+            self._rx = payload
+            self._tx = None
+            self.on_rx_done()
+            if self.modo == MODE.TX and self._tx is not None:
+                if self.airtime_ack_s > 0:
+                    time.sleep(self.airtime_ack_s)
+                ack = self._tx.decode("utf-8", errors="ignore")
+                self.on_tx_done()
+                self.acks.append((time.perf_counter(), ack))
+
+
+class ReceptorLoRaFalso(RadioReceptorMixin, LoRaFalso):
+    def __init__(self, receptor, airtime_ack_s: float = 0.0):
+        LoRaFalso.__init__(self, airtime_ack_s)
+        self.configurar_receptor(receptor)
+
+
+class _InfoFalsa:
+    def __init__(self, ok: bool):
+        self._ok = ok
+        self.rc = 0 if ok else 4
+
+    def wait_for_publish(self, timeout=None):
+        pass
+
+    def is_published(self) -> bool:
+        return self._ok
+
+
+class BrokerFalso:
+    """Sustituto de paho.mqtt.client.Client: guarda (t, topic, payload, qos). `caido` simula broker fuera."""
+
+    def __init__(self):
+        self.publicados = []
+        self.caido = False
+        self.on_connect = None
+        self.on_disconnect = None
+        self._lock = threading.Lock()
+
+    def reconnect_delay_set(self, min_delay=1, max_delay=120):
+        pass
+
+    def connect_async(self, host, port=1883, keepalive=60):
+        pass
+
+    def loop_start(self):
+        if self.on_connect is not None and not self.caido:
+            self.on_connect(self, None, {}, 0)
+
+    def loop_stop(self):
+        pass
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        if self.caido:
+            return _InfoFalsa(False)
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        with self._lock:
+            self.publicados.append((time.perf_counter(), topic, payload, qos))
+        return _InfoFalsa(True)
+
+    def por_topic(self, topic: str) -> list:
+        with self._lock:
+            return [p for _, t, p, _ in self.publicados if t == topic]
+
+
+# ---- fuentes de tramas ----
+def trama_texto(seq: int, lat: float, lon: float, cpm: int, alt: float = 520.0, sat: int = 8,
+                fecha: str = "2025-09-15", hora: str = "12:00:00", dispositivo: str | None = None) -> bytes:
+    id_txt = f",ID={dispositivo}" if dispositivo is not None else ""
+    core = f"todo:{lat:.6f},{lon:.6f},{cpm},{alt:.2f},{sat},DATE={fecha},TIME={hora}{id_txt},SEQ={seq % 100:02d}"
+    return f"{core};CRC={crc16_ccitt(core.encode('ascii')):04X}".encode("ascii")
+
+
+def tramas_sinteticas(n: int, p_crc: float = 0.02, p_dup: float = 0.05, p_binaria: float = 0.0,
+                      hello_cada: int = 0, semilla: int = 1, dispositivo: int | None = None):
+    """Genera n tramas: recorrido con CPM variable, errores de CRC, duplicados y HELLO opcionales.
+    Con `dispositivo` (ID numerico) las tramas llevan ID=<n> (texto) o son binarias v2."""
+    rnd = random.Random(semilla)
+    seq = 0
+    lat, lon = -33.4489 + (dispositivo or 0) * 1e-3, -70.6693
+    id_txt = str(dispositivo) if dispositivo is not None else None
+    hello = f"HELLO,ID={id_txt},SEQ=00".encode() if id_txt else b"HELLO,SEQ=00"
+    yield hello
+    for i in range(n):
+        if hello_cada and i and i % hello_cada == 0:
+            seq = 0
+            yield hello
+        seq = seq % 99 + 1
+        lat += rnd.uniform(-2e-5, 2e-5)
+        lon += rnd.uniform(-2e-5, 2e-5)
+        cpm = int(abs(rnd.gauss(120, 60))) + (rnd.randint(500, 8000) if rnd.random() < 0.03 else 0)
+        hora = f"12:{i // 60 % 60:02d}:{i % 60:02d}"
+        if rnd.random() < p_binaria:
+            t = codificar_binaria(seq, lat, lon, cpm, 520.0, 8, 1757937600 + i, dispositivo)
+        else:
+            t = trama_texto(seq, lat, lon, cpm, hora=hora, dispositivo=id_txt)
+        if rnd.random() < p_crc:
+            b = bytearray(t)
+            b[len(b) // 2] ^= 0x01
+            yield bytes(b)
+            continue
+        yield t
+        if rnd.random() < p_dup:
+            yield t  # reintento del detector con ACK perdido
+
+
+def tramas_flota(n_detectores: int, n_por_detector: int, semilla: int = 1, **kw) -> list:
+    """Intercala al azar las tramas de N detectores (IDs 1..N), conservando el orden de cada uno."""
+    rnd = random.Random(semilla)
+    fuentes = [iter(tramas_sinteticas(n_por_detector, semilla=semilla + d, dispositivo=d, **kw))
+               for d in range(1, n_detectores + 1)]
+    out = []
+    while fuentes:
+        i = rnd.randrange(len(fuentes))
+        try:
+            out.append(next(fuentes[i]))
+        except StopIteration:
+            fuentes.pop(i)
+    return out
+
+
+def leer_grabacion(ruta: str) -> list:
+    """Una trama por linea: texto tal cual, o "BIN <hex>" como las registra el receptor."""
+    out = []
+    with open(ruta, "r", encoding="utf-8", errors="ignore") as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            if linea.startswith("[LoRa] Mensaje recibido: "):
+                linea = linea[len("[LoRa] Mensaje recibido: "):]
+            if linea.startswith("BIN "):
+                out.append(bytes.fromhex(linea[4:]))
+            else:
+                out.append(linea.encode("utf-8"))
+    return out
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# metricas.py
+# Metricas del pipeline radio -> broker en formato de texto Prometheus
+# - Contador / Histograma sin locks: cada metrica tiene un solo hilo escritor
+#   (radio, trabajador o publicador); los lectores toman una foto sin bloquear
+# - Histograma con cubetas fijas precalculadas: observe() = bisect + 2 sumas
+# - Medidor: valor calculado al momento de exponer (profundidad de cola, etc.)
+# - ServidorMetricas: GET /metrics en un hilo daemon (http.server)
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PUERTO_METRICAS = 9108
+
+# segundos; cubren desde el giro RX->ACK (~0.1 ms) hasta el ACK_TIMEOUT_MS del detector
+CUBETAS_ACK_S = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.8)
+# publicacion MQTT (publish -> PUBACK) y espera en spool
+CUBETAS_MQTT_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _fmt_etiquetas(nombres: tuple, valores: tuple, extra: str = "") -> str:
+    partes = [f'{n}="{v}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+class Contador:
+    __slots__ = ("valor",)
+
+    def __init__(self):
+        self.valor = 0
+
+    def inc(self, n: int = 1):
+        self.valor += n
+
+
+class Histograma:
+    __slots__ = ("cubetas", "cuentas", "suma", "n")
+
+    def __init__(self, cubetas: tuple):
+        self.cubetas = cubetas
+        self.cuentas = [0] * (len(cubetas) + 1)   # ultima = +Inf
+        self.suma = 0.0
+        self.n = 0
+
+    def observe(self, v: float):
+        self.cuentas[bisect.bisect_left(self.cubetas, v)] += 1
+        self.suma += v
+        self.n += 1
+
+
+class Familia:
+    """Metrica con etiquetas. hijo(*valores) crea el hijo la primera vez (dict, sin lock)."""
+
+    def __init__(self, nombre: str, ayuda: str, tipo: str, etiquetas: tuple = (), fabrica=None):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.tipo = tipo
+        self.etiquetas = etiquetas
+        self._fabrica = fabrica
+        self._hijos = {}
+        if not etiquetas:
+            self._hijos[()] = fabrica()
+
+    def hijo(self, *valores):
+        h = self._hijos.get(valores)
+        if h is None:
+            h = self._hijos.setdefault(valores, self._fabrica())
+        return h
+
+    # atajos para familias sin etiquetas
+    def inc(self, n: int = 1):
+        self._hijos[()].valor += n
+
+    def observe(self, v: float):
+        self._hijos[()].observe(v)
+
+    def exponer(self) -> list:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        for valores, h in list(self._hijos.items()):
+            if self.tipo == "counter":
+                lineas.append(f"{self.nombre}{_fmt_etiquetas(self.etiquetas, valores)} {h.valor}")
+            else:
+                acum = 0
+                cuentas = list(h.cuentas)
+                for lim, c in zip(h.cubetas, cuentas):
+                    acum += c
+                    le = _fmt_etiquetas(self.etiquetas, valores, f'le="{lim}"')
+                    lineas.append(f"{self.nombre}_bucket{le} {acum}")
+                acum += cuentas[-1]
+                le = _fmt_etiquetas(self.etiquetas, valores, 'le="+Inf"')
+                lineas.append(f"{self.nombre}_bucket{le} {acum}")
+                et = _fmt_etiquetas(self.etiquetas, valores)
+                lineas.append(f"{self.nombre}_sum{et} {h.suma}")
+                lineas.append(f"{self.nombre}_count{et} {acum}")
+        return lineas
+
+    def instantanea(self):
+        if self.tipo == "counter":
+            if not self.etiquetas:
+                return self._hijos[()].valor
+            return {",".join(map(str, k)): h.valor for k, h in list(self._hijos.items())}
+
+        def resumen(h):
+            return {"n": h.n, "suma": round(h.suma, 6), "p50": percentil_cubetas(h, 50),
+                    "p99": percentil_cubetas(h, 99)}
+        if not self.etiquetas:
+            return resumen(self._hijos[()])
+        return {",".join(map(str, k)): resumen(h) for k, h in list(self._hijos.items())}
+
+
+class Medidor:
+    """Gauge calculado al exponer. fn() -> float, o dict {tupla_etiquetas: float} si tiene etiquetas."""
+
+    def __init__(self, nombre: str, ayuda: str, fn, etiquetas: tuple = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.tipo = "gauge"
+        self.etiquetas = etiquetas
+        self.fn = fn
+
+    def _valores(self) -> dict:
+        v = self.fn()
+        return v if self.etiquetas else {(): v}
+
+    def exponer(self) -> list:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} gauge"]
+        for valores, v in self._valores().items():
+            lineas.append(f"{self.nombre}{_fmt_etiquetas(self.etiquetas, valores)} {v}")
+        return lineas
+
+    def instantanea(self):
+        vals = self._valores()
+        if not self.etiquetas:
+            return vals[()]
+        return {",".join(map(str, k)): v for k, v in vals.items()}
+
+
+def percentil_cubetas(h: Histograma, p: float) -> float:
+    """Limite superior de la cubeta que contiene el percentil p (inf si cae sobre la ultima)."""
+    total = sum(h.cuentas)
+    if total == 0:
+        return 0.0
+    objetivo = total * p / 100.0
+    acum = 0
+    for lim, c in zip(h.cubetas, h.cuentas):
+        acum += c
+        if acum >= objetivo:
+            return lim
+    return float("inf")
+
+
+class Registro:
+    def __init__(self):
+        self._metricas = {}
+
+    def _agregar(self, m):
+        if m.nombre in self._metricas:
+            return self._metricas[m.nombre]
+        self._metricas[m.nombre] = m
+        return m
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: tuple = ()) -> Familia:
+        return self._agregar(Familia(nombre, ayuda, "counter", etiquetas, Contador))
+
+    def histograma(self, nombre: str, ayuda: str, cubetas: tuple, etiquetas: tuple = ()) -> Familia:
+        return self._agregar(Familia(nombre, ayuda, "histogram", etiquetas, lambda: Histograma(cubetas)))
+
+    def medidor(self, nombre: str, ayuda: str, fn, etiquetas: tuple = ()) -> Medidor:
+        return self._agregar(Medidor(nombre, ayuda, fn, etiquetas))
+
+    def exponer(self) -> str:
+        lineas = []
+        for m in list(self._metricas.values()):
+            try:
+                lineas.extend(m.exponer())
+            except Exception as e:
+                lineas.append(f"# ERROR {m.nombre}: {e}")
+        return "\n".join(lineas) + "\n"
+
+    def instantanea(self) -> dict:
+        out = {}
+        for nombre, m in list(self._metricas.items()):
+            try:
+                out[nombre] = m.instantanea()
+            except Exception:
+                pass
+        return out
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    registro = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        cuerpo = self.registro.exponer().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class ServidorMetricas:
+    def __init__(self, registro: Registro, puerto: int = PUERTO_METRICAS, host: str = "0.0.0.0"):
+        manejador = type("ManejadorMetricas", (_Manejador,), {"registro": registro})
+        self._srv = ThreadingHTTPServer((host, puerto), manejador)
+        self._srv.daemon_threads = True
+        self.puerto = self._srv.server_address[1]
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._srv.serve_forever, name="metricas-http", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._srv.shutdown()
+        self._srv.server_close()
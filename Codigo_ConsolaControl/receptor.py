@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# receptor.py
+# Logica del receptor LoRa -> MQTT, sin dependencias de hardware
+# - Receptor: decodifica, deduplica, arma el ACK y alimenta el pipeline
+#   (cola acotada -> trabajadores -> spool MQTT / almacen / log / estadisticas)
+# - Flota: estado de SEQ/duplicados por detector y topics dispositivos/<id>/...
+#   Cada detector se asigna a un trabajador fijo (una cola por trabajador), asi
+#   se conserva el orden por detector sin lock global en el camino caliente.
+# - RadioReceptorMixin: on_rx_done / on_tx_done para cualquier backend con la
+#   API de pySX127x (LoRa real en DetectorRemoto.py, LoRaFalso en lora_falso.py)
+# - Metricas (metricas.py): contadores e histogramas de un solo escritor, sin locks
+# - Por cada trama valida se publican dos mensajes: el texto crudo (dispositivos/<id>/datos,
+#   compatibilidad) y un registro JSON ya interpretado (dispositivos/<id>/json) con
+#   dosis, nivel y marca de tiempo, para que Node-RED no vuelva a partir el texto
+
+import calendar
+import json
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+
+from trama import decodificar_payload, es_binaria, TramaInvalida, ERR_CRC, DISPOSITIVO_LEGADO
+from enlace import EstadoEnlace
+from metricas import Registro, CUBETAS_ACK_S
+from almacen import nivel_cpm, CPM_POR_USV_H
+
+try:
+    from SX127x.constants import MODE
+except ImportError:
+    # sin pySX127x (banco de pruebas): mismos valores que SX127x.constants.MODE
+    class MODE:
+        SLEEP = 0x80
+        STDBY = 0x81
+        FSTX = 0x82
+        TX = 0x83
+        FSRX = 0x84
+        RXCONT = 0x85
+        RXSINGLE = 0x86
+        CAD = 0x87
+
+TOPIC_DATOS = "dispositivos/{}/datos"     # {} = ID del detector ("ESP" si la trama no trae ID)
+TOPIC_JSON = "dispositivos/{}/json"       # registro_json(); mismo {} que TOPIC_DATOS
+TOPIC_ESTAD = "dispositivos/{}/stats"
+TOPIC_ESTAD_RECEPTOR = "consola/receptor/stats"
+TOPIC_METRICAS = "consola/receptor/metricas"
+ESTAD_PERIODO_S = 10.0
+
+# El detector solo espera ACK_TIMEOUT_MS = 800 ms, asi que el callback de radio
+# no debe bloquearse en stdout ni en el broker.
+COLA_MAX = 256          # eventos pendientes por trabajador antes de aplicar la politica de desborde
+NUM_TRABAJADORES = 1    # cada detector va siempre al mismo trabajador (orden por detector)
+MUESTRAS_LAT = 4096     # latencias RX->ACK guardadas para percentiles
+
+
+def build_ack(seq: int | None, ok: bool, dispositivo: str | None = None) -> str:
+    # ",ID=" al final: el firmware antiguo solo mira "ACK:NN" y ",OK"
+    s = f"{seq % 100:02d}" if seq is not None else "NA"
+    ack = f"ACK:{s},{'OK' if ok else 'ERR'}"
+    if dispositivo is not None and dispositivo != DISPOSITIVO_LEGADO:
+        ack += f",ID={dispositivo}"
+    return ack
+
+
+def epoch_ms_gps(fecha: str, hora: str) -> int | None:
+    """DATE=YYYY-MM-DD / TIME=HH:MM:SS del GPS (UTC) -> epoch en ms; None si faltan o no parsean."""
+    if not fecha or not hora:
+        return None
+    try:
+        a, m, d = fecha.split("-")
+        hh, mi, ss = hora.split(":")
+        return calendar.timegm((int(a), int(m), int(d), int(hh), int(mi), int(ss))) * 1000
+    except ValueError:
+        return None
+
+
+def registro_json(trama, t_rx: float) -> str:
+    """Registro tipado de una trama de datos. t_rx: reloj de pared (time.time()) del receptor.
+    ts_ms usa la hora GPS si viene en la trama; si no, la de recepcion."""
+    t_rx_ms = int(t_rx * 1000)
+    ts_gps = epoch_ms_gps(trama.fecha, trama.hora)
+    return json.dumps({
+        "id": trama.dispositivo,
+        "seq": trama.seq,
+        "lat": trama.lat,
+        "lon": trama.lon,
+        "cpm": trama.cpm,
+        "alt": trama.alt,
+        "sat": trama.sat,
+        "fecha": trama.fecha,
+        "hora": trama.hora,
+        "ts_ms": ts_gps if ts_gps is not None else t_rx_ms,
+        "t_rx_ms": t_rx_ms,
+        "intensidad": nivel_cpm(trama.cpm),
+        "dosis_usv_h": round(trama.cpm / CPM_POR_USV_H, 2),
+    }, separators=(",", ":"))
+
+
+def percentil(valores, p: float) -> float:
+    if not valores:
+        return 0.0
+    v = sorted(valores)
+    k = min(len(v) - 1, max(0, int(round(p / 100.0 * (len(v) - 1)))))
+    return v[k]
+
+
+class Receptor:
+    """Pipeline del receptor. `spool` debe tener agregar(topic, payload); `client` publish() (estadisticas);
+    `almacen` (opcional) agregar(trama), ver almacen.py; `registro` (opcional) metricas.Registro compartido."""
+
+    def __init__(self, spool, client=None, topic_datos: str = TOPIC_DATOS, topic_estad: str = TOPIC_ESTAD,
+                 topic_json: str = TOPIC_JSON, cola_max: int = COLA_MAX, num_trabajadores: int = NUM_TRABAJADORES,
+                 estad_periodo_s: float = ESTAD_PERIODO_S, log=print, almacen=None, registro=None):
+        self.spool = spool
+        self.client = client
+        self.almacen = almacen
+        self.registro = registro if registro is not None else Registro()
+        self.topic_datos = topic_datos
+        self.topic_estad = topic_estad
+        self.topic_json = topic_json
+        self.num_trabajadores = max(1, num_trabajadores)
+        self.estad_periodo_s = estad_periodo_s
+        self.log = log
+
+        self.colas = [queue.Queue(maxsize=cola_max) for _ in range(self.num_trabajadores)]
+        self.contador_paquetes = 0
+        self.errores_sin_dispositivo = 0   # tramas malas de un ID aun no visto (o ilegible)
+
+        # estado por detector; solo el hilo de radio agrega entradas
+        self.enlaces = {}                  # id -> EstadoEnlace
+        self._shard = {}                   # id -> indice de trabajador
+        self._topics = {}                  # id -> (topic_datos, topic_estad, topic_json)
+
+        # latencia RX -> ACK TX done (ms)
+        self.lat_ack = {"n": 0, "suma": 0.0, "max": 0.0, "ultima": 0.0}
+        self.lat_muestras = deque(maxlen=MUESTRAS_LAT)
+
+        self._hilos = []
+        self._parar = threading.Event()
+        self._crear_metricas()
+        self._tramas_previas = (0, time.monotonic())
+
+    def _crear_metricas(self):
+        r = self.registro
+        self._m_tramas = r.contador("receptor_tramas_total", "Tramas LoRa recibidas (cualquier tipo)")
+        crc = r.contador("receptor_crc_total", "Verificacion CRC de tramas de datos", ("resultado",))
+        self._m_crc_ok = crc.hijo("ok")
+        self._m_crc_err = crc.hijo("err")
+        self._m_invalidas = r.contador("receptor_tramas_invalidas_total", "Tramas rechazadas por formato",
+                                       ("motivo",))
+        self._m_hello = r.contador("receptor_hello_total", "Handshakes HELLO respondidos")
+        self._m_dup = r.contador("receptor_duplicados_total", "Reintentos duplicados (ACK sin publicar)")
+        self._m_descartados = r.contador("receptor_eventos_descartados_total", "Eventos descartados por cola llena")
+        self._m_ack = r.histograma("receptor_ack_segundos", "Giro RX -> ACK TX done", CUBETAS_ACK_S)
+        r.medidor("receptor_cola_eventos", "Eventos pendientes en las colas de trabajadores",
+                  lambda: sum(c.qsize() for c in self.colas))
+        r.medidor("receptor_dispositivos", "Detectores vistos", lambda: len(self.enlaces))
+        r.medidor("receptor_segundos_desde_ultima_trama", "Tiempo desde la ultima trama valida por detector",
+                  self._edades, ("dispositivo",))
+
+    def _edades(self) -> dict:
+        ahora = time.perf_counter()
+        return {(d,): round(ahora - e.t_ultima, 3) for d, e in list(self.enlaces.items()) if e.t_ultima is not None}
+
+    @property
+    def eventos_descartados(self) -> int:
+        return self._m_descartados.instantanea()
+
+    # ---- ciclo de vida ----
+    def iniciar(self):
+        for i in range(self.num_trabajadores):
+            h = threading.Thread(target=self._trabajador, args=(i,), name=f"trabajador-{i}", daemon=True)
+            h.start()
+            self._hilos.append(h)
+
+    def esperar_colas(self):
+        for c in self.colas:
+            c.join()
+
+    def detener(self, timeout: float = 5.0):
+        self.esperar_colas()
+        self._parar.set()
+        for h in self._hilos:
+            h.join(timeout)
+        self._hilos.clear()
+        if self.eventos_descartados:
+            self.log(f"[WARN] Eventos descartados por cola llena: {self.eventos_descartados}")
+
+    # ---- estado por detector ----
+    def _nuevo_dispositivo(self, disp: str) -> EstadoEnlace:
+        self._shard[disp] = zlib.crc32(disp.encode()) % self.num_trabajadores
+        self._topics[disp] = (self.topic_datos.format(disp), self.topic_estad.format(disp),
+                              self.topic_json.format(disp))
+        enlace = EstadoEnlace()
+        self.enlaces[disp] = enlace
+        return enlace
+
+    def enlace(self, disp: str = DISPOSITIVO_LEGADO) -> EstadoEnlace:
+        e = self.enlaces.get(disp)
+        return e if e is not None else self._nuevo_dispositivo(disp)
+
+    def topic_datos_de(self, disp: str) -> str:
+        return self._topics[disp][0]
+
+    # ---- camino caliente (callback de radio) ----
+    def encolar_evento(self, evento: tuple):
+        """Encola sin bloquear en la cola del detector (evento[1]); si esta llena descarta el mas antiguo."""
+        cola = self.colas[self._shard.get(evento[1], 0)]
+        while True:
+            try:
+                cola.put_nowait(evento)
+                return
+            except queue.Full:
+                try:
+                    cola.get_nowait()
+                    cola.task_done()
+                    self._m_descartados.inc()
+                except queue.Empty:
+                    pass
+
+    def manejar_rx(self, payload: bytes, t_rx: float, t_pared: float | None = None) -> tuple:
+        """Decodifica, deduplica y arma el ACK. Retorna (ack, evento); el evento se encola tras el ACK.
+        t_rx: perf_counter de la recepcion; t_pared: time.time() de la recepcion (por defecto, ahora),
+        viaja en el evento para que la marca del registro no incluya la espera en la cola."""
+        if t_pared is None:
+            t_pared = time.time()
+        self.contador_paquetes += 1
+        self._m_tramas.inc()
+        try:
+            trama, mensaje = decodificar_payload(payload)
+        except TramaInvalida as e:
+            if e.motivo == ERR_CRC:
+                self._m_crc_err.inc()
+            else:
+                self._m_invalidas.hijo(e.motivo).inc()
+            mensaje = payload.hex() if es_binaria(payload) else payload.decode('utf-8', errors='ignore').strip()
+            # el ID de una trama mala no es confiable: solo se atribuye si ya se conoce
+            disp = e.dispositivo if e.dispositivo in self.enlaces else None
+            if disp is not None:
+                self.enlaces[disp].registrar_error(e.motivo == ERR_CRC)
+            else:
+                self.errores_sin_dispositivo += 1
+            ack = build_ack(e.seq, False, e.dispositivo)
+            return ack, ("RX", disp, self.contador_paquetes, mensaje, None, e.motivo, ack, t_pared)
+
+        # Handshake HELLO sin CRC
+        disp = trama.dispositivo
+        enlace = self.enlace(disp)
+        ack = build_ack(trama.seq, True, disp)
+        if trama.es_hello:
+            self._m_hello.inc()
+            enlace.registrar_hello()
+            return ack, ("HELLO", disp, mensaje, ack)
+        self._m_crc_ok.inc()
+        if not enlace.registrar(trama.seq, t_rx):
+            self._m_dup.inc()
+            return ack, ("DUP", disp, mensaje, trama.seq, ack)
+        return ack, ("RX", disp, enlace.recibidos, mensaje, trama, None, ack, t_pared)
+
+    def registrar_ack_tx(self, t_rx: float, disp: str | None = None):
+        s = time.perf_counter() - t_rx
+        ms = s * 1000.0
+        self._m_ack.observe(s)
+        self.lat_ack["n"] += 1
+        self.lat_ack["suma"] += ms
+        self.lat_ack["ultima"] = ms
+        if ms > self.lat_ack["max"]:
+            self.lat_ack["max"] = ms
+        self.lat_muestras.append(ms)
+        self.encolar_evento(("ACK", disp, ms))
+
+    # ---- trabajadores ----
+    def procesar_evento(self, evento: tuple):
+        log = self.log
+        tipo = evento[0]
+
+        if tipo == "HELLO":
+            _, disp, mensaje, ack = evento
+            log(f"[LoRa] Mensaje recibido: {mensaje}")
+            log(f"[DEBUG] Handshake HELLO de {disp} -> Enviando ACK -> {ack}")
+            return
+
+        if tipo == "DUP":
+            _, disp, mensaje, seq, ack = evento
+            log(f"[LoRa] Mensaje recibido: {mensaje}")
+            log(f"[DEBUG] Duplicado {disp} SEQ={seq:02d} (reintento) -> ACK {ack}, no se publica")
+            return
+
+        if tipo == "ACK":
+            _, disp, ms = evento
+            lat = self.lat_ack
+            log(f"[DEBUG] ACK TX done (RX->ACK {ms:.1f} ms, "
+                f"prom {lat['suma'] / max(lat['n'], 1):.1f} ms, max {lat['max']:.1f} ms)")
+            return
+
+        # tipo == "RX"
+        _, disp, num, mensaje, trama, motivo, ack, t_rx = evento
+        log(f"[LoRa] Mensaje recibido: {mensaje}")
+        log(f"[DEBUG] Trama -> {'OK' if trama is not None else 'ERR ' + str(motivo)}")
+        log(f"[DEBUG] Enviando ACK -> {ack}")
+
+        if trama is None:
+            if motivo == ERR_CRC:
+                log("[WARN] CRC invalido, no se publica a MQTT")
+            else:
+                log(f"[WARN] Mensaje no reconocido ({motivo}), ignorado")
+            return
+
+        # MQTT: al spool, el hilo publicador lo envia cuando haya broker
+        topic, _, topic_json = self._topics[disp]
+        contenido = trama.contenido
+        try:
+            self.spool.agregar(topic, contenido)
+            self.spool.agregar(topic_json, registro_json(trama, t_rx))
+            log(f"[MQTT] En spool para {topic} : {contenido}")
+        except Exception as e:
+            log(f"[WARN] Spool fallo guardando: {e}")
+        if self.almacen is not None:
+            self.almacen.agregar(trama, t_rx)
+
+        num = str(num).zfill(3)
+
+        log(f"\n========== DATOS RECIBIDOS {disp} ({num}) ==========")
+        log(f" Latitud     : {trama.lat}")
+        log(f" Longitud    : {trama.lon}")
+        log(f" CPM         : {trama.cpm}")
+        log(f" Altitud     : {trama.alt} m")
+        log(f" Satelites   : {trama.sat}")
+        if trama.fecha: log(f" Fecha       : {trama.fecha}")
+        if trama.hora:  log(f" Hora        : {trama.hora}")
+        log(f" SEQ         : {trama.seq:02d}")
+        log("=============================================\n")
+
+    def estadisticas(self) -> dict:
+        estad = {
+            "dispositivos": len(self.enlaces),
+            "errores_sin_dispositivo": self.errores_sin_dispositivo,
+            "eventos_descartados": self.eventos_descartados,
+            "cola": sum(c.qsize() for c in self.colas),
+        }
+        if hasattr(self.spool, "pendientes"):
+            estad["spool_pendientes"] = self.spool.pendientes()
+        muestras = list(self.lat_muestras)
+        estad["ack_p50_ms"] = round(percentil(muestras, 50), 3)
+        estad["ack_p99_ms"] = round(percentil(muestras, 99), 3)
+        return estad
+
+    def metricas(self) -> dict:
+        """Foto del registro + tramas/s desde la foto anterior (para el topic MQTT de metricas)."""
+        n, t = self._m_tramas.instantanea(), time.monotonic()
+        n0, t0 = self._tramas_previas
+        self._tramas_previas = (n, t)
+        foto = self.registro.instantanea()
+        foto["receptor_tramas_por_s"] = round((n - n0) / (t - t0), 3) if t > t0 else 0.0
+        return foto
+
+    def publicar_estadisticas(self, indice: int = 0):
+        """Cada trabajador publica los detectores que atiende; el 0 ademas el resumen del receptor."""
+        if self.client is None:
+            return
+        try:
+            for disp, enlace in list(self.enlaces.items()):
+                if self._shard.get(disp) == indice:
+                    self.client.publish(self._topics[disp][1], json.dumps(enlace.resumen()), qos=0)
+            if indice == 0:
+                self.client.publish(TOPIC_ESTAD_RECEPTOR, json.dumps(self.estadisticas()), qos=0)
+                self.client.publish(TOPIC_METRICAS, json.dumps(self.metricas()), qos=0)
+        except Exception as e:
+            self.log(f"[WARN] MQTT fallo publicando estadisticas: {e}")
+
+    def _trabajador(self, indice: int):
+        cola = self.colas[indice]
+        t_estad = time.monotonic()
+        while not self._parar.is_set():
+            try:
+                evento = cola.get(timeout=min(self.estad_periodo_s, 1.0))
+            except queue.Empty:
+                evento = None
+            if evento is not None:
+                try:
+                    self.procesar_evento(evento)
+                except Exception as e:
+                    self.log(f"[WARN] Trabajador fallo procesando evento: {e}")
+                finally:
+                    cola.task_done()
+            if time.monotonic() - t_estad >= self.estad_periodo_s:
+                t_estad = time.monotonic()
+                self.publicar_estadisticas(indice)
+
+
+class RadioReceptorMixin:
+    """Callbacks DIO0 comunes. La clase final debe heredar tambien de un backend LoRa y fijar self.receptor."""
+
+    receptor = None
+    _t_rx = None
+    _disp_rx = None
+
+    def configurar_receptor(self, receptor: Receptor):
+        self.receptor = receptor
+        self._t_rx = None
+        self.set_mode(MODE.SLEEP)
+        self.set_dio_mapping([0,0,0,0,0,0])  # DIO0=RxDone
+
+    def on_rx_done(self):
+        # Solo lectura, verificacion y ACK; el resto va a la cola
+        t_rx = time.perf_counter()
+        t_pared = time.time()
+        self.set_mode(MODE.STDBY)
+        self.clear_irq_flags(RxDone=1, ValidHeader=1, PayloadCrcError=1)
+
+        payload = bytes(self.read_payload(nocheck=True))
+        ack, evento = self.receptor.manejar_rx(payload, t_rx, t_pared)
+        self._t_rx = t_rx
+        self._disp_rx = evento[1]
+        self._tx_ack_and_listen(ack)
+        self.receptor.encolar_evento(evento)
+
+    def _tx_ack_and_listen(self, ack_str: str):
+        self.set_dio_mapping([1,0,0,0,0,0])  # DIO0=TxDone
+        self.clear_irq_flags(TxDone=1)
+        self.write_payload(list(bytearray(ack_str, 'utf-8')))
+        self.set_mode(MODE.TX)
+
+    def on_tx_done(self):
+        self.clear_irq_flags(TxDone=1)
+        self.set_dio_mapping([0,0,0,0,0,0])  # DIO0=RxDone
+        self.set_mode(MODE.RXCONT)
+
+        if self._t_rx is not None:
+            t_rx, self._t_rx = self._t_rx, None
+            self.receptor.registrar_ack_tx(t_rx, self._disp_rx)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# spool_mqtt.py
+# Spool local "store-and-forward" para MQTT (SQLite en modo WAL)
+# - agregar(): guarda la publicacion en disco y retorna (no toca la red)
+# - hilo publicador: drena el spool en lotes, en orden, con QoS 1
+# - si el broker cae, espera con backoff exponencial y retoma desde el
+#   primer mensaje pendiente (nada se borra hasta confirmarse el PUBACK)
+# - con `registro` (metricas.py): latencia publish -> PUBACK y espera total en spool
+
+import os
+import sqlite3
+import threading
+import time
+
+from metricas import Registro, CUBETAS_MQTT_S
+
+LOTE = 50               # mensajes por lote
+QOS = 1
+TIMEOUT_PUB_S = 5.0     # espera de PUBACK por mensaje
+BACKOFF_MIN_S = 1.0
+BACKOFF_MAX_S = 30.0
+
+
+class SpoolMQTT:
+    def __init__(self, client, ruta: str, lote: int = LOTE, qos: int = QOS, registro=None):
+        self.client = client
+        self.ruta = ruta
+        self.lote = lote
+        self.qos = qos
+
+        d = os.path.dirname(ruta)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._db = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " topic TEXT NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " t_ingreso REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._hay_datos = threading.Event()
+        self._conectado = threading.Event()
+        self._parar = threading.Event()
+        self._hilo = None
+
+        self.publicados = 0
+        self.fallos = 0
+        self.suscripciones = []     # topics a (re)suscribir en cada conexion
+
+        r = registro if registro is not None else Registro()
+        self.registro = r
+        self._m_puback = r.histograma("mqtt_publicacion_segundos", "Publish QoS1 -> PUBACK", CUBETAS_MQTT_S)
+        self._m_espera = r.histograma("mqtt_spool_espera_segundos", "Ingreso al spool -> PUBACK", CUBETAS_MQTT_S)
+        self._m_publicados = r.contador("mqtt_publicados_total", "Mensajes confirmados por el broker")
+        self._m_fallos = r.contador("mqtt_lotes_fallidos_total", "Lotes interrumpidos (broker caido o sin PUBACK)")
+        r.medidor("mqtt_spool_pendientes", "Mensajes en el spool sin confirmar", self.pendientes)
+        r.medidor("mqtt_conectado", "1 si hay sesion con el broker", lambda: int(self._conectado.is_set()))
+
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+
+    # ---- callbacks paho (API v1) ----
+    def _on_connect(self, client, userdata, flags, rc, *args):
+        if rc == 0:
+            print(f"[MQTT] Conectado al broker, pendientes en spool: {self.pendientes()}")
+            for topic in self.suscripciones:
+                client.subscribe(topic)
+            self._conectado.set()
+            self._hay_datos.set()
+        else:
+            print(f"[WARN] MQTT conexion rechazada rc={rc}")
+
+    def _on_disconnect(self, client, userdata, rc, *args):
+        self._conectado.clear()
+        if rc != 0:
+            print(f"[WARN] MQTT desconectado rc={rc}, se reintenta en segundo plano")
+
+    # ---- API ----
+    def iniciar(self, broker: str, puerto: int = 1883, keepalive: int = 60):
+        self.client.reconnect_delay_set(min_delay=int(BACKOFF_MIN_S), max_delay=int(BACKOFF_MAX_S))
+        self.client.connect_async(broker, puerto, keepalive)
+        self.client.loop_start()
+        self._hilo = threading.Thread(target=self._drenar, name="spool-mqtt", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0):
+        self._parar.set()
+        self._hay_datos.set()
+        self._conectado.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        self.client.loop_stop()
+        with self._lock:
+            self._db.close()
+
+    def agregar(self, topic: str, payload):
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        with self._lock:
+            self._db.execute("INSERT INTO spool (topic, payload, t_ingreso) VALUES (?, ?, ?)",
+                             (topic, payload, time.time()))
+        self._hay_datos.set()
+
+    def pendientes(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    # ---- publicador ----
+    def _leer_lote(self) -> list:
+        with self._lock:
+            return self._db.execute("SELECT id, topic, payload, t_ingreso FROM spool ORDER BY id LIMIT ?",
+                                    (self.lote,)).fetchall()
+
+    def _confirmar(self, hasta_id: int):
+        with self._lock:
+            self._db.execute("DELETE FROM spool WHERE id <= ?", (hasta_id,))
+
+    def _publicar_lote(self, lote: list) -> int | None:
+        """Publica en orden; retorna el ultimo id confirmado (None si ninguno)."""
+        ultimo = None
+        for id_, topic, payload, t_ingreso in lote:
+            t0 = time.perf_counter()
+            info = self.client.publish(topic, payload, qos=self.qos)
+            try:
+                info.wait_for_publish(TIMEOUT_PUB_S)
+            except (RuntimeError, ValueError):
+                pass
+            if not info.is_published():
+                break
+            self._m_puback.observe(time.perf_counter() - t0)
+            self._m_espera.observe(max(0.0, time.time() - t_ingreso))
+            ultimo = id_
+        return ultimo
+
+    def _drenar(self):
+        backoff = BACKOFF_MIN_S
+        while not self._parar.is_set():
+            if not self._conectado.wait(1.0):
+                continue
+            if self._parar.is_set():
+                break
+
+            lote = self._leer_lote()
+            if not lote:
+                self._hay_datos.wait(1.0)
+                self._hay_datos.clear()
+                continue
+
+            ultimo = self._publicar_lote(lote)
+            if ultimo is not None:
+                self._confirmar(ultimo)
+                n = sum(1 for r in lote if r[0] <= ultimo)
+                self.publicados += n
+                self._m_publicados.inc(n)
+                backoff = BACKOFF_MIN_S
+            if ultimo != lote[-1][0]:
+                self.fallos += 1
+                self._m_fallos.inc()
+                print(f"[WARN] MQTT lote incompleto, reintento en {backoff:.0f} s")
+                self._parar.wait(backoff)
+                backoff = min(backoff * 2, BACKOFF_MAX_S)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# trama.py
+# Decodificador de una pasada para las tramas del Detector Remoto
+# - Datos    : todo:lat,lon,cpm,alt,sat,DATE=YYYY-MM-DD,TIME=HH:MM:SS[,ID=xx],SEQ=NN;CRC=XXXX
+# - Handshake: HELLO[,ID=xx],SEQ=NN (sin CRC)
+# - ID identifica al detector (flota); sin ID se asume el detector unico "ESP"
+# - Binaria v1 (21 bytes, little-endian), se detecta por el byte magico:
+#     0  u8   0xB1  (nibble alto 0xB = magico, nibble bajo = version)
+#     1  u8   SEQ
+#     2  i32  lat * 1e6
+#     6  i32  lon * 1e6
+#     10 u16  CPM (saturado a 65535)
+#     12 i16  altitud (m)
+#     14 u8   satelites
+#     15 u32  epoch UTC (s), 0 si el GPS no tiene fecha/hora
+#     19 u16  CRC16 sobre bytes 0..18
+# - Binaria v2 (23 bytes): igual a v1 con u16 ID de detector tras SEQ (0xB2)
+# CRC16-CCITT (poly 0x1021, init 0xFFFF) por tabla de 256 entradas,
+# igual al calculado en DetectorRemoto.ino.
+
+import struct
+import time
+
+PREFIJO_DATOS = "todo:"
+PREFIJO_HELLO = "HELLO"
+SEP_CRC = ";CRC="
+DISPOSITIVO_LEGADO = "ESP"
+
+MAGICO_BIN = 0xB0
+VERSION_BIN = 1
+VERSION_BIN_ID = 2
+FMT_BIN_V1 = struct.Struct("<BBiiHhBIH")
+FMT_BIN_V2 = struct.Struct("<BBHiiHhBIH")
+LARGO_BIN_V1 = FMT_BIN_V1.size  # 21
+LARGO_BIN_V2 = FMT_BIN_V2.size  # 23
+ESCALA_GRADOS = 1_000_000
+
+# Codigos de rechazo
+ERR_VACIO = "VACIO"          # mensaje vacio
+ERR_PREFIJO = "PREFIJO"      # no empieza con "todo:" ni "HELLO"
+ERR_SIN_CRC = "SIN_CRC"      # falta ";CRC=XXXX"
+ERR_CRC_FORMATO = "CRC_FMT"  # CRC no es hexadecimal de 4 digitos
+ERR_CRC = "CRC"              # CRC no coincide
+ERR_CAMPOS = "CAMPOS"        # faltan campos posicionales
+ERR_NUMERO = "NUMERO"        # campo numerico invalido
+ERR_SEQ = "SEQ"              # falta SEQ o no es numerico
+ERR_VERSION = "VERSION"      # trama binaria de version desconocida
+ERR_LARGO = "LARGO"          # trama binaria de largo incorrecto
+ERR_ID = "ID"                # ID de detector invalido
+
+
+def _construir_tabla_crc16(poly: int = 0x1021) -> tuple:
+    tabla = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ poly) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+        tabla.append(crc)
+    return tuple(tabla)
+
+CRC16_TABLA = _construir_tabla_crc16()
+
+
+def crc16_ccitt(data: bytes, init_val: int = 0xFFFF) -> int:
+    crc = init_val
+    tabla = CRC16_TABLA
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ tabla[(crc >> 8) ^ b]
+    return crc
+
+
+class TramaInvalida(ValueError):
+    """Trama rechazada. `motivo` es uno de los ERR_*; `seq` se conserva si se pudo leer (para el ACK)."""
+
+    def __init__(self, motivo: str, seq: int | None = None, detalle: str = "", dispositivo: str | None = None):
+        super().__init__(f"{motivo}: {detalle}" if detalle else motivo)
+        self.motivo = motivo
+        self.seq = seq
+        self.dispositivo = dispositivo  # sin verificar (puede venir de una trama corrupta)
+
+
+class Trama:
+    __slots__ = ("tipo", "seq", "lat", "lon", "cpm", "alt", "sat", "fecha", "hora", "crc", "contenido",
+                 "dispositivo")
+
+    def __init__(self, tipo: str, seq: int, lat: float = 0.0, lon: float = 0.0, cpm: int = 0,
+                 alt: float = 0.0, sat: int = 0, fecha: str = "", hora: str = "",
+                 crc: int | None = None, contenido: str = "", dispositivo: str = DISPOSITIVO_LEGADO):
+        self.tipo = tipo            # "DATA" o "HELLO"
+        self.dispositivo = dispositivo
+        self.seq = seq
+        self.lat = lat
+        self.lon = lon
+        self.cpm = cpm
+        self.alt = alt
+        self.sat = sat
+        self.fecha = fecha
+        self.hora = hora
+        self.crc = crc
+        self.contenido = contenido  # texto sin "todo:" ni CRC (lo que se publica a MQTT)
+
+    @property
+    def es_hello(self) -> bool:
+        return self.tipo == "HELLO"
+
+    def __repr__(self):
+        return (f"Trama({self.tipo}, dispositivo={self.dispositivo}, seq={self.seq}, lat={self.lat}, lon={self.lon}, cpm={self.cpm}, "
+                f"alt={self.alt}, sat={self.sat}, fecha={self.fecha!r}, hora={self.hora!r})")
+
+
+def _seq_de(texto: str) -> int | None:
+    # busqueda barata de SEQ para poder responder ACK aun con trama mala
+    i = texto.rfind("SEQ=")
+    if i < 0:
+        return None
+    j = i + 4
+    k = j
+    while k < len(texto) and texto[k].isdigit():
+        k += 1
+    return int(texto[j:k]) if k > j else None
+
+
+def _id_de(texto: str) -> str | None:
+    i = texto.find(",ID=")
+    if i < 0:
+        return None
+    j = i + 4
+    k = j
+    while k < len(texto) and texto[k] not in ",;":
+        k += 1
+    return texto[j:k] or None
+
+
+def id_valido(dispositivo: str) -> bool:
+    # se usa como nivel de topic MQTT: sin comodines ni separadores
+    return 0 < len(dispositivo) <= 16 and all(c.isalnum() or c in "-_" for c in dispositivo)
+
+
+def decodificar_trama(mensaje: str) -> Trama:
+    """Decodifica una trama en una sola pasada. Lanza TramaInvalida con el motivo si se rechaza."""
+    if not mensaje:
+        raise TramaInvalida(ERR_VACIO)
+
+    if mensaje.startswith(PREFIJO_HELLO):
+        seq = _seq_de(mensaje)
+        disp = _id_de(mensaje) or DISPOSITIVO_LEGADO
+        if seq is None:
+            raise TramaInvalida(ERR_SEQ, None, mensaje, disp)
+        if not id_valido(disp):
+            raise TramaInvalida(ERR_ID, seq, disp)
+        return Trama("HELLO", seq, dispositivo=disp)
+
+    if not mensaje.startswith(PREFIJO_DATOS):
+        raise TramaInvalida(ERR_PREFIJO, _seq_de(mensaje), mensaje[:16])
+
+    i_crc = mensaje.rfind(SEP_CRC)
+    if i_crc < 0:
+        raise TramaInvalida(ERR_SIN_CRC, _seq_de(mensaje))
+    core = mensaje[:i_crc]
+    crc_txt = mensaje[i_crc + len(SEP_CRC):].strip()
+    try:
+        if len(crc_txt) != 4:
+            raise ValueError(crc_txt)
+        rx_crc = int(crc_txt, 16)
+    except ValueError:
+        raise TramaInvalida(ERR_CRC_FORMATO, _seq_de(core), crc_txt) from None
+
+    calc = crc16_ccitt(core.encode("ascii", errors="ignore"))
+    if calc != rx_crc:
+        raise TramaInvalida(ERR_CRC, _seq_de(core), f"rx={rx_crc:04X} calc={calc:04X}", _id_de(core))
+
+    contenido = core[len(PREFIJO_DATOS):]
+    partes = contenido.split(",")
+    if len(partes) < 6:
+        raise TramaInvalida(ERR_CAMPOS, _seq_de(core), f"{len(partes)} campos")
+
+    fecha = hora = ""
+    seq = None
+    disp = DISPOSITIVO_LEGADO
+    for p in partes[5:]:
+        if p.startswith("SEQ="):
+            seq = p[4:]
+        elif p.startswith("DATE="):
+            fecha = p[5:]
+        elif p.startswith("TIME="):
+            hora = p[5:]
+        elif p.startswith("ID="):
+            disp = p[3:]
+    if seq is None or not seq.isdigit():
+        raise TramaInvalida(ERR_SEQ, None, str(seq), disp)
+    seq = int(seq)
+    if not id_valido(disp):
+        raise TramaInvalida(ERR_ID, seq, disp)
+
+    try:
+        lat = float(partes[0])
+        lon = float(partes[1])
+        cpm = int(partes[2])
+        alt = float(partes[3])
+        sat = int(partes[4])
+    except ValueError as e:
+        raise TramaInvalida(ERR_NUMERO, seq, str(e), disp) from None
+
+    return Trama("DATA", seq, lat, lon, cpm, alt, sat, fecha, hora, rx_crc, contenido, disp)
+
+
+# ---- Formato binario ----
+def es_binaria(payload: bytes) -> bool:
+    return len(payload) > 0 and (payload[0] & 0xF0) == MAGICO_BIN
+
+
+def _fecha_hora_de_epoch(epoch: int) -> tuple:
+    if epoch <= 0:
+        return "0000-00-00", "00:00:00"
+    t = time.gmtime(epoch)
+    return (f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}",
+            f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}")
+
+
+def contenido_texto(lat: float, lon: float, cpm: int, alt: float, sat: int,
+                    fecha: str, hora: str, seq: int, dispositivo: str = DISPOSITIVO_LEGADO) -> str:
+    """Texto equivalente a la trama ASCII (sin "todo:" ni CRC), para el topic MQTT crudo."""
+    id_txt = "" if dispositivo == DISPOSITIVO_LEGADO else f",ID={dispositivo}"
+    return f"{lat:.6f},{lon:.6f},{cpm},{alt:.2f},{sat},DATE={fecha},TIME={hora}{id_txt},SEQ={seq % 100:02d}"
+
+
+def codificar_binaria(seq: int, lat: float, lon: float, cpm: int, alt: float, sat: int,
+                      epoch: int = 0, dispositivo: int | None = None) -> bytes:
+    """Trama binaria v1, o v2 si se indica el ID numerico del detector (0..65535)."""
+    campos = (
+        int(round(lat * ESCALA_GRADOS)),
+        int(round(lon * ESCALA_GRADOS)),
+        min(max(int(cpm), 0), 0xFFFF),
+        min(max(int(round(alt)), -32768), 32767),
+        min(max(int(sat), 0), 0xFF),
+        max(int(epoch), 0) & 0xFFFFFFFF,
+        0,
+    )
+    if dispositivo is None:
+        cuerpo = FMT_BIN_V1.pack(MAGICO_BIN | VERSION_BIN, seq & 0xFF, *campos)[:-2]
+    else:
+        cuerpo = FMT_BIN_V2.pack(MAGICO_BIN | VERSION_BIN_ID, seq & 0xFF, int(dispositivo) & 0xFFFF, *campos)[:-2]
+    return cuerpo + struct.pack("<H", crc16_ccitt(cuerpo))
+
+
+def decodificar_binaria(payload: bytes) -> Trama:
+    version = payload[0] & 0x0F
+    seq_crudo = payload[1] if len(payload) > 1 else None
+    if version == VERSION_BIN:
+        fmt = FMT_BIN_V1
+    elif version == VERSION_BIN_ID:
+        fmt = FMT_BIN_V2
+    else:
+        raise TramaInvalida(ERR_VERSION, seq_crudo, str(version))
+    if len(payload) != fmt.size:
+        raise TramaInvalida(ERR_LARGO, seq_crudo, str(len(payload)))
+
+    if version == VERSION_BIN:
+        _, seq, lat_i, lon_i, cpm, alt, sat, epoch, rx_crc = fmt.unpack(payload)
+        disp = DISPOSITIVO_LEGADO
+    else:
+        _, seq, id_num, lat_i, lon_i, cpm, alt, sat, epoch, rx_crc = fmt.unpack(payload)
+        disp = str(id_num)
+    calc = crc16_ccitt(payload[:-2])
+    if calc != rx_crc:
+        raise TramaInvalida(ERR_CRC, seq, f"rx={rx_crc:04X} calc={calc:04X}", disp)
+
+    lat = lat_i / ESCALA_GRADOS
+    lon = lon_i / ESCALA_GRADOS
+    fecha, hora = _fecha_hora_de_epoch(epoch)
+    return Trama("DATA", seq, lat, lon, cpm, float(alt), sat, fecha, hora, rx_crc,
+                 contenido_texto(lat, lon, cpm, float(alt), sat, fecha, hora, seq, disp), disp)
+
+
+def decodificar_payload(payload: bytes) -> tuple:
+    """Autodetecta el formato por el byte magico. Retorna (Trama, texto_para_log)."""
+    if es_binaria(payload):
+        return decodificar_binaria(bytes(payload)), "BIN " + bytes(payload).hex()
+    mensaje = bytes(payload).decode("utf-8", errors="ignore").strip()
+    return decodificar_trama(mensaje), mensaje
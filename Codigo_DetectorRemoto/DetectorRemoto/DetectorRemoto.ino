@@ -49,6 +49,23 @@ unsigned long lastDoseMillis = 0;
 
 static const uint16_t ACK_TIMEOUT_MS = 800;
 
+// IDENTIFICADOR DEL DETECTOR (flota): topic MQTT dispositivos/<ID>/datos
+// 0 = detector unico, tramas sin ID (topic dispositivos/ESP/datos)
+#define DEVICE_ID 0
+
+// FORMATO DE TRAMA
+// 0 = texto "todo:lat,lon,cpm,alt,sat,DATE=..,TIME=..[,ID=n],SEQ=NN;CRC=XXXX" (~80 bytes)
+// 1 = binaria de 21 bytes (v1) o 23 con ID (v2) (ver trama.py en la consola; el receptor acepta ambas)
+#define TRAMA_BINARIA 0
+#if DEVICE_ID
+static const uint8_t TRAMA_BIN_MAGICO = 0xB2;  // 0xB0 | version 2 (con ID)
+static const uint8_t TRAMA_BIN_LARGO = 23;
+#else
+static const uint8_t TRAMA_BIN_MAGICO = 0xB1;  // 0xB0 | version 1
+static const uint8_t TRAMA_BIN_LARGO = 21;
+#endif
+static const uint8_t TRAMA_MAX = 128;
+
 // CRC16-CCITT (poly 0x1021, init 0xFFFF)
 uint16_t crc16_ccitt(const uint8_t* data, size_t len) {
   uint16_t crc = 0xFFFF;
@@ -72,6 +89,51 @@ String append_crc16_ccitt(const String& payload_without_crc) {
   return out;
 }
 
+// dias desde 1970-01-01 (algoritmo civil de H. Hinnant)
+static int32_t days_from_civil(int y, unsigned m, unsigned d){
+  y -= m <= 2;
+  const int32_t era = (y >= 0 ? y : y - 399) / 400;
+  const uint32_t yoe = (uint32_t)(y - era * 400);
+  const uint32_t doy = (153 * (m + (m > 2 ? -3 : 9)) + 2) / 5 + d - 1;
+  const uint32_t doe = yoe * 365 + yoe / 4 - yoe / 100 + doy;
+  return era * 146097 + (int32_t)doe - 719468;
+}
+
+static void put_u16(uint8_t* p, uint16_t v){ p[0] = v & 0xFF; p[1] = v >> 8; }
+static void put_u32(uint8_t* p, uint32_t v){ for (uint8_t i = 0; i < 4; i++) p[i] = (v >> (8 * i)) & 0xFF; }
+
+// trama binaria (little-endian):
+// magico/version, seq, [id u16 en v2], lat*1e6, lon*1e6, cpm, alt(m), sat, epoch UTC, CRC16
+uint8_t build_binary_frame(uint8_t* out, uint8_t seq, double lat, double lon,
+                           unsigned long cpm_v, double alt, uint8_t sat, uint32_t epoch){
+  uint8_t* p = out;
+  *p++ = TRAMA_BIN_MAGICO;
+  *p++ = seq;
+#if DEVICE_ID
+  put_u16(p, (uint16_t)DEVICE_ID); p += 2;
+#endif
+  put_u32(p, (uint32_t)(int32_t)lround(lat * 1e6)); p += 4;
+  put_u32(p, (uint32_t)(int32_t)lround(lon * 1e6)); p += 4;
+  put_u16(p, (uint16_t)(cpm_v > 0xFFFF ? 0xFFFF : cpm_v)); p += 2;
+  long a = lround(alt);
+  if (a > 32767) a = 32767;
+  if (a < -32768) a = -32768;
+  put_u16(p, (uint16_t)(int16_t)a); p += 2;
+  *p++ = sat;
+  put_u32(p, epoch); p += 4;
+  put_u16(p, crc16_ccitt(out, p - out));
+  return TRAMA_BIN_LARGO;
+}
+
+// ",ID=n" para tramas de texto y HELLO (vacio si DEVICE_ID == 0)
+String id_field(){
+#if DEVICE_ID
+  return String(",ID=") + String((unsigned)DEVICE_ID);
+#else
+  return String("");
+#endif
+}
+
 String twoDigits(uint16_t n){
   char b[4];
   n = n % 100;
@@ -95,6 +157,11 @@ bool waitForAck(uint16_t seq, uint16_t timeout_ms){
         String seqStr = (comma > 4) ? r.substring(4, comma) : r.substring(4);
         int rx = seqStr.toInt();
         bool ok = (r.indexOf(",OK") >= 0);
+#if DEVICE_ID
+        // con flota, ignorar ACK dirigidos a otro detector
+        int pid = r.indexOf(",ID=");
+        if (pid < 0 || r.substring(pid + 4).toInt() != DEVICE_ID) continue;
+#endif
         if (rx == (int)(seq % 100)) return ok;
       }
     }
@@ -106,18 +173,22 @@ bool waitForAck(uint16_t seq, uint16_t timeout_ms){
 
 // CONFIGURACION COLA FIFO
 
+// tramas como bytes crudos (texto o binaria)
 static const uint8_t  QUEUE_MAX = 40;
-String   q_msg[QUEUE_MAX];
+uint8_t  q_msg[QUEUE_MAX][TRAMA_MAX];
+uint8_t  q_len[QUEUE_MAX];
 uint16_t q_seq[QUEUE_MAX];
 uint8_t  q_head = 0, q_tail = 0, q_size = 0;
 
-bool q_enqueue(const String& msg, uint16_t seq){
+bool q_enqueue(const uint8_t* msg, uint8_t len, uint16_t seq){
+  if (len > TRAMA_MAX) return false;
   if (q_size >= QUEUE_MAX){
     // drop oldest
     q_head = (q_head + 1) % QUEUE_MAX;
     q_size--;
   }
-  q_msg[q_tail] = msg;
+  memcpy(q_msg[q_tail], msg, len);
+  q_len[q_tail] = len;
   q_seq[q_tail] = seq;
   q_tail = (q_tail + 1) % QUEUE_MAX;
   q_size++;
@@ -126,8 +197,9 @@ bool q_enqueue(const String& msg, uint16_t seq){
 
 bool q_is_empty(){ return q_size == 0; }
 
-void q_front(String& msg, uint16_t& seq){
+void q_front(const uint8_t*& msg, uint8_t& len, uint16_t& seq){
   msg = q_msg[q_head];
+  len = q_len[q_head];
   seq = q_seq[q_head];
 }
 
@@ -264,7 +336,7 @@ bool wait_gps_ok(){
 bool wait_lora_handshake_ok(){
   const uint16_t seq0 = 0;
   while (true){
-    String hello = "HELLO,SEQ=" + twoDigits(seq0);
+    String hello = "HELLO" + id_field() + ",SEQ=" + twoDigits(seq0);
     LoRa.idle();
     LoRa.beginPacket();
     LoRa.print(hello);
@@ -329,12 +401,12 @@ void try_send_queue_slots(){
     if (now >= slot_time){
       if (q_is_empty()) { slot_used[i] = true; continue; }
 
-      String msg; uint16_t seq;
-      q_front(msg, seq);
+      const uint8_t* msg; uint8_t len; uint16_t seq;
+      q_front(msg, len, seq);
 
       LoRa.idle();
       LoRa.beginPacket();
-      LoRa.print(msg);
+      LoRa.write(msg, len);
       LoRa.endPacket();
 
       bool ok = waitForAck(seq, 600);
@@ -390,23 +462,43 @@ void loop() {
     String fstr = gps_date_str();
     String tstr = gps_time_str();
 
+    uint8_t trama[TRAMA_MAX];
+    uint8_t trama_len;
+#if TRAMA_BINARIA
+    uint32_t epoch = 0;
+    if (gps.date.isValid() && gps.time.isValid() && gps.date.year() >= 2000){
+      epoch = (uint32_t)days_from_civil(gps.date.year(), gps.date.month(), gps.date.day()) * 86400UL
+            + gps.time.hour() * 3600UL + gps.time.minute() * 60UL + gps.time.second();
+    }
+    trama_len = build_binary_frame(trama, (uint8_t)(envioNum % 100),
+                                   gps.location.isValid() ? gps.location.lat() : 0.0,
+                                   gps.location.isValid() ? gps.location.lng() : 0.0,
+                                   cpm, gps.altitude.meters(),
+                                   gps.satellites.isValid() ? (uint8_t)gps.satellites.value() : 0,
+                                   epoch);
+    String mensaje = "BIN SEQ=" + twoDigits(envioNum) + " CPM=" + String(cpm);
+#else
     // payload con DATE/TIME antes de SEQ y CRC
     String core = "todo:" + lat + "," + lon + "," + String(cpm) + "," + alt + "," + sat;
     core += ",DATE=" + fstr + ",TIME=" + tstr;
+    core += id_field();
     core += ",SEQ=" + twoDigits(envioNum);
     String mensaje = append_crc16_ccitt(core);
+    trama_len = (uint8_t)min((unsigned)mensaje.length(), (unsigned)TRAMA_MAX);
+    memcpy(trama, mensaje.c_str(), trama_len);
+#endif
 
     // enviar
     LoRa.idle();
     LoRa.beginPacket();
-    LoRa.print(mensaje);
+    LoRa.write(trama, trama_len);
     LoRa.endPacket();
 
     bool ok = waitForAck(envioNum, ACK_TIMEOUT_MS);
     if (!ok) {
       // encolar solo si hay posicion valida (no 0.0)
       if (gps_ok) {
-        q_enqueue(mensaje, envioNum);
+        q_enqueue(trama, trama_len, envioNum);
       }
     }
 